@@ -27,12 +27,20 @@ def create_app(config=None):
     from app.expense.views import bp as expense_bp
     from app.user.views import bp as user_bp
     from app.group.views import bp as group_bp
+    from app.api.views import bp as api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(index_bp)
     app.register_blueprint(expense_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(group_bp)
+    app.register_blueprint(api_bp)
+
+    from app import cache, instrumentation
+
+    cache.init_app(app)
+
+    instrumentation.init_app(app)
 
     from app.cli import database
 
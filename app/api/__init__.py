@@ -0,0 +1,31 @@
+from collections.abc import Iterable
+
+from app.api.serializers import Serializer
+
+
+def parse_fields(args, serializer: type[Serializer]) -> set[str] | None:
+    """
+    Reads the ?fields= query parameter, a comma separated list of the fields
+    to return. Returns None when absent, meaning every field.
+    Raises ValueError if it names a field the serializer does not have.
+    """
+    if not (value := args.get("fields")):
+        return None
+    only = {name.strip() for name in value.split(",") if name.strip()}
+    if unknown := only - set(serializer.field_names()):
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Available fields: {', '.join(serializer.field_names())}."
+        )
+    return only
+
+
+def serialize(items: Iterable[Serializer], only: set[str] | None = None) -> list[dict]:
+    return [item.to_dict(only) for item in items]
+
+
+def page(
+    items: Iterable[Serializer], next_cursor: str | None, only: set[str] | None = None
+) -> dict:
+    """One page of a list endpoint, with the cursor of the next page."""
+    return {"items": serialize(items, only), "next_cursor": next_cursor}
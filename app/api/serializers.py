@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from enum import Enum
+from typing import Any, Self
+
+from app.model.balance import Balance
+from app.model.debt import Debt
+from app.model.expense import Expense, ExpenseCategory
+from app.model.group import Group
+from app.model.user import User
+from app.split import SplitType
+
+
+class Serializer:
+    """
+    Base of the API's output records. Subclasses are slotted dataclasses that
+    copy plain values out of the ORM objects, so responses never hold on to
+    the session or trigger lazy loads while being encoded.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def field_names(cls) -> tuple[str, ...]:
+        return tuple(field.name for field in fields(cls))  # type: ignore[arg-type]
+
+    def to_dict(self, only: set[str] | None = None) -> dict:
+        """Plain dictionary of the record, limited to the fields in only if given."""
+        return {
+            name: _plain(getattr(self, name))
+            for name in self.field_names()
+            if only is None or name in only
+        }
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Serializer):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+@dataclass(slots=True)
+class UserOut(Serializer):
+    id: int
+    username: str
+
+    @classmethod
+    def from_model(cls, user: User) -> Self:
+        return cls(id=user.id, username=user.username)
+
+
+@dataclass(slots=True)
+class GroupOut(Serializer):
+    id: int
+    name: str
+    description: str | None
+    balance: float | None = None
+    members: list[UserOut] | None = None
+
+    @classmethod
+    def from_model(
+        cls, group: Group, balance: float | None = None, with_members: bool = False
+    ) -> Self:
+        return cls(
+            id=group.id,
+            name=group.name,
+            description=group.description,
+            balance=balance,
+            members=[UserOut.from_model(u) for u in group.users] if with_members else None,
+        )
+
+
+@dataclass(slots=True)
+class UserBalanceOut(Serializer):
+    user_id: int
+    username: str
+    balance: float
+
+    @classmethod
+    def from_model(cls, user: User, balance: float) -> Self:
+        return cls(user_id=user.id, username=user.username, balance=balance)
+
+
+@dataclass(slots=True)
+class GroupBalanceOut(Serializer):
+    group_id: int | None
+    balance: float
+
+
+@dataclass(slots=True)
+class DebtOut(Serializer):
+    id: int
+    lender_id: int
+    borrower_id: int
+    amount: float
+
+    @classmethod
+    def from_model(cls, debt: Debt) -> Self:
+        return cls(
+            id=debt.id,
+            lender_id=debt.lender_id,
+            borrower_id=debt.borrower_id,
+            amount=debt.amount,
+        )
+
+
+@dataclass(slots=True)
+class ExpenseBalanceOut(Serializer):
+    user_id: int
+    payed: float
+    owed: float
+    total: float
+
+    @classmethod
+    def from_model(cls, balance: Balance) -> Self:
+        return cls(
+            user_id=balance.user_id,
+            payed=balance.payed,
+            owed=balance.owed,
+            total=balance.total,
+        )
+
+
+@dataclass(slots=True)
+class ExpenseOut(Serializer):
+    id: int
+    amount: float
+    description: str | None
+    category: ExpenseCategory | None
+    payers_split: SplitType
+    owers_split: SplitType
+    creator_id: int
+    group_id: int | None
+    created_at: datetime
+    balances: list[ExpenseBalanceOut] | None = None
+
+    @classmethod
+    def from_model(cls, expense: Expense, with_balances: bool = True) -> Self:
+        return cls(
+            id=expense.id,
+            amount=expense.amount,
+            description=expense.description,
+            category=expense.category,
+            payers_split=expense.payers_split,
+            owers_split=expense.owers_split,
+            creator_id=expense.creator_id,
+            group_id=expense.group_id,
+            created_at=expense.created_at,
+            balances=(
+                [ExpenseBalanceOut.from_model(b) for b in expense.balances]
+                if with_balances
+                else None
+            ),
+        )
+
+
+@dataclass(slots=True)
+class SettlementOut(Serializer):
+    debtor_id: int
+    creditor_id: int
+    amount: float
+    description: str
+
+    @classmethod
+    def from_transaction(cls, transaction: dict) -> Self:
+        return cls(
+            debtor_id=transaction["debtor"].id,
+            creditor_id=transaction["creditor"].id,
+            amount=transaction["amount"],
+            description=transaction["description"],
+        )
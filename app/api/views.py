@@ -0,0 +1,266 @@
+from collections.abc import Callable
+
+from flask import Blueprint, abort, jsonify, request
+from flask_login import current_user
+from sqlalchemy.orm import selectinload
+from werkzeug import Response
+from werkzeug.exceptions import HTTPException
+
+from app.api import page, parse_fields, serialize
+from app.api.serializers import (
+    DebtOut,
+    ExpenseOut,
+    GroupBalanceOut,
+    GroupOut,
+    Serializer,
+    SettlementOut,
+    UserBalanceOut,
+)
+from app.etag import group_etag, make_etag, not_modified, user_etag, with_etag
+from app.expense import get_authorized_expense
+from app.expense.pagination import (
+    group_expenses_query,
+    paginate_expenses,
+    parse_page_args,
+    user_expenses_query,
+)
+from app.group import (
+    calculate_group_settlement_transactions,
+    check_group_has_balances,
+    get_authorized_group,
+    get_group_user_balances,
+    get_no_group_debts,
+    handle_individual_balance_process,
+    handle_settle_debts_process,
+    prepare_group_balances_data,
+)
+from app.model.constants import NO_GROUP
+from app.model.expense import Expense
+from app.model.group import Group
+from app.user import (
+    calculate_friend_debt,
+    prepare_balances_data,
+    prepare_groups_data,
+    process_friend_debt_settlement,
+    validate_friend_for_settlement,
+)
+
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+
+@bp.before_request
+def require_login() -> None:
+    if not current_user.is_authenticated:
+        abort(401, "Authentication required.")
+
+
+@bp.errorhandler(HTTPException)
+def json_error(error: HTTPException) -> tuple[Response, int]:
+    return jsonify({"error": error.description}), error.code or 500
+
+
+def fields_of(serializer: type[Serializer]) -> set[str] | None:
+    try:
+        return parse_fields(request.args, serializer)
+    except ValueError as e:
+        abort(400, str(e))
+
+
+def authorized_group(group_id: int) -> Group:
+    if not (group := get_authorized_group(group_id)):
+        abort(404, "Group not found or access denied.")
+    return group
+
+
+def conditional(etag: str, build: Callable[[], dict]) -> Response:
+    """
+    Answers a GET with the JSON built by build, or with a 304 when the client
+    already holds it. The query string is part of the tag, since it selects
+    the fields and the page.
+    """
+    etag = make_etag(etag, request.full_path)
+    if response := not_modified(etag):
+        return response
+    return with_etag(jsonify(build()), etag)
+
+
+def expenses_page(query, only: set[str] | None) -> dict:
+    try:
+        cursor, limit = parse_page_args(request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    with_balances = only is None or "balances" in only
+    if with_balances:
+        query = query.options(selectinload(Expense.balances))
+    expenses = paginate_expenses(query, cursor, limit)
+    return page(
+        [ExpenseOut.from_model(e, with_balances) for e in expenses.expenses],
+        expenses.next_cursor,
+        only,
+    )
+
+
+@bp.route("/groups", methods=["GET"])
+def groups() -> Response:
+    """The current user's groups, with their balance in each."""
+    only = fields_of(GroupOut)
+
+    def build() -> dict:
+        data = prepare_groups_data(current_user)
+        return {
+            "items": serialize(
+                (
+                    GroupOut.from_model(group, data["group_balances"][group.id])
+                    for group in data["groups"]
+                ),
+                only,
+            ),
+            "overall_balance": data["overall_balance"],
+        }
+
+    return conditional(user_etag(current_user), build)
+
+
+@bp.route("/groups/<int:group_id>", methods=["GET"])
+def group(group_id: int) -> Response:
+    """A group with its members and the current user's balance in it."""
+    group = authorized_group(group_id)
+    only = fields_of(GroupOut)
+
+    def build() -> dict:
+        balance = get_group_user_balances(group).get(current_user._get_current_object())
+        return GroupOut.from_model(group, balance, with_members=True).to_dict(only)
+
+    return conditional(group_etag(group), build)
+
+
+@bp.route("/groups/<int:group_id>/balances", methods=["GET"])
+def group_balances(group_id: int) -> Response:
+    """Every member's balance in the group, most negative first."""
+    group = authorized_group(group_id)
+    only = fields_of(UserBalanceOut)
+
+    def build() -> dict:
+        balances = prepare_group_balances_data(group)["balances"]
+        return {
+            "items": serialize(
+                (UserBalanceOut.from_model(u, b) for u, b in balances.items()), only
+            )
+        }
+
+    return conditional(group_etag(group), build)
+
+
+@bp.route("/groups/<int:group_id>/expenses", methods=["GET"])
+def group_expenses(group_id: int) -> Response:
+    """One page of the group's expenses, newest first."""
+    group = authorized_group(group_id)
+    only = fields_of(ExpenseOut)
+    return conditional(
+        group_etag(group), lambda: expenses_page(group_expenses_query(group.id), only)
+    )
+
+
+@bp.route("/groups/<int:group_id>/settlement", methods=["GET"])
+def group_settlement_preview(group_id: int) -> Response:
+    """The payments that would settle every balance in the group."""
+    group = authorized_group(group_id)
+    only = fields_of(SettlementOut)
+
+    def build() -> dict:
+        transactions = (
+            calculate_group_settlement_transactions(group)
+            if check_group_has_balances(group)
+            else []
+        )
+        return {
+            "items": serialize(map(SettlementOut.from_transaction, transactions), only)
+        }
+
+    return conditional(group_etag(group), build)
+
+
+@bp.route("/groups/<int:group_id>/settlement", methods=["POST"])
+def settle_group(group_id: int) -> tuple[Response, int]:
+    """Settles every balance in the group."""
+    result = handle_settle_debts_process(authorized_group(group_id))
+    if not result["success"]:
+        abort(400, result["message"])
+    expenses = [ExpenseOut.from_model(e) for e in result["settlement_expenses"]]
+    return jsonify({"message": result["message"], "expenses": serialize(expenses)}), 201
+
+
+@bp.route("/groups/<int:group_id>/settlement/<int:user_id>", methods=["POST"])
+def settle_group_member(group_id: int, user_id: int) -> tuple[Response, int]:
+    """Settles one member's balance in the group."""
+    result = handle_individual_balance_process(authorized_group(group_id), user_id)
+    if not result["success"]:
+        abort(400, result["message"])
+    expenses = [ExpenseOut.from_model(e) for e in result["settlement_expenses"]]
+    return jsonify({"expenses": serialize(expenses)}), 201
+
+
+@bp.route("/user/balances", methods=["GET"])
+def user_balances() -> Response:
+    """The current user's overall balance, and their balance per group and outside groups."""
+    only = fields_of(GroupBalanceOut)
+
+    def build() -> dict:
+        data = prepare_balances_data(current_user)
+        return {
+            "items": serialize(
+                (
+                    GroupBalanceOut(None if id == NO_GROUP else id, balance)
+                    for id, balance in data["group_balances"].items()
+                ),
+                only,
+            ),
+            "overall_balance": data["overall_balance"],
+        }
+
+    return conditional(user_etag(current_user), build)
+
+
+@bp.route("/user/debts", methods=["GET"])
+def user_debts() -> Response:
+    """The current user's debts outside any group."""
+    only = fields_of(DebtOut)
+    return conditional(
+        user_etag(current_user),
+        lambda: {
+            "items": serialize(map(DebtOut.from_model, get_no_group_debts(current_user)), only)
+        },
+    )
+
+
+@bp.route("/user/expenses", methods=["GET"])
+def user_expenses() -> Response:
+    """One page of the current user's expenses, newest first."""
+    only = fields_of(ExpenseOut)
+    return conditional(
+        user_etag(current_user), lambda: expenses_page(user_expenses_query(current_user.id), only)
+    )
+
+
+@bp.route("/expenses/<int:expense_id>", methods=["GET"])
+def expense(expense_id: int) -> Response:
+    only = fields_of(ExpenseOut)
+    if not (expense := get_authorized_expense(expense_id, current_user)):
+        abort(404, "Expense not found or access denied.")
+    return jsonify(ExpenseOut.from_model(expense).to_dict(only))
+
+
+@bp.route("/friends/<int:friend_id>/settlement", methods=["POST"])
+def settle_friend(friend_id: int) -> tuple[Response, int]:
+    """Settles the debt between the current user and a friend."""
+    validation = validate_friend_for_settlement(current_user, friend_id)
+    if not validation["valid"]:
+        abort(404, validation["message"])
+
+    debt_with_friend, _ = calculate_friend_debt(current_user, validation["friend"])
+    result = process_friend_debt_settlement(
+        current_user, validation["friend"], debt_with_friend
+    )
+    if not result["success"]:
+        abort(400, result["message"])
+    return jsonify({"message": result["message"]}), 201
@@ -0,0 +1,157 @@
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.cache.backends import BACKENDS, MISSING, CacheBackend, MemoryBackend
+from app.database import db
+
+EXTENSION = "balance_cache"
+USER = "user"
+GROUP = "group"
+
+# Users and groups written in the current transaction, keyed in Session.info
+PENDING = "_balance_cache_pending"
+
+T = TypeVar("T")
+
+
+class BalanceCache:
+    """
+    Caches computed balances per user and per group.
+    Every entry is keyed by the version of its user or group, and the version
+    is bumped once a transaction that changed their balances commits, so a
+    read after a write never sees the entries computed before it.
+    A backend with a maxsize of 0 disables the cache.
+    """
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend.maxsize > 0
+
+    def bump(self, kind: str, ids: Iterable[int]) -> None:
+        if ids := list(ids):
+            self.backend.bump(kind, ids)
+
+    def get_or_compute(self, name: str, kind: str, id: int, compute: Callable[[], T]) -> T:
+        """
+        Returns the cached value of name for the user or group, computing and
+        storing it on a miss. Users and groups written by the current, not yet
+        committed, transaction bypass the cache.
+        """
+        if not self.enabled or id in db.session.info.get(PENDING, {}).get(kind, ()):
+            return compute()
+
+        key = (name, kind, id, self.backend.version(kind, id))
+        value = self.backend.get(key)
+        if value is MISSING:
+            self.misses += 1
+            value = compute()
+            self.backend.set(key, value)
+        else:
+            self.hits += 1
+        return value
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.backend),
+            "maxsize": self.backend.maxsize,
+        }
+
+
+def get_cache() -> BalanceCache:
+    return current_app.extensions[EXTENSION]
+
+
+def cached_for_user(name: str, user_id: int, compute: Callable[[], T]) -> T:
+    """Cached result of compute, recomputed after the user's balances change."""
+    return get_cache().get_or_compute(name, USER, user_id, compute)
+
+
+def cached_for_group(name: str, group_id: int, compute: Callable[[], T]) -> T:
+    """Cached result of compute, recomputed after the group's balances change."""
+    return get_cache().get_or_compute(name, GROUP, group_id, compute)
+
+
+def invalidate(users: Iterable[int] = (), groups: Iterable[int] = ()) -> None:
+    """
+    Marks users and groups as changed by the current transaction. Their
+    version columns are incremented by its commit and their cached entries
+    are dropped once it is done.
+    """
+    pending = db.session.info.setdefault(PENDING, {USER: set(), GROUP: set()})
+    pending[USER].update(users)
+    pending[GROUP].update(groups)
+
+
+def _before_commit(session: Session) -> None:
+    from app.model.group import Group
+    from app.model.user import User
+
+    pending = session.info.get(PENDING)
+    if not pending:
+        return
+    for model, ids in ((User, pending[USER]), (Group, pending[GROUP])):
+        if ids:
+            session.execute(
+                update(model)
+                .where(model.id.in_(ids))
+                .values(version=model.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(PENDING, None)
+    if pending and has_app_context() and EXTENSION in current_app.extensions:
+        cache = get_cache()
+        cache.bump(USER, pending[USER])
+        cache.bump(GROUP, pending[GROUP])
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(PENDING, None)
+
+
+def init_app(app: Flask) -> None:
+    """
+    Sets up the balance cache on the BALANCE_CACHE_BACKEND backend, holding up
+    to BALANCE_CACHE_SIZE entries. Use the "sqlite" backend when several
+    workers serve the app, so that they share entries and invalidations.
+    Its counters are served to logged-in users at /debug/cache.
+    """
+    from app.cache.views import bp
+
+    app.config.setdefault("BALANCE_CACHE_BACKEND", "memory")
+    app.config.setdefault("BALANCE_CACHE_SIZE", 1024)
+
+    name = app.config["BALANCE_CACHE_BACKEND"]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown balance cache backend: {name}")
+    if app.config["BALANCE_CACHE_SIZE"] > 0:
+        backend = BACKENDS[name].from_config(app.config)
+    else:
+        backend = MemoryBackend(0)
+    app.extensions[EXTENSION] = BalanceCache(backend)
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "before_commit", _before_commit)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+
+    if bp.name not in app.blueprints:
+        app.register_blueprint(bp)
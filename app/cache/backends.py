@@ -0,0 +1,214 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any, Self
+
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Storage of cached entries and of the versions they are keyed by."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+
+    @classmethod
+    def from_config(cls, config: dict) -> Self:
+        return cls(config["BALANCE_CACHE_SIZE"])
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """Returns the entry stored under key, or MISSING."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores an entry, evicting the least recently used ones past maxsize."""
+
+    @abstractmethod
+    def version(self, kind: str, id: int) -> int:
+        """Current version of a user or group, 0 if never bumped."""
+
+    @abstractmethod
+    def bump(self, kind: str, ids: Iterable[int]) -> None:
+        """Increments the versions of users or groups."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every entry and version."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry past maxsize."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Entries and versions held by the process. Fastest, but every worker has
+    its own copy and only sees the versions bumped by its own commits.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize)
+        self._entries = LRUCache(maxsize)
+        self._versions: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        return self._entries.get(key, MISSING)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries.set(key, value)
+
+    def version(self, kind: str, id: int) -> int:
+        return self._versions.get((kind, id), 0)
+
+    def bump(self, kind: str, ids: Iterable[int]) -> None:
+        with self._lock:
+            for id in ids:
+                self._versions[(kind, id)] = self.version(kind, id) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Entries and versions kept in a SQLite file shared by every worker on the
+    host. A version bumped by one worker's commit is read by all of them, so
+    the entries cached by the others stop being used.
+    """
+
+    def __init__(self, maxsize: int, path: str) -> None:
+        super().__init__(maxsize)
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entry (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    used_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_cache_entry_used_at ON cache_entry (used_at);
+                CREATE TABLE IF NOT EXISTS cache_version (
+                    kind TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    PRIMARY KEY (kind, id)
+                );
+                """
+            )
+
+    @classmethod
+    def from_config(cls, config: dict) -> Self:
+        return cls(config["BALANCE_CACHE_SIZE"], config["BALANCE_CACHE_PATH"])
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        One connection per thread, in WAL mode so readers never wait on writers.
+        Connections are never shared with forked workers.
+        """
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return self._local.connection
+
+    def get(self, key: Hashable) -> Any:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value FROM cache_entry WHERE key = ?", (repr(key),)
+            ).fetchone()
+            if row is None:
+                return MISSING
+            connection.execute(
+                "UPDATE cache_entry SET used_at = ? WHERE key = ?",
+                (time.time(), repr(key)),
+            )
+        return pickle.loads(row[0])
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entry (key, value, used_at) VALUES (?, ?, ?)",
+                (repr(key), pickle.dumps(value), time.time()),
+            )
+            connection.execute(
+                "DELETE FROM cache_entry WHERE key IN ("
+                "SELECT key FROM cache_entry ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def version(self, kind: str, id: int) -> int:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT version FROM cache_version WHERE kind = ? AND id = ?", (kind, id)
+            )
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump(self, kind: str, ids: Iterable[int]) -> None:
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT INTO cache_version (kind, id, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (kind, id) DO UPDATE SET version = version + 1",
+                [(kind, id) for id in ids],
+            )
+
+    def clear(self) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache_entry")
+            connection.execute("DELETE FROM cache_version")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache_entry").fetchone()[0]
+
+
+BACKENDS: dict[str, type[CacheBackend]] = {
+    "memory": MemoryBackend,
+    "sqlite": SQLiteBackend,
+}
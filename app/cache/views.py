@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required
+from werkzeug import Response
+
+from app.cache import get_cache
+
+
+bp = Blueprint("cache", __name__)
+
+
+@bp.route("/debug/cache", methods=["GET"])
+@login_required
+def stats() -> Response:
+    """Hit and miss counters of the balance cache."""
+    return jsonify(get_cache().stats())
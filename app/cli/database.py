@@ -3,17 +3,26 @@ import random
 import signal
 import sys
 
+import click
 import sqlalchemy
+from sqlalchemy import select
 from flask_migrate import stamp
 from flask.cli import AppGroup
+from app.cache import invalidate
 from app.database import db
 from app.split.constants import OWED, PAYED, TOTAL
 from app.debt import update_debts
 from app.model.group import Group
 from app.model.user import User
 from app.model.expense import Expense
+from app.model.user_balance_summary import UserBalanceSummary
 from app.split import SplitType, equally, amount as amount_split, percentage
 from app.expense.mapper import map_balances_to_model
+from app.expense.export import DEFAULT_BATCH_SIZE, FORMATS, export_expenses
+from app.expense.importer import DEFAULT_CHUNK_SIZE, READERS, ImportStats, import_expenses
+from app.ledger import rebuild_balances, take_snapshot, verify_balances
+from app.seed import DEFAULT_BATCH_SIZE as SEED_BATCH_SIZE, SeedConfig, SeedStats, seed
+from app.seed.workload import DEFAULT_END, WorkloadConfig, generate
 from app.user import update_expenses_in_users
 
 cli = AppGroup("database", help="Database commands.")
@@ -45,6 +54,212 @@ def clear_data() -> None:
     print("All data cleared successfully.")
 
 
+@cli.command("rebuild-balance-summary")
+def rebuild_balance_summary() -> None:
+    """Rebuild the user balance summaries from the debts and group balances."""
+    invalidate(users=db.session.scalars(select(UserBalanceSummary.user_id)))
+    count = UserBalanceSummary.rebuild(commit=False)
+    invalidate(users=db.session.scalars(select(UserBalanceSummary.user_id)))
+    db.session.commit()
+    print(f"Rebuilt balance summaries of {count} users.")
+
+
+@cli.command("verify-balance-summary")
+def verify_balance_summary() -> None:
+    """Check the user balance summaries against the debts and group balances."""
+    mismatches = UserBalanceSummary.verify()
+    for user_id, (expected, stored) in sorted(mismatches.items()):
+        print(f"User {user_id}: expected {expected}, stored {stored}")
+    if mismatches:
+        print(f"{len(mismatches)} balance summaries are out of date.")
+        sys.exit(1)
+    print("All balance summaries are up to date.")
+
+
+@cli.command("ledger-snapshot")
+def ledger_snapshot() -> None:
+    """Snapshot every balance at the current ledger offset, run it periodically."""
+    snapshot = take_snapshot()
+    print(f"Snapshot {snapshot.id} taken at ledger offset {snapshot.ledger_offset}.")
+
+
+@cli.command("rebuild-balances")
+def rebuild_balances_command() -> None:
+    """Rebuild debts and group balances from the last ledger snapshot and its tail."""
+    computed = rebuild_balances()
+    print(
+        f"Rebuilt {len(computed.balances)} balances from the snapshot at ledger"
+        f" offset {computed.snapshot_offset} and {computed.tail} entries after it."
+    )
+
+
+@cli.command("verify-ledger")
+def verify_ledger() -> None:
+    """Check the debts and group balances against the ledger."""
+    mismatches = verify_balances()
+    for (user_id, counterparty_id, group_id), (expected, stored) in sorted(
+        mismatches.items(), key=str
+    ):
+        target = f"user {counterparty_id}" if group_id is None else f"group {group_id}"
+        print(f"User {user_id} with {target}: expected {expected} cents, stored {stored}")
+    if mismatches:
+        print(f"{len(mismatches)} balances differ from the ledger.")
+        sys.exit(1)
+    print("All balances match the ledger.")
+
+
+@cli.command("export")
+@click.option("--format", "format", type=click.Choice(list(FORMATS)), default="csv")
+@click.option("--user", "user_id", type=int, help="Only the expenses of this user.")
+@click.option("--group", "group_id", type=int, help="Only the expenses of this group.")
+@click.option("--output", type=click.File("w"), default="-", help="Defaults to stdout.")
+@click.option("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+def export(
+    format: str, user_id: int | None, group_id: int | None, output, batch_size: int
+) -> None:
+    """Export expenses with their balances as CSV or JSON lines."""
+    for chunk in export_expenses(format, user_id, group_id, batch_size):
+        output.write(chunk)
+
+
+@cli.command("import")
+@click.argument("file", type=click.File("r"))
+@click.option("--format", "format", type=click.Choice(list(READERS)))
+@click.option("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, show_default=True)
+def import_(file, format: str | None, chunk_size: int) -> None:
+    """
+    Import expenses from a CSV or JSON lines file. The format defaults to the
+    file's extension. Invalid rows are skipped and listed at the end.
+    """
+    format = format or file.name.rsplit(".", 1)[-1]
+    if format not in READERS:
+        raise click.BadParameter(
+            f"Cannot infer the format of {file.name}.", param_hint="--format"
+        )
+
+    def progress(stats: ImportStats) -> None:
+        print(
+            f"Read {stats.read} rows, imported {stats.imported} expenses "
+            f"in {stats.elapsed:.1f}s ({stats.rate:.0f} expenses/s)"
+        )
+
+    stats = import_expenses(file, format, chunk_size, progress)
+    for error in stats.errors:
+        print(error, file=sys.stderr)
+    print(
+        f"Imported {stats.imported} of {stats.read} expenses "
+        f"in {stats.elapsed:.1f}s ({stats.rate:.0f} expenses/s)."
+    )
+    if stats.errors:
+        sys.exit(1)
+
+
+@cli.command("seed")
+@click.option("--users", type=int, default=1000, show_default=True)
+@click.option("--groups", type=int, default=100, show_default=True)
+@click.option("--expenses", type=int, default=100_000, show_default=True)
+@click.option("--group-size", type=(int, int), default=(3, 12), show_default=True)
+@click.option("--participants", type=(int, int), default=(2, 6), show_default=True)
+@click.option("--seed", "random_seed", type=int, help="Seed of the random generator.")
+@click.option("--batch-size", type=int, default=SEED_BATCH_SIZE, show_default=True)
+def seed_data(
+    users: int,
+    groups: int,
+    expenses: int,
+    group_size: tuple[int, int],
+    participants: tuple[int, int],
+    random_seed: int | None,
+    batch_size: int,
+) -> None:
+    """
+    Bulk create random users, groups and expenses. Much faster than
+    test-data-big: rows are inserted in batches and balances summed in memory.
+    """
+
+    def progress(stats: SeedStats) -> None:
+        print(f"Wrote {stats.expenses} expenses in {stats.elapsed:.1f}s ({stats.rate:.0f}/s)")
+
+    config = SeedConfig(
+        users=users,
+        groups=groups,
+        expenses=expenses,
+        group_size=group_size,
+        participants=participants,
+        seed=random_seed,
+    )
+    stats = seed(config, batch_size, progress)
+    print(
+        f"Seeded {stats.users} users, {stats.groups} groups, {stats.expenses} expenses "
+        f"and {stats.balances} balances in {stats.elapsed:.1f}s."
+    )
+
+
+def _parse_split_mix(ctx, param, value: str | None) -> dict[SplitType, float] | None:
+    """Reads a split type mix written as "equally=0.7,amount=0.2,percentage=0.1"."""
+    if value is None:
+        return None
+    try:
+        return {
+            SplitType[name.strip().upper()]: float(weight)
+            for name, weight in (item.split("=") for item in value.split(","))
+        }
+    except (KeyError, ValueError) as e:
+        raise click.BadParameter(f"Malformed split mix: {value}") from e
+
+
+@cli.command("workload")
+@click.option("--users", type=int, default=1000, show_default=True)
+@click.option("--groups", type=int, default=100, show_default=True)
+@click.option("--expenses", type=int, default=100_000, show_default=True)
+@click.option("--max-group-size", type=int, default=50, show_default=True)
+@click.option("--group-size-exponent", type=float, default=1.3, show_default=True)
+@click.option("--activity-shape", type=float, default=1.2, show_default=True)
+@click.option(
+    "--split-mix",
+    callback=_parse_split_mix,
+    help='Split type weights, e.g. "equally=0.7,amount=0.2,percentage=0.1".',
+)
+@click.option("--no-group-share", type=float, default=0.2, show_default=True)
+@click.option("--settlement-share", type=float, default=0.02, show_default=True)
+@click.option("--days", type=int, default=365, show_default=True)
+@click.option(
+    "--end",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=DEFAULT_END.strftime("%Y-%m-%d"),
+    show_default=True,
+    help="Date of the last expense, the others spread over the days before it.",
+)
+@click.option("--seed", "random_seed", type=int, default=0, show_default=True)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    help="Write the expenses as JSON lines for import instead of to the database.",
+)
+def workload(output, split_mix, random_seed: int, **options) -> None:
+    """
+    Generate a reproducible workload with skewed group sizes and user activity.
+    Users and groups are always created in the database.
+    """
+    config = WorkloadConfig(seed=random_seed, **options)
+    if split_mix:
+        config.split_mix = split_mix
+
+    # Reported on stderr, the expenses may be written to stdout
+    def progress(stats: SeedStats) -> None:
+        print(
+            f"Generated {stats.expenses} expenses in {stats.elapsed:.1f}s "
+            f"({stats.rate:.0f}/s)",
+            file=sys.stderr,
+        )
+
+    stats = generate(config, output, progress=progress)
+    print(
+        f"Generated {stats.users} users, {stats.groups} groups and {stats.expenses} "
+        f"expenses in {stats.elapsed:.1f}s.",
+        file=sys.stderr,
+    )
+
+
 def _create_users(count: int) -> List[User]:
     """Create a specified number of users."""
     users = []
@@ -9,13 +9,32 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SERVER_NAME = "localhost:8000"
     DEBUG = False
+    # Settle groups with the minimum number of transactions instead of greedily
+    OPTIMAL_SETTLEMENT = False
+    # How spare cents are handed out when splitting: "random" or "largest_remainder"
+    SPLIT_REMAINDER_STRATEGY = "largest_remainder"
+    # Per-request SQL query count and timing, sent in the Server-Timing header
+    # and listed at /debug/queries. Meant for development only.
+    SQL_INSTRUMENTATION = False
+    SQL_INSTRUMENTATION_SLOWEST = 5
+    SQL_INSTRUMENTATION_HISTORY = 100
+    # Balance cache: "memory" keeps it per process, "sqlite" shares it, and
+    # its invalidations, between the workers of a host. Size 0 disables it.
+    BALANCE_CACHE_BACKEND = "memory"
+    BALANCE_CACHE_SIZE = 1024
+    BALANCE_CACHE_PATH = os.path.join(basedir, "balance_cache.db")
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQL_INSTRUMENTATION = True
 
 
 class TestConfig(Config):
     DEBUG = True
     TESTING = True
     WTF_CSRF_ENABLED = False
+    # In memory, so tests never write to the development database
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    # Tests reuse ids across a cleaned database, enable it only where tested
+    BALANCE_CACHE_SIZE = 0
@@ -1,28 +1,179 @@
+import heapq
+from collections import defaultdict
+from typing import Iterable
+
 from app.model.debt import Debt
 from app.model.group_balance import GroupBalance
 from app.split.constants import TOTAL
 
+# Largest number of balances the optimal settlement searches exhaustively.
+# The search is O(n·2ⁿ); above this size it falls back to the greedy engine.
+OPTIMAL_SETTLEMENT_MAX_SIZE = 12
 
-def simplify_debts(balances: dict[int, float]) -> list[tuple[int, int, float]]:
-    """Simplifies debts to minimize transactions."""
-    cents = {uid: round(bal * 100) for uid, bal in balances.items() if bal != 0}
+
+def _to_cents(balances: dict[int, float]) -> dict[int, int]:
+    return {uid: round(bal * 100) for uid, bal in balances.items() if bal != 0}
+
+
+def _simplify_debts_scan(cents: dict[int, int]) -> list[tuple[int, int, float]]:
+    """
+    Greedy settlement scanning every balance on each step. O(n²).
+
+    Kept as the reference implementation for _simplify_debts_heap; see
+    benchmarks/simplify_debts.py for the comparison between both engines.
+    """
     transactions = []
-    
+
     while cents:
         debtor = min(cents, key=cents.get)
         creditor = max(cents, key=cents.get)
         amount_cents = min(-cents[debtor], cents[creditor])
-        
+
         transactions.append((debtor, creditor, amount_cents / 100))
-        
+
         cents[debtor] += amount_cents
         cents[creditor] -= amount_cents
-        
+
         if cents[debtor] == 0:
             del cents[debtor]
         if creditor in cents and cents[creditor] == 0:
             del cents[creditor]
-    
+
+    return transactions
+
+
+def _simplify_debts_heap(cents: dict[int, int]) -> list[tuple[int, int, float]]:
+    """
+    Greedy settlement using a debtor min-heap and a creditor max-heap. O(n log n).
+
+    Heap entries carry the balance's insertion position as tie-breaker, so the
+    debtor/creditor picked on each step is the same one the scan would pick and
+    the output matches _simplify_debts_scan transaction for transaction.
+    """
+    debtors = []
+    creditors = []
+    for position, (uid, bal) in enumerate(cents.items()):
+        if bal < 0:
+            debtors.append((bal, position, uid))
+        else:
+            creditors.append((-bal, position, uid))
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    transactions = []
+    while debtors and creditors:
+        debt, debtor_position, debtor = debtors[0]
+        credit, creditor_position, creditor = creditors[0]
+        amount_cents = min(-debt, -credit)
+
+        transactions.append((debtor, creditor, amount_cents / 100))
+
+        if debt + amount_cents == 0:
+            heapq.heappop(debtors)
+        else:
+            heapq.heapreplace(debtors, (debt + amount_cents, debtor_position, debtor))
+        if credit + amount_cents == 0:
+            heapq.heappop(creditors)
+        else:
+            heapq.heapreplace(
+                creditors, (credit + amount_cents, creditor_position, creditor)
+            )
+
+    return transactions
+
+
+def simplify_debts(balances: dict[int, float]) -> list[tuple[int, int, float]]:
+    """Simplifies debts to minimize transactions."""
+    return _simplify_debts_heap(_to_cents(balances))
+
+
+def _pair_opposite_balances(cents: dict[int, int]) -> list[list[int]]:
+    """Pairs up balances that exactly cancel each other out (x and -x)."""
+    unmatched: dict[int, list[int]] = {}
+    pairs = []
+    for uid, bal in cents.items():
+        if matches := unmatched.get(-bal):
+            pairs.append([matches.pop(0), uid])
+        else:
+            unmatched.setdefault(bal, []).append(uid)
+    return pairs
+
+
+def _zero_sum_partition(uids: list[int], values: list[int]) -> list[list[int]]:
+    """
+    Partitions balances into the largest number of zero-sum subgroups.
+
+    dp[mask] holds the most zero-sum subgroups an ordering of the balances in
+    mask can be cut into, so the best partition is read back by walking the
+    masks from the full set and cutting wherever the running sum hits zero.
+    """
+    size = 1 << len(values)
+    sums = [0] * size
+    dp = [0] * size
+    for mask in range(1, size):
+        low_bit = mask & -mask
+        sums[mask] = sums[mask ^ low_bit] + values[low_bit.bit_length() - 1]
+        best = 0
+        bits = mask
+        while bits:
+            bit = bits & -bits
+            best = max(best, dp[mask ^ bit])
+            bits ^= bit
+        dp[mask] = best + (sums[mask] == 0)
+
+    order = []
+    mask = size - 1
+    while mask:
+        target = dp[mask] - (sums[mask] == 0)
+        bits = mask
+        while bits:
+            bit = bits & -bits
+            if dp[mask ^ bit] == target:
+                break
+            bits ^= bit
+        order.append(bit.bit_length() - 1)
+        mask ^= bit
+
+    subgroups: list[list[int]] = [[]]
+    running = 0
+    for index in reversed(order):
+        subgroups[-1].append(uids[index])
+        running += values[index]
+        if running == 0:
+            subgroups.append([])
+    return [group for group in subgroups if group]
+
+
+def simplify_debts_optimal(
+    balances: dict[int, float],
+    max_size: int = OPTIMAL_SETTLEMENT_MAX_SIZE,
+) -> list[tuple[int, int, float]]:
+    """
+    Simplifies debts using the minimum number of transactions.
+
+    A group of n balances that splits into k zero-sum subgroups can be settled
+    with n - k transactions, so the balances are partitioned into as many
+    zero-sum subgroups as possible and each one is settled greedily. Exactly
+    opposite balances are paired up first; if more than max_size balances
+    remain, the rest are settled greedily as a single subgroup.
+    """
+    cents = _to_cents(balances)
+    subgroups = _pair_opposite_balances(cents)
+    paired = {uid for pair in subgroups for uid in pair}
+    remaining = [uid for uid in cents if uid not in paired]
+
+    if len(remaining) > max_size:
+        subgroups.append(remaining)
+    elif remaining:
+        subgroups.extend(
+            _zero_sum_partition(remaining, [cents[uid] for uid in remaining])
+        )
+
+    transactions = []
+    for subgroup in subgroups:
+        transactions.extend(
+            _simplify_debts_heap({uid: cents[uid] for uid in subgroup})
+        )
     return transactions
 
 
@@ -30,12 +181,37 @@ def update_debts(balances: dict[int, dict[str, float]], group_id: int | None = N
     totals = {uid: bal[TOTAL] for uid, bal in balances.items()}
     
     if group_id:
-        for uid, bal in totals.items():
-            if bal != 0:
-                GroupBalance.update_balance(uid, group_id, bal)
+        GroupBalance.apply_deltas(group_id, totals)
     else:
-        for debtor, creditor, amount in simplify_debts(totals):
-            Debt.update(debtor, creditor, amount)
+        Debt.apply_many(simplify_debts(totals))
+
+
+def update_debts_many(
+    expenses: Iterable[tuple[dict[int, dict[str, float]], int | None]],
+) -> None:
+    """
+    Same as calling update_debts for each (balances, group_id) pair, but every
+    debt and group balance is touched once for the whole batch.
+
+    Each expense is still simplified on its own, so the resulting debts match
+    submitting the expenses one by one.
+    """
+    transactions = []
+    group_cents: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    for balances, group_id in expenses:
+        totals = {uid: bal[TOTAL] for uid, bal in balances.items()}
+        if group_id:
+            for uid, total in totals.items():
+                group_cents[group_id][uid] += round(total * 100)
+        else:
+            transactions.extend(simplify_debts(totals))
+
+    Debt.apply_many(transactions)
+    for group_id, cents in group_cents.items():
+        GroupBalance.apply_deltas(
+            group_id, {uid: amount / 100 for uid, amount in cents.items()}
+        )
 
 
 def get_debts_total_balance(lender_debts: list[Debt], borrower_debts: list[Debt]) -> float:
@@ -0,0 +1,55 @@
+import hashlib
+
+from flask import Response, make_response, request, session
+from flask_login import current_user
+
+from app.model.expense import Expense
+from app.model.group import Group
+from app.model.user import User
+
+
+def make_etag(*parts: object) -> str:
+    """Opaque tag of the given parts, which must identify the page's content."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def user_etag(user: User) -> str:
+    """Tag of the user's own pages, changed by every commit that touches the user."""
+    return make_etag("user", user.id, user.version)
+
+
+def group_etag(group: Group) -> str:
+    """
+    Tag of a group's pages as seen by the current user, changed by every
+    commit that touches the group or the user.
+    """
+    return make_etag("group", group.id, group.version, current_user.id, current_user.version)
+
+
+def expense_etag(expense: Expense) -> str:
+    """Tag of an expense's page as seen by the current user."""
+    return make_etag("expense", expense.id, expense.updated_at, current_user.id)
+
+
+def not_modified(etag: str) -> Response | None:
+    """
+    Returns a 304 response when the request's If-None-Match holds the tag,
+    so the caller can skip building the page. Never when a message has been
+    flashed for the page, since the cached copy would not show it.
+    """
+    if "_flashes" in session or not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response("", 304)
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def with_etag(body: str | Response, etag: str) -> Response:
+    """
+    Wraps a rendered page, or a response, in a response carrying its tag. Clients must
+    revalidate before reusing it, since pages are private to the user.
+    """
+    response = make_response(body)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -1,5 +1,9 @@
 from dataclasses import dataclass
+from datetime import datetime
 from flask_login import login_required, current_user
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+from app.database import db
 from app.model.expense import Expense, ExpenseCategory
 from app.model.debt import Debt
 from app.split import SplitType
@@ -16,6 +20,8 @@ class ExpenseData:
     owers: dict[int, float | None]
     group_id: int | None
     creator_id: int
+    # Only set for historical expenses, new ones are created now
+    created_at: datetime | None = None
 
 
 
@@ -39,17 +45,42 @@ def get_authorized_expense(expense_id: int, user) -> Expense | None:
 
 
 
-def prepare_all_debts_data() -> dict:
-    """Prepares debts overview data."""
+def prepare_all_debts_data(after_id: int | None = None, limit: int = 50) -> dict:
+    """
+    Prepares debts overview data.
+    Totals are aggregated in SQL and debts are listed one page at a time,
+    ordered by id and starting after after_id.
+    """
     try:
-        all_debts = Debt.query.all()
-        active_debts = [d for d in all_debts if d.amount > 0]
+        total_debts, active_count, total_amount = db.session.execute(
+            select(
+                func.count(Debt.id),
+                func.count(Debt.id).filter(Debt.amount > 0),
+                func.coalesce(func.sum(Debt.amount).filter(Debt.amount > 0), 0.0),
+            )
+        ).one()
+
+        query = (
+            select(Debt)
+            .options(joinedload(Debt.low), joinedload(Debt.high))
+            .order_by(Debt.id)
+            .limit(limit + 1)
+        )
+        if after_id is not None:
+            query = query.where(Debt.id > after_id)
+        debts = list(db.session.scalars(query))
+        next_cursor = debts[limit - 1].id if len(debts) > limit else None
+        debts = debts[:limit]
+
         return {
             "success": True,
-            "debts": all_debts,
-            "active_debts": active_debts,
-            "total_debts": len(all_debts),
-            "total_amount": sum(d.amount for d in active_debts),
+            "debts": debts,
+            "active_debts": [d for d in debts if d.amount > 0],
+            "total_debts": total_debts,
+            "active_count": active_count,
+            "total_amount": round(total_amount, 2),
+            "next_cursor": next_cursor,
+            "limit": limit,
         }
     except Exception as e:
         return {
@@ -58,7 +89,10 @@ def prepare_all_debts_data() -> dict:
             "debts": [],
             "active_debts": [],
             "total_debts": 0,
+            "active_count": 0,
             "total_amount": 0,
+            "next_cursor": None,
+            "limit": limit,
         }
 
 
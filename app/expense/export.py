@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from enum import Enum
+
+from flask import Response, stream_with_context
+from sqlalchemy import Select, exists, select
+
+from app.database import db
+from app.model.balance import Balance
+from app.model.expense import Expense, expense_users
+from app.model.user import User
+
+DEFAULT_BATCH_SIZE = 1000
+# Encoded rows are sent in pieces of about this many characters
+CHUNK_SIZE = 64 * 1024
+
+COLUMNS = (
+    Expense.id.label("expense_id"),
+    Expense.created_at,
+    Expense.group_id,
+    Expense.creator_id,
+    Expense.description,
+    Expense.category,
+    Expense.amount,
+    Expense.payers_split,
+    Expense.owers_split,
+    Balance.user_id,
+    User.username,
+    Balance.payed,
+    Balance.owed,
+    Balance.total,
+)
+FIELDS = tuple(column.key for column in COLUMNS)
+
+
+def export_query(user_id: int | None = None, group_id: int | None = None) -> Select:
+    """
+    One row per balance of every expense, oldest first, with the expense and
+    the user it belongs to. Optionally only the expenses of a user or a group.
+    """
+    query = (
+        select(*COLUMNS)
+        .join(Expense, Balance.expense_id == Expense.id)
+        .join(User, Balance.user_id == User.id)
+    )
+    if user_id is not None:
+        query = query.where(
+            exists().where(
+                expense_users.c.expense_id == Expense.id,
+                expense_users.c.user_id == user_id,
+            )
+        )
+    if group_id is not None:
+        query = query.where(Expense.group_id == group_id)
+    return query.order_by(Expense.created_at, Expense.id, Balance.user_id)
+
+
+def iter_rows(query: Select, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[tuple]:
+    """
+    Rows of the query fetched batch_size at a time from a server-side cursor,
+    so memory does not grow with the number of rows exported.
+    """
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield from (_plain(row) for row in partition)
+
+
+def _plain(row) -> tuple:
+    return tuple(
+        value.value
+        if isinstance(value, Enum)
+        else value.isoformat() if isinstance(value, datetime) else value
+        for value in row
+    )
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    """CSV lines of the rows, header first, in chunks of about CHUNK_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(FIELDS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterable[tuple]) -> Iterator[str]:
+    """One JSON object per row and line, in chunks of about CHUNK_SIZE."""
+    lines: list[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(FIELDS, row))) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines)
+            lines, size = [], 0
+    if lines:
+        yield "".join(lines)
+
+
+FORMATS: dict[str, tuple[Callable[[Iterable[tuple]], Iterator[str]], str]] = {
+    "csv": (iter_csv, "text/csv"),
+    "jsonl": (iter_jsonl, "application/x-ndjson"),
+}
+
+
+def export_expenses(
+    format: str,
+    user_id: int | None = None,
+    group_id: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[str]:
+    """
+    Streams the expenses of a user or group, or every expense, as CSV or
+    JSON lines. Raises ValueError for an unknown format.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format: {format}. Use one of {', '.join(FORMATS)}.")
+    encode, _ = FORMATS[format]
+    return encode(iter_rows(export_query(user_id, group_id), batch_size))
+
+
+def export_response(
+    filename: str, format: str, user_id: int | None = None, group_id: int | None = None
+) -> Response:
+    """Download of the exported expenses, streamed while the rows are read."""
+    _, mimetype = FORMATS[format]
+    return Response(
+        stream_with_context(export_expenses(format, user_id, group_id)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
@@ -0,0 +1,143 @@
+import csv
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import IO
+
+from app.expense import ExpenseData
+from app.expense.mapper import map_json_to_expense_data
+from app.expense.submit import submit_expenses
+from app.expense.validation import validate_expense_data, validate_references
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class ImportStats:
+    """Progress of an import, updated after every chunk."""
+
+    read: int = 0
+    imported: int = 0
+    errors: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Imported expenses per second."""
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+def _parse_csv_users(value: str) -> list[dict]:
+    """Reads users written as "id" or "id:amount", separated by semicolons."""
+    users = []
+    for item in filter(None, (item.strip() for item in value.split(";"))):
+        user_id, _, amount = item.partition(":")
+        users.append({"user_id": user_id, "amount": amount or None})
+    return users
+
+
+def read_csv(file: IO[str]) -> Iterator[dict]:
+    """
+    Expenses in a CSV with a header of the fields of the JSON format. Payers
+    and owers are written as "1:30;2:70", or "1;2" for equal splits.
+    """
+    for row in csv.DictReader(file):
+        row["payers"] = _parse_csv_users(row.get("payers") or "")
+        row["owers"] = _parse_csv_users(row.get("owers") or "")
+        # Empty cells take the defaults of the JSON format
+        yield {key: value for key, value in row.items() if value != ""}
+
+
+def read_jsonl(file: IO[str]) -> Iterator[str]:
+    """
+    Expenses in the JSON format of the batch endpoint, one per line. Lines
+    are decoded by parse_expense, so a malformed one only skips its row.
+    """
+    for line in file:
+        if line.strip():
+            yield line
+
+
+READERS: dict[str, Callable[[IO[str]], Iterator[dict | str]]] = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+}
+
+
+def parse_expense(row: dict | str) -> ExpenseData:
+    """
+    Maps an imported row, which also holds its creator and may hold its
+    creation date. Raises KeyError, TypeError or ValueError if malformed.
+    """
+    if isinstance(row, str):
+        row = json.loads(row)
+    if not isinstance(row, dict):
+        raise TypeError(f"Expected an object, got {type(row).__name__}")
+    data = map_json_to_expense_data(row, int(row["creator_id"]))
+    if created_at := row.get("created_at"):
+        data.created_at = datetime.fromisoformat(created_at)
+    return data
+
+
+def _chunks(
+    rows: Iterable[dict | str], size: int
+) -> Iterator[list[tuple[int, dict | str]]]:
+    numbered = enumerate(rows, start=1)
+    while chunk := list(islice(numbered, size)):
+        yield chunk
+
+
+def import_expenses(
+    file: IO[str],
+    format: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """
+    Imports the expenses of a CSV or JSON lines file, chunk_size at a time.
+
+    Each chunk is validated with the rules of ExpenseForm, split, and written
+    by submit_expenses: its debt and group balance changes are summed in
+    memory and its expenses, balances and users are bulk inserted. Invalid
+    rows are skipped and reported in the returned stats by row number.
+    Every chunk is committed, so memory does not grow with the file.
+    """
+    if format not in READERS:
+        raise ValueError(
+            f"Unknown import format: {format}. Use one of {', '.join(READERS)}."
+        )
+
+    stats = ImportStats()
+    for chunk in _chunks(READERS[format](file), chunk_size):
+        stats.read += len(chunk)
+        valid: list[tuple[int, ExpenseData]] = []
+        errors: dict[int, list[str]] = {}
+        for number, row in chunk:
+            try:
+                data = parse_expense(row)
+                row_errors = validate_expense_data(data)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                errors[number] = [f"Malformed expense: {e!r}"]
+                continue
+            if row_errors:
+                errors[number] = row_errors
+                continue
+            valid.append((number, data))
+
+        invalid = validate_references(valid)
+        errors |= invalid
+        for number in sorted(errors):
+            stats.errors += [f"Row {number}: {error}" for error in errors[number]]
+
+        submit_expenses([data for number, data in valid if number not in invalid])
+        stats.imported += len(valid) - len(invalid)
+        if progress:
+            progress(stats)
+    return stats
@@ -1,6 +1,8 @@
 from flask_login import current_user
 
 from app.model.balance import Balance
+from app.model.expense import ExpenseCategory
+from app.split import SplitType
 from app.split.constants import OWED, PAYED, TOTAL
 from app.expense import ExpenseData
 from app.expense.forms import ExpenseForm
@@ -20,6 +22,34 @@ def map_form_to_expense_data(form: ExpenseForm) -> ExpenseData:
     )
 
 
+def _map_json_users(users: list[dict]) -> dict[int, float | None]:
+    return {
+        int(user["user_id"]): (
+            float(user["amount"]) if user.get("amount") is not None else None
+        )
+        for user in users
+    }
+
+
+def map_json_to_expense_data(data: dict, creator_id: int) -> ExpenseData:
+    """
+    Maps an expense in the JSON format of the batch endpoint, with the same
+    fields as ExpenseForm. Raises KeyError, TypeError or ValueError if malformed.
+    """
+    group_id = data.get("group_id")
+    return ExpenseData(
+        amount=float(data["amount"]),
+        description=data.get("description") or "",
+        category=ExpenseCategory.coerce(data.get("category", ExpenseCategory.OTHER)),
+        payers_split=SplitType.coerce(data.get("payers_split", SplitType.EQUALLY)),
+        owers_split=SplitType.coerce(data.get("owers_split", SplitType.EQUALLY)),
+        payers=_map_json_users(data["payers"]),
+        owers=_map_json_users(data["owers"]),
+        group_id=int(group_id) if group_id is not None else None,
+        creator_id=creator_id,
+    )
+
+
 def map_balances_to_model(balances: dict[int, dict[str, float]]) -> list[Balance]:
     return [
         Balance.create(user_id=uid, owed=bal[OWED], payed=bal[PAYED], total=bal[TOTAL])
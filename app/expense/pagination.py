@@ -0,0 +1,116 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.orm import joinedload
+
+from app.database import db
+from app.model.expense import Expense, expense_users
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+Cursor = tuple[datetime, int]
+# Execution option of a query with the (created_at, expense id) columns to page on
+PAGINATION_KEY = "pagination_key"
+
+
+@dataclass
+class ExpensePage:
+    """One page of expenses, newest first, and the cursor of the next page."""
+
+    expenses: list[Expense]
+    next_cursor: str | None
+
+
+def encode_cursor(expense: Expense) -> str:
+    """Opaque cursor pointing right after the given expense."""
+    key = f"{expense.created_at.isoformat()}|{expense.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Raises ValueError if the cursor is malformed."""
+    try:
+        created_at, expense_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(expense_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_limit(args) -> int:
+    """Reads the ?limit= query parameter. Raises ValueError if malformed."""
+    limit = args.get("limit", DEFAULT_PAGE_SIZE)
+    if not str(limit).isdigit() or int(limit) < 1:
+        raise ValueError("Limit must be a positive integer.")
+    return min(int(limit), MAX_PAGE_SIZE)
+
+
+def parse_page_args(args) -> tuple[Cursor | None, int]:
+    """
+    Reads the ?cursor= and ?limit= query parameters.
+    Raises ValueError if either is malformed.
+    """
+    cursor = args.get("cursor")
+    limit = parse_limit(args)
+    return (decode_cursor(cursor) if cursor else None), limit
+
+
+def paginate_expenses(
+    query: Select, cursor: Cursor | None = None, limit: int | None = DEFAULT_PAGE_SIZE
+) -> ExpensePage:
+    """
+    Keyset pagination on (created_at, id), newest first. Each page is an index
+    range scan that starts after the cursor, so its cost does not depend on how
+    many pages come before it. A limit of None returns every remaining expense.
+    The columns are those of Expense, unless the query sets others in its
+    PAGINATION_KEY execution option.
+    """
+    created_at_column, id_column = query.get_execution_options().get(
+        PAGINATION_KEY, (Expense.created_at, Expense.id)
+    )
+    if cursor:
+        created_at, expense_id = cursor
+        query = query.where(
+            or_(
+                created_at_column < created_at,
+                and_(created_at_column == created_at, id_column < expense_id),
+            )
+        )
+    query = query.order_by(created_at_column.desc(), id_column.desc())
+    if limit is None:
+        return ExpensePage(list(db.session.scalars(query)), None)
+
+    expenses = list(db.session.scalars(query.limit(limit + 1)))
+    if len(expenses) <= limit:
+        return ExpensePage(expenses, None)
+    return ExpensePage(expenses[:limit], encode_cursor(expenses[limit - 1]))
+
+
+def user_expenses_query(user_id: int, group_id: int | None = None) -> Select:
+    """
+    Expenses of a user, optionally only those of a group. Pages on the
+    created_at copied into expense_users, so that each one is a range scan of
+    the user's (user_id, created_at, expense_id) index entries.
+    """
+    query = (
+        select(Expense)
+        .join(expense_users, expense_users.c.expense_id == Expense.id)
+        .where(expense_users.c.user_id == user_id)
+        .execution_options(
+            **{PAGINATION_KEY: (expense_users.c.created_at, expense_users.c.expense_id)}
+        )
+    )
+    if group_id is not None:
+        query = query.where(Expense.group_id == group_id)
+    return query.options(joinedload(Expense.creator), joinedload(Expense.group))
+
+
+def group_expenses_query(group_id: int) -> Select:
+    """Expenses of a group."""
+    return (
+        select(Expense)
+        .where(Expense.group_id == group_id)
+        .options(joinedload(Expense.creator))
+    )
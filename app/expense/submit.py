@@ -1,10 +1,15 @@
+from flask import current_app
 from flask_login import current_user
+from sqlalchemy import insert
 
+from app.cache import invalidate
 from app.database import db
-from app.model.expense import Expense
+from app.model.balance import Balance
+from app.model.expense import Expense, expense_users
 from app.expense.mapper import ExpenseData, map_balances_to_model
-from app.split import split
-from app.debt import update_debts
+from app.split import RemainderStrategy, split
+from app.split.constants import OWED, PAYED, TOTAL
+from app.debt import update_debts, update_debts_many
 from app.user import update_expense_in_users
 
 
@@ -21,12 +26,98 @@ def create_expense(data: ExpenseData, balances: dict[int, dict[str, float]]) ->
     )
 
 
-def submit_expense(data: ExpenseData) -> Expense:
-    balances = split(
-        data.amount, data.payers, data.owers, data.payers_split, data.owers_split
+def get_remainder_strategy() -> RemainderStrategy:
+    return RemainderStrategy.coerce(
+        current_app.config.get("SPLIT_REMAINDER_STRATEGY", RemainderStrategy.LARGEST_REMAINDER)
+    )
+
+
+def split_expense(data: ExpenseData, remainder: RemainderStrategy) -> dict[int, dict[str, float]]:
+    return split(
+        data.amount,
+        data.payers,
+        data.owers,
+        data.payers_split,
+        data.owers_split,
+        remainder,
+    )
+
+
+def invalidate_expense(data: ExpenseData, balances: dict[int, dict[str, float]]) -> None:
+    """Marks the users and the group of an expense as changed by the transaction."""
+    invalidate(
+        users=balances.keys() | {data.creator_id},
+        groups=[data.group_id] if data.group_id is not None else [],
     )
+
+
+def submit_expense(data: ExpenseData) -> Expense:
+    balances = split_expense(data, get_remainder_strategy())
+    invalidate_expense(data, balances)
     update_debts(balances, data.group_id)
     expense = create_expense(data, balances)
     update_expense_in_users(expense)
     db.session.commit()
     return expense
+
+
+def submit_expenses(expenses: list[ExpenseData], commit: bool = True) -> list[Expense]:
+    """
+    Submits many expenses as a single unit of work.
+
+    Every expense is split first, then the debt and group balance changes of the
+    whole batch are applied at once. Expenses are written in a single flush and
+    their balances and users with one bulk insert each.
+    """
+    if not expenses:
+        return []
+
+    remainder = get_remainder_strategy()
+    splits = [split_expense(data, remainder) for data in expenses]
+    for data, balances in zip(expenses, splits):
+        invalidate_expense(data, balances)
+    update_debts_many(
+        (balances, data.group_id) for data, balances in zip(expenses, splits)
+    )
+
+    models = [
+        Expense(
+            amount=data.amount,
+            description=data.description,
+            creator_id=data.creator_id,
+            category=data.category,
+            payers_split=data.payers_split,
+            owers_split=data.owers_split,
+            group_id=data.group_id,
+        )
+        for data in expenses
+    ]
+    for expense, data in zip(models, expenses):
+        if data.created_at is not None:
+            expense.created_at = data.created_at
+    db.session.add_all(models)
+    db.session.flush()
+
+    balance_rows, user_rows = [], []
+    for expense, balances in zip(models, splits):
+        for uid, bal in balances.items():
+            balance_rows.append(
+                {
+                    "expense_id": expense.id,
+                    "user_id": uid,
+                    "owed": bal[OWED],
+                    "payed": bal[PAYED],
+                    "total": bal[TOTAL],
+                }
+            )
+        for uid in balances.keys() | {expense.creator_id}:
+            user_rows.append(
+                {"expense_id": expense.id, "user_id": uid, "created_at": expense.created_at}
+            )
+
+    db.session.execute(insert(Balance), balance_rows)
+    db.session.execute(insert(expense_users), user_rows)
+
+    if commit:
+        db.session.commit()
+    return models
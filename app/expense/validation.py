@@ -0,0 +1,124 @@
+import math
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.database import db
+from app.expense import ExpenseData
+from app.model.group import Group, group_members
+from app.model.user import User
+from app.split import SplitType
+
+
+def _has_max_decimals(value: float, max: int) -> bool:
+    exponent = Decimal(str(value)).as_tuple().exponent
+    # NaN and infinities have a letter for exponent
+    return isinstance(exponent, int) and exponent >= -max
+
+
+def _validate_users(
+    label: str, users: dict[int, float | None], split_type: SplitType, amount: float
+) -> list[str]:
+    if not users:
+        return [f"{label}: This field is required."]
+
+    errors = []
+    for user_id, user_amount in users.items():
+        if not user_id:
+            errors.append(f"{label}: User ID is required.")
+        if user_amount is None:
+            continue
+        if not math.isfinite(user_amount):
+            errors.append(f"{label}: Number must be finite.")
+        elif user_amount < 0:
+            errors.append(f"{label}: Number must be at least 0.")
+        elif not _has_max_decimals(user_amount, 2):
+            errors.append(f"{label}: Amount must have at most 2 decimal places.")
+
+    if split_type == SplitType.EQUALLY:
+        return errors
+
+    amounts = [user_amount for user_amount in users.values() if user_amount is not None]
+    if len(amounts) < len(users):
+        errors.append(f"{label}: Amount is required for {split_type.value} splits.")
+        return errors
+    if not all(map(math.isfinite, amounts)):
+        return errors
+
+    total = sum(amounts)
+    if split_type == SplitType.AMOUNT and total != amount:
+        errors.append(f"{label} total must equal to the expense total.")
+    elif split_type == SplitType.PERCENTAGE and total != 100:
+        errors.append(f"{label} percentages must sum to 100.")
+    return errors
+
+
+def validate_expense_data(data: ExpenseData) -> list[str]:
+    """
+    Validates expense data with the same rules as ExpenseForm, for expenses
+    that do not come from a form. Returns the list of errors, empty if valid.
+    """
+    errors = []
+
+    if not data.amount:
+        errors.append("Amount: This field is required.")
+    elif not math.isfinite(data.amount):
+        errors.append("Amount: Number must be finite.")
+    elif data.amount < 0:
+        errors.append("Amount: Number must be at least 0.")
+    elif not _has_max_decimals(data.amount, 2):
+        errors.append("Amount: Amount must have at most 2 decimal places.")
+
+    if not data.description:
+        errors.append("Description: This field is required.")
+
+    errors += _validate_users("Payers", data.payers, data.payers_split, data.amount)
+    errors += _validate_users("Owers", data.owers, data.owers_split, data.amount)
+
+    if len(data.payers) == 1 and data.payers.keys() == data.owers.keys():
+        errors.append("Single user cannot be both a payer and an ower.")
+
+    return errors
+
+
+def validate_references(expenses: list[tuple[int, ExpenseData]]) -> dict[int, list[str]]:
+    """
+    Checks that the users and groups of numbered expenses exist and that group
+    expenses only involve members. Takes three queries whatever the number of
+    expenses. Returns the errors by expense number.
+    """
+    user_ids = set()
+    group_ids = set()
+    for _, data in expenses:
+        user_ids |= data.payers.keys() | data.owers.keys() | {data.creator_id}
+        if data.group_id is not None:
+            group_ids.add(data.group_id)
+
+    known_users = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+    members: dict[int, set[int]] = {
+        group_id: set()
+        for group_id in db.session.scalars(select(Group.id).where(Group.id.in_(group_ids)))
+    }
+    for user_id, group_id in db.session.execute(
+        select(group_members.c.user_id, group_members.c.group_id).where(
+            group_members.c.group_id.in_(members)
+        )
+    ):
+        members[group_id].add(user_id)
+
+    errors: dict[int, list[str]] = {}
+    for number, data in expenses:
+        participants = data.payers.keys() | data.owers.keys()
+        row_errors = [
+            f"Unknown user {user_id}."
+            for user_id in sorted((participants | {data.creator_id}) - known_users)
+        ]
+        if data.group_id is not None:
+            if data.group_id not in members:
+                row_errors.append(f"Unknown group {data.group_id}.")
+            elif outsiders := participants - members[data.group_id]:
+                users = ", ".join(map(str, sorted(outsiders)))
+                row_errors.append(f"Users {users} are not in group {data.group_id}.")
+        if row_errors:
+            errors[number] = row_errors
+    return errors
@@ -1,11 +1,14 @@
 from werkzeug import Response
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
-from app.expense import get_authorized_expense, prepare_all_debts_data
-from app.expense.mapper import map_form_to_expense_data
-from app.expense.submit import submit_expense
+from app.expense import ExpenseData, get_authorized_expense, prepare_all_debts_data
+from app.expense.mapper import map_form_to_expense_data, map_json_to_expense_data
+from app.expense.submit import submit_expense, submit_expenses
+from app.expense.validation import validate_expense_data, validate_references
+from app.expense.pagination import parse_limit
 from app.expense.forms import ExpenseForm
 from app.group import get_authorized_group
+from app.etag import expense_etag, not_modified, with_etag
 
 
 bp = Blueprint("expense", __name__)
@@ -57,6 +60,47 @@ def expenses_post() -> str | Response:
     return redirect(url_for("expense.expenses_get"))
 
 
+@bp.route("/expenses/batch", methods=["POST"])
+@login_required
+def expenses_batch_post() -> tuple[Response, int]:
+    """Create many expenses from a JSON body {"expenses": [...]} in one transaction."""
+    payload = request.get_json(silent=True)
+    items = payload.get("expenses") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"errors": {"expenses": ["A non-empty list is required."]}}), 400
+
+    group_ids = {group.id for group in current_user.groups}
+    expenses: list[tuple[int, ExpenseData]] = []
+    errors: dict[int, list[str]] = {}
+    for index, item in enumerate(items):
+        try:
+            data = map_json_to_expense_data(item, int(current_user.get_id()))
+        except KeyError as e:
+            errors[index] = [f"Malformed expense: missing {e.args[0]}."]
+            continue
+        except (TypeError, ValueError, AttributeError) as e:
+            errors[index] = [f"Malformed expense: {str(e)}"]
+            continue
+        item_errors = validate_expense_data(data)
+        if data.group_id is not None and data.group_id not in group_ids:
+            item_errors.append("You don't have access to this group.")
+        if item_errors:
+            errors[index] = item_errors
+        expenses.append((index, data))
+    for index, reference_errors in validate_references(expenses).items():
+        errors.setdefault(index, []).extend(reference_errors)
+
+    if errors:
+        return jsonify({"errors": errors}), 400
+
+    try:
+        created = submit_expenses([data for _, data in expenses])
+    except Exception as e:
+        return jsonify({"errors": {"expenses": [f"Error creating expenses: {str(e)}"]}}), 500
+
+    return jsonify({"expenses": [{"id": expense.id} for expense in created]}), 201
+
+
 @bp.route("/expenses/<int:expense_id>", methods=["GET"])
 @login_required
 def expense_summary(expense_id):
@@ -66,7 +110,10 @@ def expense_summary(expense_id):
         flash("Expense not found or access denied.", "danger")
         return redirect(url_for("user.expenses"))
 
-    return render_template("expense/summary.html", expense=expense)
+    etag = expense_etag(expense)
+    if response := not_modified(etag):
+        return response
+    return with_etag(render_template("expense/summary.html", expense=expense), etag)
 
 
 @bp.route("/success")
@@ -77,7 +124,13 @@ def success():
 @bp.route("/debts", methods=["GET"])
 @login_required
 def debts() -> str | Response:
-    data = prepare_all_debts_data()
+    try:
+        limit = parse_limit(request.args)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("expense.debts"))
+
+    data = prepare_all_debts_data(request.args.get("cursor", type=int), limit)
     if not data["success"]:
         flash(data["message"], "danger")
     return render_template("expense/debts.html", **data)
@@ -1,5 +1,6 @@
+from flask import current_app
 from flask_login import current_user
-from app.debt import simplify_debts
+from app.debt import simplify_debts, simplify_debts_optimal
 from app.model import Debt, User, Expense
 from app.model.group_balance import GroupBalance
 from app.model.group import Group
@@ -7,7 +8,9 @@ from app.split.constants import OWED, PAYED, TOTAL
 from app.expense import ExpenseData
 from app.model.expense import ExpenseCategory
 from app.split import SplitType
-from app.expense.submit import submit_expense
+from app.expense.submit import submit_expenses
+from app.expense.pagination import DEFAULT_PAGE_SIZE, paginate_expenses, user_expenses_query
+from app.cache import cached_for_group, invalidate
 from app.database import db
 
 
@@ -66,12 +69,11 @@ def get_no_group_user_balances(
 def get_group_user_expenses(
     user: User,
     group_id: int,
+    limit: int | None = None,
 ) -> list[Expense]:
-    return sorted(
-        [expense for expense in user.expenses if (expense.group_id == group_id)],
-        key=lambda e: e.created_at,
-        reverse=True,
-    )
+    """Returns the user's expenses in the group, newest first, up to limit if given."""
+    query = user_expenses_query(user.id, group_id)
+    return paginate_expenses(query, limit=limit).expenses
 
 
 def get_group_user_balances(group: Group) -> dict[User, float]:
@@ -79,18 +81,30 @@ def get_group_user_balances(group: Group) -> dict[User, float]:
     Returns a dictionary of users and their balances in the group.
     The balance is retrieved from the GroupBalance model.
     Users without a GroupBalance record are assumed to have zero balance.
+    Cached by user id until the group's balances change.
     """
-    user_balances: dict[User, float] = {}
+    balances = cached_for_group(
+        "group_user_balances", group.id, lambda: _compute_group_user_balances(group)
+    )
+    users = {user.id: user for user in group.users}
+    return {
+        users.get(user_id) or db.session.get_one(User, user_id): balance
+        for user_id, balance in balances
+    }
+
+
+def _compute_group_user_balances(group: Group) -> list[tuple[int, float]]:
+    user_balances: dict[int, float] = {}
 
     # Initialize all group users with zero balance
     for user in group.users:
-        user_balances[user] = 0.0
+        user_balances[user.id] = 0.0
 
     # Update with actual balances from GroupBalance records
     for group_balance in group.group_balances:
-        user_balances[group_balance.user] = group_balance.balance
+        user_balances[group_balance.user_id] = group_balance.balance
 
-    return user_balances
+    return list(user_balances.items())
 
 
 def validate_user_in_group(group: Group, user_id: int) -> User | None:
@@ -113,19 +127,31 @@ def check_group_has_balances(group: Group) -> bool:
     return any(balance != 0 for balance in group_balances.values())
 
 
-def calculate_group_settlement_transactions(group: Group) -> list[dict]:
+def calculate_group_settlement_transactions(
+    group: Group, optimal: bool | None = None
+) -> list[dict]:
     """
     Calculates settlement transactions for settling all debts in a group.
     Returns a list of transaction dictionaries with debtor, creditor, amount, and description.
+
+    :param optimal: Use the minimum number of transactions instead of the greedy
+        settlement. Defaults to the OPTIMAL_SETTLEMENT config value.
     """
+    if optimal is None:
+        optimal = current_app.config.get("OPTIMAL_SETTLEMENT", False)
+
     group_balances = get_group_user_balances(group)
+    users = {user.id: user for user in group_balances}
     balance_dict = {user.id: balance for user, balance in group_balances.items()}
-    transactions = simplify_debts(balance_dict)
+    if optimal:
+        transactions = simplify_debts_optimal(balance_dict)
+    else:
+        transactions = simplify_debts(balance_dict)
 
     settlement_transactions = []
     for debtor_id, creditor_id, amount in transactions:
-        debtor = db.session.get(User, debtor_id)
-        creditor = db.session.get(User, creditor_id)
+        debtor = users[debtor_id]
+        creditor = users[creditor_id]
         settlement_transactions.append(
             {
                 "debtor": debtor,
@@ -212,16 +238,21 @@ def calculate_individual_settlement_transactions(
 
 
 def create_settlement_expenses_from_transactions(
-    settlement_transactions: list[dict], group_id: int, creator_id: int | None = None
+    settlement_transactions: list[dict],
+    group_id: int,
+    creator_id: int | None = None,
+    commit: bool = True,
 ) -> list[Expense]:
     """
-    Creates settlement expenses from a list of settlement transactions.
+    Creates settlement expenses from a list of settlement transactions in bulk.
     Returns a list of created Expense objects.
+
+    :param commit: Commit the settlement, pass False to extend the transaction.
     """
     if creator_id is None:
         creator_id = current_user.id
 
-    settlement_expenses = []
+    expenses_data = []
     for transaction in settlement_transactions:
         # Handle both formats: group settlement uses 'debtor'/'creditor', individual uses 'payer'/'receiver'
         payer = transaction.get("payer") or transaction.get("debtor")
@@ -241,19 +272,20 @@ def create_settlement_expenses_from_transactions(
             payers={payer.id: transaction["amount"]},
             owers={receiver.id: transaction["amount"]},
         )
+        expenses_data.append(expense_data)
 
-        settlement_expense = submit_expense(expense_data)
-        settlement_expenses.append(settlement_expense)
-
-    return settlement_expenses
+    return submit_expenses(expenses_data, commit=commit)
 
 
-def create_group_settlement_expenses(group: Group) -> list[Expense]:
+def create_group_settlement_expenses(
+    group: Group, optimal: bool | None = None
+) -> list[Expense]:
     """
-    Creates settlement expenses for settling all debts in a group.
+    Creates settlement expenses for settling all debts in a group and clears its
+    balances, all in a single transaction.
     Returns a list of created Expense objects.
     """
-    settlement_transactions = calculate_group_settlement_transactions(group)
+    settlement_transactions = calculate_group_settlement_transactions(group, optimal)
     # Use current_user.id if available, otherwise use the first user in the group
     creator_id = (
         current_user.id
@@ -261,16 +293,18 @@ def create_group_settlement_expenses(group: Group) -> list[Expense]:
         else (group.users[0].id if group.users else 1)
     )
     settlement_expenses = create_settlement_expenses_from_transactions(
-        settlement_transactions, group.id, creator_id
+        settlement_transactions, group.id, creator_id, commit=False
     )
 
     # Clear all group balances after settlement
-    GroupBalance.clear_group_balances(group.id)
+    GroupBalance.clear_group_balances(group.id, commit=False)
+    invalidate(users=[user.id for user in group.users], groups=[group.id])
+    db.session.commit()
 
     return settlement_expenses
 
 
-def handle_settle_debts_process(group: Group) -> dict:
+def handle_settle_debts_process(group: Group, optimal: bool | None = None) -> dict:
     """
     Handles the business logic for processing debt settlement for an entire group.
     Returns a dictionary with the result status and data.
@@ -282,7 +316,7 @@ def handle_settle_debts_process(group: Group) -> dict:
             "message_type": "info",
         }
 
-    settlement_expenses = create_group_settlement_expenses(group)
+    settlement_expenses = create_group_settlement_expenses(group, optimal)
 
     return {
         "success": True,
@@ -352,13 +386,13 @@ def handle_individual_balance_process(group: Group, user_id: int) -> dict:
         current_user.id if current_user and current_user.is_authenticated else user_id
     )
     settlement_expenses = create_settlement_expenses_from_transactions(
-        settlement_transactions, group.id, creator_id
+        settlement_transactions, group.id, creator_id, commit=False
     )
 
     # Clear the user's balance after settlement to prevent precision errors
-    from app.model.group_balance import GroupBalance
-
-    GroupBalance.set_balance(user.id, group.id, 0.0)
+    GroupBalance.set_balance(user.id, group.id, 0.0, commit=False)
+    invalidate(users=[user.id], groups=[group.id])
+    db.session.commit()
 
     return {"success": True, "user": user, "settlement_expenses": settlement_expenses}
 
@@ -395,7 +429,10 @@ def handle_create_group(form_data: dict) -> dict:
         name=form_data["name"],
         users=users,
         description=form_data.get("description"),
+        commit=False,
     )
+    invalidate(users=[user.id for user in users], groups=[group.id])
+    db.session.commit()
 
     return {
         "success": True,
@@ -428,7 +465,9 @@ def prepare_group_overview_data(group: Group) -> dict:
     )
 
     # Get group expenses sorted by most recent
-    recent_expenses = get_group_user_expenses(current_user, group.id)
+    recent_expenses = get_group_user_expenses(
+        current_user, group.id, limit=DEFAULT_PAGE_SIZE
+    )
 
     return {
         "group": group,
@@ -461,7 +500,9 @@ def handle_add_users_to_group(group: Group, form_data: dict) -> dict:
     ).all()
 
     if users_to_add:
-        group.add_users(users_to_add)
+        group.add_users(users_to_add, commit=False)
+        invalidate(users=[user.id for user in users_to_add], groups=[group.id])
+        db.session.commit()
         usernames = [user.username for user in users_to_add]
         return {
             "success": True,
@@ -501,26 +542,25 @@ def prepare_group_balances_data(group: Group) -> dict:
     """
     # Get group balances for all users in the group
     group_balances = get_group_user_balances(group)
+    users = {user.id: user for user in group_balances}
 
-    # Sort balances from most negative to most positive
-    balances_by_amount = dict(
-        sorted(
-            group_balances.items(),
-            key=lambda item: item[1],
-        )
+    # Orders are cached as user ids until the group's balances change
+    by_amount, by_abs_amount = cached_for_group(
+        "group_balance_orders", group.id, lambda: _sort_group_balances(group_balances)
     )
 
+    # Sort balances from most negative to most positive
+    balances_by_amount = {
+        users[user_id]: group_balances[users[user_id]] for user_id in by_amount
+    }
+
     # Sort balances from most positive to most negative
     balances_by_amount_reversed = dict(reversed(balances_by_amount.items()))
 
     # Sort balances by absolute value descending
-    balances_by_abs_amount = dict(
-        sorted(
-            group_balances.items(),
-            key=lambda item: abs(item[1]),
-            reverse=True,
-        )
-    )
+    balances_by_abs_amount = {
+        users[user_id]: group_balances[users[user_id]] for user_id in by_abs_amount
+    }
 
     return {
         "group": group,
@@ -528,3 +568,17 @@ def prepare_group_balances_data(group: Group) -> dict:
         "balances": balances_by_amount,
         "balances_reversed": balances_by_amount_reversed,
     }
+
+
+def _sort_group_balances(
+    group_balances: dict[User, float],
+) -> tuple[list[int], list[int]]:
+    """User ids by balance ascending and by absolute balance descending."""
+    by_amount = sorted(group_balances.items(), key=lambda item: item[1])
+    by_abs_amount = sorted(
+        group_balances.items(), key=lambda item: abs(item[1]), reverse=True
+    )
+    return (
+        [user.id for user, _ in by_amount],
+        [user.id for user, _ in by_abs_amount],
+    )
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, render_template, redirect, url_for, flash
+from flask import Blueprint, jsonify, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from werkzeug import Response
 
@@ -18,6 +18,9 @@ from app.group import (
 )
 from app.group.forms import GroupForm, AddUserToGroupForm
 from app.expense.forms import ExpenseForm
+from app.expense.export import export_response
+from app.expense.pagination import group_expenses_query, paginate_expenses, parse_page_args
+from app.etag import group_etag, not_modified, with_etag
 
 
 bp = Blueprint("groups", __name__)
@@ -74,8 +77,11 @@ def get_group_overview(group_id):
     Displays the current user's total balance, debts, and recent expenses in the group.
     """
     if group := get_authorized_group(group_id):
+        etag = group_etag(group)
+        if response := not_modified(etag):
+            return response
         template_data = prepare_group_overview_data(group)
-        return render_template("group/overview.html", **template_data)
+        return with_etag(render_template("group/overview.html", **template_data), etag)
     else:
         return jsonify({"error": "Group not found or access denied"}), 404
 
@@ -133,12 +139,37 @@ def add_users_to_group(group_id):
 @login_required
 def group_expenses(group_id):
     """
-    Retrieves the expenses for a specific group.
+    Retrieves one page of the expenses for a specific group, newest first.
     Returns HTML or JSON based on the Accept header.
     """
     if group := get_authorized_group(group_id):
-        return render_template("group/expenses.html", group=group)
+        try:
+            cursor, limit = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        page = paginate_expenses(group_expenses_query(group.id), cursor, limit)
+        return render_template(
+            "group/expenses.html",
+            group=group,
+            expenses=page.expenses,
+            next_cursor=page.next_cursor,
+            limit=limit,
+        )
+
+    else:
+        return jsonify({"error": "Group not found or access denied"}), 404
+
 
+@bp.route("/groups/<int:group_id>/export.<any(csv, jsonl):format>", methods=["GET"])
+@login_required
+def export_group_expenses(group_id, format):
+    """
+    Streams every expense of the group with its balances, oldest first,
+    as a CSV or JSON lines download.
+    """
+    if group := get_authorized_group(group_id):
+        return export_response(f"group-{group.id}-expenses", format, group_id=group.id)
     else:
         return jsonify({"error": "Group not found or access denied"}), 404
 
@@ -151,8 +182,13 @@ def get_group_debts(group_id):
     Returns HTML or JSON based on the Accept header.
     """
     if group := get_authorized_group(group_id):
+        etag = group_etag(group)
+        if response := not_modified(etag):
+            return response
         user_debts = get_group_user_debts(group)
-        return render_template("group/debts.html", group=group, user_debts=user_debts)
+        return with_etag(
+            render_template("group/debts.html", group=group, user_debts=user_debts), etag
+        )
 
     else:
         return jsonify({"error": "Group not found or access denied"}), 404
@@ -165,8 +201,11 @@ def get_group_balances(group_id):
     Displays the current user's total balance, debts, and recent expenses in the group.
     """
     if group := get_authorized_group(group_id):
+        etag = group_etag(group)
+        if response := not_modified(etag):
+            return response
         template_data = prepare_group_balances_data(group)
-        return render_template("group/balances.html", **template_data)
+        return with_etag(render_template("group/balances.html", **template_data), etag)
     else:
         return jsonify({"error": "Group not found or access denied"}), 404
 
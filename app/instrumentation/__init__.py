@@ -0,0 +1,133 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext
+
+from app.database import db
+
+EXTENSION = "sql_instrumentation"
+
+
+@dataclass
+class RequestQueryStats:
+    """SQL statements issued while handling one request."""
+
+    method: str
+    path: str
+    count: int = 0
+    failed: int = 0
+    db_time: float = 0.0
+    statements: list[tuple[float, str]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    total_time: float = 0.0
+
+    def record(self, statement: str, duration: float, failed: bool = False) -> None:
+        self.count += 1
+        self.failed += failed
+        self.db_time += duration
+        self.statements.append((duration, statement))
+
+    def slowest(self, limit: int) -> list[tuple[float, str]]:
+        return sorted(self.statements, key=lambda s: s[0], reverse=True)[:limit]
+
+    def to_dict(self, slowest: int) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "query_count": self.count,
+            "failed_count": self.failed,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "total_time_ms": round(self.total_time * 1000, 3),
+            "slowest": [
+                {"duration_ms": round(duration * 1000, 3), "statement": statement}
+                for duration, statement in self.slowest(slowest)
+            ],
+        }
+
+
+def get_request_stats() -> RequestQueryStats | None:
+    """Returns the stats of the current request, None outside instrumented requests."""
+    if not has_request_context():
+        return None
+    return g.get("_sql_stats")
+
+
+def get_recent_requests() -> list[dict]:
+    """Returns the stats of the most recent instrumented requests, newest first."""
+    history = current_app.extensions[EXTENSION]
+    return list(reversed(history))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_sql_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["_sql_started"].pop()
+    if stats := get_request_stats():
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    """Records a failed statement, whose after_cursor_execute never runs."""
+    conn = context.connection
+    if conn is None or not conn.info.get("_sql_started"):
+        return
+    started = conn.info["_sql_started"].pop()
+    if (stats := get_request_stats()) and context.statement is not None:
+        stats.record(context.statement, time.perf_counter() - started, failed=True)
+
+
+def _start_request() -> None:
+    g._sql_stats = RequestQueryStats(method=request.method, path=request.full_path)
+
+
+def _finish_request(response: Response) -> Response:
+    stats = get_request_stats()
+    if stats is None:
+        return response
+
+    stats.total_time = time.perf_counter() - stats.started_at
+    response.headers["X-Query-Count"] = str(stats.count)
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={stats.db_time * 1000:.3f};desc="{stats.count} queries", '
+        f"app;dur={stats.total_time * 1000:.3f}",
+    )
+    current_app.extensions[EXTENSION].append(
+        stats.to_dict(current_app.config["SQL_INSTRUMENTATION_SLOWEST"])
+    )
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """
+    Records the query count, database time and slowest statements of each request
+    when SQL_INSTRUMENTATION is enabled. They are sent in the Server-Timing and
+    X-Query-Count response headers and kept for the /debug/queries endpoint,
+    which requires a logged-in user since it returns raw SQL.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION"):
+        return
+
+    app.config.setdefault("SQL_INSTRUMENTATION_SLOWEST", 5)
+    app.config.setdefault("SQL_INSTRUMENTATION_HISTORY", 100)
+    app.extensions[EXTENSION] = deque(maxlen=app.config["SQL_INSTRUMENTATION_HISTORY"])
+
+    with app.app_context():
+        engines: list[Engine] = list(db.engines.values())
+    for engine in engines:
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+    from app.instrumentation.views import bp
+
+    app.register_blueprint(bp)
@@ -0,0 +1,21 @@
+from flask import Blueprint, current_app, jsonify
+from flask_login import login_required
+from werkzeug import Response
+
+from app.instrumentation import get_recent_requests
+
+
+bp = Blueprint("instrumentation", __name__)
+
+
+@bp.route("/debug/queries", methods=["GET"])
+@login_required
+def queries() -> Response:
+    """Query count, database time and slowest statements of the recent requests."""
+    return jsonify(
+        {
+            "slowest_per_request": current_app.config["SQL_INSTRUMENTATION_SLOWEST"],
+            "requests": get_recent_requests(),
+        }
+    )
+
@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+
+from sqlalchemy import delete, insert, select
+
+from app.cache import invalidate
+from app.database import db
+from app.model.debt import Debt
+from app.model.group_balance import GroupBalance
+from app.model.ledger import (
+    LedgerEntry,
+    LedgerKey,
+    LedgerSnapshot,
+    LedgerSnapshotBalance,
+)
+from app.model.user_balance_summary import UserBalanceSummary
+
+
+@dataclass
+class LedgerBalances:
+    """Every balance as of ledger_offset, from a snapshot and the entries after it."""
+
+    balances: dict[LedgerKey, int]
+    snapshot_offset: int
+    ledger_offset: int
+
+    @property
+    def tail(self) -> int:
+        """Ledger offsets read past the snapshot."""
+        return self.ledger_offset - self.snapshot_offset
+
+
+def compute_balances() -> LedgerBalances:
+    """
+    Adds the entries after the latest snapshot to its balances, so the cost
+    grows with the tail of the ledger instead of its whole history.
+    Locks the ledger until the transaction ends, so that no entry can still
+    be committed under the offset read, nor under a snapshot taken from it.
+    """
+    LedgerEntry.lock()
+    ledger_offset = LedgerEntry.last_offset()
+    snapshot = LedgerSnapshot.latest()
+    balances = snapshot.balances() if snapshot else {}
+    snapshot_offset = snapshot.ledger_offset if snapshot else 0
+
+    tail = LedgerEntry.sums(after=snapshot_offset, until=ledger_offset)
+    for key, cents in tail.items():
+        balances[key] = balances.get(key, 0) + cents
+    return LedgerBalances(
+        {key: cents for key, cents in balances.items() if cents},
+        snapshot_offset,
+        ledger_offset,
+    )
+
+
+def take_snapshot(commit: bool = True) -> LedgerSnapshot:
+    """Stores every non-zero balance at the current ledger offset."""
+    computed = compute_balances()
+    snapshot = LedgerSnapshot(ledger_offset=computed.ledger_offset)
+    db.session.add(snapshot)
+    db.session.flush()
+    rows = [
+        {
+            "snapshot_id": snapshot.id,
+            "user_id": user_id,
+            "counterparty_id": counterparty_id,
+            "group_id": group_id,
+            "cents": cents,
+        }
+        for (user_id, counterparty_id, group_id), cents in computed.balances.items()
+    ]
+    if rows:
+        db.session.execute(insert(LedgerSnapshotBalance), rows)
+    if commit:
+        db.session.commit()
+    return snapshot
+
+
+def stored_balances() -> dict[LedgerKey, int]:
+    """The non-zero Debt and GroupBalance rows, keyed like the ledger."""
+    balances: dict[LedgerKey, int] = {}
+    for low_id, high_id, balance in db.session.execute(
+        select(Debt.low_id, Debt.high_id, Debt.balance)
+    ):
+        balances[(low_id, high_id, None)] = round(balance * 100)
+    for user_id, group_id, balance in db.session.execute(
+        select(GroupBalance.user_id, GroupBalance.group_id, GroupBalance.balance)
+    ):
+        balances[(user_id, None, group_id)] = round(balance * 100)
+    return {key: cents for key, cents in balances.items() if cents}
+
+
+def rebuild_balances(commit: bool = True) -> LedgerBalances:
+    """
+    Replaces every Debt and GroupBalance with the balances computed from the
+    ledger, then rebuilds the user balance summaries from them.
+    """
+    computed = compute_balances()
+    keys = stored_balances().keys() | computed.balances.keys()
+    invalidate(
+        users={user_id for user_id, _, _ in keys}
+        | {counterparty_id for _, counterparty_id, _ in keys if counterparty_id}
+        | set(db.session.scalars(select(UserBalanceSummary.user_id))),
+        groups={group_id for _, _, group_id in keys if group_id is not None},
+    )
+
+    debts, group_balances = [], []
+    for (user_id, counterparty_id, group_id), cents in computed.balances.items():
+        if group_id is None:
+            debts.append(
+                {"low_id": user_id, "high_id": counterparty_id, "balance": cents / 100}
+            )
+        else:
+            group_balances.append(
+                {"user_id": user_id, "group_id": group_id, "balance": cents / 100}
+            )
+    db.session.execute(delete(Debt))
+    db.session.execute(delete(GroupBalance))
+    for model, rows in ((Debt, debts), (GroupBalance, group_balances)):
+        if rows:
+            db.session.execute(insert(model), rows)
+    UserBalanceSummary.rebuild(commit=False)
+    if commit:
+        db.session.commit()
+    return computed
+
+
+def verify_balances() -> dict[LedgerKey, tuple[int, int]]:
+    """
+    Compares the stored debts and group balances to the ledger.
+    Returns the (expected, stored) cents of every balance that differs.
+    """
+    expected = compute_balances().balances
+    stored = stored_balances()
+    return {
+        key: (expected.get(key, 0), stored.get(key, 0))
+        for key in expected.keys() | stored.keys()
+        if expected.get(key, 0) != stored.get(key, 0)
+    }
@@ -4,3 +4,5 @@ from .user import User
 from .balance import Balance
 from .expense import Expense
 from .group_balance import GroupBalance
+from .user_balance_summary import UserBalanceSummary
+from .ledger import LedgerEntry, LedgerSnapshot, LedgerSnapshotBalance
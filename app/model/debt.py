@@ -4,39 +4,109 @@ from typing import TYPE_CHECKING, Self
 if TYPE_CHECKING:
     from app.model.user import User
 
+from sqlalchemy import case, func, insert, tuple_
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, relationship
 from app.database import db
+from app.model.ledger import LedgerEntry
+from app.model.user_balance_summary import UserBalanceSummary
 
 
 class Debt(db.Model):  # type: ignore
+    """
+    Represents the debt between two users, stored once per pair of users.
+    The pair is kept in canonical order, low_id < high_id.
+    Positive balance means the high user owes money to the low user.
+    Negative balance means the low user owes money to the high user.
+    """
+
     id: Mapped[int] = db.mapped_column(primary_key=True)
-    borrower_id: Mapped[int] = db.mapped_column(
-        db.ForeignKey("user.id"), nullable=False
-    )
-    borrower: Mapped[User] = relationship(
-        foreign_keys=[borrower_id], back_populates="borrower_debts"
+    low_id: Mapped[int] = db.mapped_column(db.ForeignKey("user.id"), nullable=False)
+    low: Mapped[User] = relationship(foreign_keys=[low_id])
+    high_id: Mapped[int] = db.mapped_column(
+        db.ForeignKey("user.id"), nullable=False, index=True
     )
-    lender_id: Mapped[int] = db.mapped_column(db.ForeignKey("user.id"), nullable=False)
-    lender: Mapped[User] = relationship(
-        foreign_keys=[lender_id], back_populates="lender_debts"
+    high: Mapped[User] = relationship(foreign_keys=[high_id])
+    balance: Mapped[float] = db.mapped_column(nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("low_id", "high_id"),
+        db.CheckConstraint("low_id < high_id", name="ck_debt_canonical_pair"),
     )
-    amount: Mapped[float] = db.mapped_column(nullable=False)
-    __table_args__ = (db.UniqueConstraint("lender_id", "borrower_id"),)
 
+    def __init__(
+        self,
+        borrower_id: int | None = None,
+        lender_id: int | None = None,
+        amount: float | None = None,
+        borrower: User | None = None,
+        lender: User | None = None,
+        **kwargs,
+    ) -> None:
+        """Accepts either the canonical columns or a lender, borrower and amount."""
+        if borrower is not None:
+            borrower_id = borrower.id
+        if lender is not None:
+            lender_id = lender.id
+        if borrower_id is not None and lender_id is not None:
+            low_id, high_id = sorted((borrower_id, lender_id))
+            kwargs.update(low_id=low_id, high_id=high_id)
+            if amount is not None:
+                kwargs["balance"] = amount if lender_id == low_id else -amount
+        super().__init__(**kwargs)
+
+    @hybrid_property
+    def lender_id(self) -> int:
+        return self.low_id if self.balance > 0 else self.high_id
+
+    @lender_id.inplace.expression
     @classmethod
-    def find(
-        cls, borrower_id: int, lender_id: int
-    ) -> Self | None:
-        return cls.query.filter_by(
-            borrower_id=borrower_id,
-            lender_id=lender_id,
-        ).first()
+    def _lender_id_expression(cls):
+        return case((cls.balance > 0, cls.low_id), else_=cls.high_id)
+
+    @hybrid_property
+    def borrower_id(self) -> int:
+        return self.high_id if self.balance > 0 else self.low_id
+
+    @borrower_id.inplace.expression
+    @classmethod
+    def _borrower_id_expression(cls):
+        return case((cls.balance > 0, cls.high_id), else_=cls.low_id)
+
+    @hybrid_property
+    def amount(self) -> float:
+        return abs(self.balance)
+
+    @amount.inplace.setter
+    def _amount_setter(self, value: float) -> None:
+        self.balance = -value if self.balance < 0 else value
+
+    @amount.inplace.expression
+    @classmethod
+    def _amount_expression(cls):
+        return func.abs(cls.balance)
+
+    @property
+    def lender(self) -> User:
+        return self.low if self.balance > 0 else self.high
+
+    @property
+    def borrower(self) -> User:
+        return self.high if self.balance > 0 else self.low
+
+    @classmethod
+    def find_pair(cls, user_id: int, other_id: int) -> Self | None:
+        """Finds the debt between two users, whichever of them is the lender."""
+        low_id, high_id = sorted((user_id, other_id))
+        return cls.query.filter_by(low_id=low_id, high_id=high_id).first()
 
     @classmethod
-    def __find_reversed(
+    def find(
         cls, borrower_id: int, lender_id: int
     ) -> Self | None:
-        return cls.find(lender_id, borrower_id)
+        debt = cls.find_pair(borrower_id, lender_id)
+        if debt and debt.borrower_id == borrower_id:
+            return debt
+        return None
 
     @classmethod
     def update(
@@ -45,30 +115,60 @@ class Debt(db.Model):  # type: ignore
         lender_id: int,
         amount: float,
     ) -> None:
-        if existing_debt := cls.find(borrower_id, lender_id):
-            existing_debt.amount += amount
-            db.session.flush()
-            return
+        cls.apply_many([(borrower_id, lender_id, amount)])
+
+    @classmethod
+    def apply_many(cls, transactions: list[tuple[int, int, float]]) -> None:
+        """
+        Applies (borrower_id, lender_id, amount) transactions to the stored debts.
 
-        if reverse_debt := cls.__find_reversed(borrower_id, lender_id):
-            if reverse_debt.amount == amount:
-                db.session.delete(reverse_debt)
-                db.session.flush()
-                return
-            elif reverse_debt.amount > amount:
-                reverse_debt.amount -= amount
-                db.session.flush()
-                return
+        All affected pairs are loaded with a single query and netted in cents
+        in memory. Updates and deletes are written in a single flush and new
+        pairs with a single bulk insert. The net amounts are appended to the
+        ledger and applied to the users' balance summaries.
+        """
+        # Net cents owed to the low user by the high user, per user pair
+        net: dict[tuple[int, int], int] = {}
+        for borrower_id, lender_id, amount in transactions:
+            if borrower_id == lender_id:
+                continue
+            if lender_id < borrower_id:
+                pair, sign = (lender_id, borrower_id), 1
             else:
-                amount -= reverse_debt.amount
-                db.session.delete(reverse_debt)
-                db.session.flush()
-
-        new_debt = cls(
-            borrower_id=borrower_id,
-            lender_id=lender_id,
-            amount=amount,
-        )
-        db.session.add(new_debt)
+                pair, sign = (borrower_id, lender_id), -1
+            net[pair] = net.get(pair, 0) + sign * round(amount * 100)
+
+        if not net:
+            return
+
+        existing = {
+            (debt.low_id, debt.high_id): debt
+            for debt in cls.query.filter(
+                tuple_(cls.low_id, cls.high_id).in_(list(net))
+            )
+        }
+
+        new_debts = []
+        for (low_id, high_id), cents in net.items():
+            if debt := existing.get((low_id, high_id)):
+                cents += round(debt.balance * 100)
+                if cents == 0:
+                    db.session.delete(debt)
+                else:
+                    debt.balance = cents / 100
+            elif cents != 0:
+                new_debts.append(
+                    {"low_id": low_id, "high_id": high_id, "balance": cents / 100}
+                )
         db.session.flush()
-        return
+        if new_debts:
+            db.session.execute(insert(cls), new_debts)
+        LedgerEntry.record(debts=net)
+
+        summary_deltas: dict[int, int] = {}
+        for (low_id, high_id), cents in net.items():
+            summary_deltas[low_id] = summary_deltas.get(low_id, 0) + cents
+            summary_deltas[high_id] = summary_deltas.get(high_id, 0) - cents
+        UserBalanceSummary.apply_deltas(
+            no_group={user_id: cents / 100 for user_id, cents in summary_deltas.items()}
+        )
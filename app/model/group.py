@@ -23,6 +23,11 @@ class Group(db.Model):  # type: ignore
     id: Mapped[int] = db.mapped_column(primary_key=True)
     name: Mapped[str] = db.mapped_column(nullable=False)
     description: Mapped[str] = db.mapped_column(nullable=True)
+    # Incremented by every commit that changes the group's balances, members
+    # or expenses
+    version: Mapped[int] = db.mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
     users: Mapped[List[User]] = relationship(
         secondary=group_members, back_populates="groups"
     )
@@ -31,13 +36,19 @@ class Group(db.Model):  # type: ignore
 
     @classmethod
     def create(
-        cls, name: str, users: List[User], description: str | None = None
+        cls,
+        name: str,
+        users: List[User],
+        description: str | None = None,
+        commit: bool = True,
     ) -> Group:
         if not users:
             raise ValueError("The users list cannot be empty.")
         new_group = cls(name=name, users=users, description=description)
         db.session.add(new_group)
-        db.session.commit()
+        db.session.flush()
+        if commit:
+            db.session.commit()
         return new_group
 
     def update_description(self, description: str) -> Group:
@@ -45,15 +56,18 @@ class Group(db.Model):  # type: ignore
         db.session.commit()
         return self
 
-    def add_user(self, user: User) -> Group:
+    def add_user(self, user: User, commit: bool = True) -> Group:
         if user not in self.users:
             self.users.append(user)
-            db.session.commit()
+            if commit:
+                db.session.commit()
         return self
 
-    def add_users(self, users: List[User]) -> Group:
+    def add_users(self, users: List[User], commit: bool = True) -> Group:
         for user in users:
-            self.add_user(user)
+            self.add_user(user, commit=False)
+        if commit:
+            db.session.commit()
         return self
 
     def remove_user(self, user: User) -> Group:
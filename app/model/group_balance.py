@@ -5,8 +5,11 @@ if TYPE_CHECKING:
     from app.model.user import User
     from app.model.group import Group
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Mapped, relationship
 from app.database import db
+from app.model.ledger import LedgerEntry
+from app.model.user_balance_summary import UserBalanceSummary
 
 
 class GroupBalance(db.Model):  # type: ignore
@@ -44,16 +47,60 @@ class GroupBalance(db.Model):  # type: ignore
     @classmethod
     def update_balance(cls, user_id: int, group_id: int, amount: float) -> None:
         """Update a user's balance in a group by adding the specified amount."""
-        balance = cls.find_or_create(user_id, group_id)
-        balance.balance += amount
+        cls.apply_deltas(group_id, {user_id: amount})
+
+    @classmethod
+    def apply_deltas(cls, group_id: int, deltas: dict[int, float]) -> None:
+        """
+        Add each user's delta to their balance in a group.
+        Existing balances are loaded with a single query and updated in a
+        single flush; missing ones are created with a single bulk insert.
+        The deltas are appended to the ledger and applied to the users'
+        balance summaries.
+        """
+        deltas = {uid: delta for uid, delta in deltas.items() if delta != 0}
+        if not deltas:
+            return
+
+        existing = {
+            balance.user_id: balance
+            for balance in cls.query.filter(
+                cls.group_id == group_id, cls.user_id.in_(deltas)
+            )
+        }
+        new_balances = []
+        for user_id, delta in deltas.items():
+            if balance := existing.get(user_id):
+                balance.balance = (round(balance.balance * 100) + round(delta * 100)) / 100
+            else:
+                new_balances.append(
+                    {
+                        "user_id": user_id,
+                        "group_id": group_id,
+                        "balance": round(delta * 100) / 100,
+                    }
+                )
         db.session.flush()
+        if new_balances:
+            db.session.execute(insert(cls), new_balances)
+        LedgerEntry.record(
+            groups={(group_id, uid): round(delta * 100) for uid, delta in deltas.items()}
+        )
+        UserBalanceSummary.apply_deltas(group=deltas)
 
     @classmethod
-    def set_balance(cls, user_id: int, group_id: int, amount: float) -> None:
+    def set_balance(
+        cls, user_id: int, group_id: int, amount: float, commit: bool = True
+    ) -> None:
         """Set a user's balance in a group to the specified amount."""
         balance = cls.find_or_create(user_id, group_id)
+        LedgerEntry.record(
+            groups={(group_id, user_id): round(amount * 100) - round(balance.balance * 100)}
+        )
+        UserBalanceSummary.apply_deltas(group={user_id: amount - balance.balance})
         balance.balance = amount
-        db.session.commit()
+        if commit:
+            db.session.commit()
 
     @classmethod
     def get_group_balances(cls, group_id: int) -> dict[int, float]:
@@ -62,7 +109,18 @@ class GroupBalance(db.Model):  # type: ignore
         return {balance.user_id: balance.balance for balance in balances}
 
     @classmethod
-    def clear_group_balances(cls, group_id: int) -> None:
+    def clear_group_balances(cls, group_id: int, commit: bool = True) -> None:
         """Clear all balances for a specific group (used for settlement)."""
+        balances = cls.get_group_balances(group_id)
+        LedgerEntry.record(
+            groups={
+                (group_id, user_id): -round(balance * 100)
+                for user_id, balance in balances.items()
+            }
+        )
+        UserBalanceSummary.apply_deltas(
+            group={user_id: -balance for user_id, balance in balances.items()}
+        )
         cls.query.filter_by(group_id=group_id).delete()
-        db.session.commit()
+        if commit:
+            db.session.commit()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Self
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Mapped
+from app.database import db
+
+# (user_id, counterparty_id, group_id) of a balance, one of the last two is None
+LedgerKey = tuple[int, int | None, int | None]
+
+
+class LedgerEntry(db.Model):  # type: ignore
+    """
+    Append-only log of the signed cent deltas applied to debts and group balances.
+    A debt's entries are keyed by its canonical pair, user_id the low user and
+    counterparty_id the high one; positive cents are owed to the low user, as
+    in Debt.balance. A group balance's entries are keyed by user_id and group_id.
+    Entries are never updated or deleted, their id is their ledger offset.
+
+    Ids are handed out when entries are inserted, not when they are committed,
+    so a transaction still in flight may commit entries below the last offset
+    another one reads. Readers that store or compare balances as of an offset
+    call lock() first.
+    """
+
+    id: Mapped[int] = db.mapped_column(primary_key=True)
+    user_id: Mapped[int] = db.mapped_column(db.ForeignKey("user.id"), nullable=False)
+    counterparty_id: Mapped[int | None] = db.mapped_column(
+        db.ForeignKey("user.id"), nullable=True
+    )
+    group_id: Mapped[int | None] = db.mapped_column(
+        db.ForeignKey("group.id"), nullable=True
+    )
+    cents: Mapped[int] = db.mapped_column(nullable=False)
+    created_at: Mapped[datetime] = db.mapped_column(default=datetime.now)
+    __table_args__ = (
+        db.CheckConstraint(
+            "(counterparty_id IS NULL) <> (group_id IS NULL)",
+            name="ck_ledger_entry_single_target",
+        ),
+    )
+
+    @classmethod
+    def record(
+        cls,
+        debts: dict[tuple[int, int], int] | None = None,
+        groups: dict[tuple[int, int], int] | None = None,
+    ) -> None:
+        """
+        Appends the cents added to each (low_id, high_id) debt and each
+        (group_id, user_id) group balance, with a single bulk insert.
+        """
+        rows = [
+            {"user_id": low_id, "counterparty_id": high_id, "cents": cents}
+            for (low_id, high_id), cents in (debts or {}).items()
+            if cents
+        ]
+        rows += [
+            {"user_id": user_id, "group_id": group_id, "cents": cents}
+            for (group_id, user_id), cents in (groups or {}).items()
+            if cents
+        ]
+        if rows:
+            db.session.execute(insert(cls), rows)
+
+    @classmethod
+    def lock(cls) -> None:
+        """
+        Waits for the transactions writing entries to commit and blocks new
+        ones until the current transaction ends, so every entry up to
+        last_offset() is committed and none can be added under it. Take it
+        before any other statement of the transaction under isolation levels
+        above READ COMMITTED. SQLite already serializes writers, and readers
+        only see committed entries.
+        """
+        if db.session.get_bind().dialect.name == "postgresql":
+            db.session.execute(text(f"LOCK TABLE {cls.__tablename__} IN SHARE MODE"))
+
+    @classmethod
+    def last_offset(cls) -> int:
+        return db.session.scalar(select(func.max(cls.id))) or 0
+
+    @classmethod
+    def sums(cls, after: int, until: int) -> dict[LedgerKey, int]:
+        """Net cents per balance of the entries after offset after, up to until."""
+        key = (cls.user_id, cls.counterparty_id, cls.group_id)
+        query = (
+            select(*key, func.sum(cls.cents))
+            .where(cls.id > after, cls.id <= until)
+            .group_by(*key)
+        )
+        return {
+            (user_id, counterparty_id, group_id): cents
+            for user_id, counterparty_id, group_id, cents in db.session.execute(query)
+        }
+
+
+class LedgerSnapshot(db.Model):  # type: ignore
+    """Every non-zero balance as of the ledger entries up to ledger_offset."""
+
+    id: Mapped[int] = db.mapped_column(primary_key=True)
+    ledger_offset: Mapped[int] = db.mapped_column(nullable=False)
+    created_at: Mapped[datetime] = db.mapped_column(default=datetime.now)
+
+    @classmethod
+    def latest(cls) -> Self | None:
+        return cls.query.order_by(cls.ledger_offset.desc(), cls.id.desc()).first()
+
+    def balances(self) -> dict[LedgerKey, int]:
+        rows = db.session.execute(
+            select(
+                LedgerSnapshotBalance.user_id,
+                LedgerSnapshotBalance.counterparty_id,
+                LedgerSnapshotBalance.group_id,
+                LedgerSnapshotBalance.cents,
+            ).where(LedgerSnapshotBalance.snapshot_id == self.id)
+        )
+        return {
+            (user_id, counterparty_id, group_id): cents
+            for user_id, counterparty_id, group_id, cents in rows
+        }
+
+
+class LedgerSnapshotBalance(db.Model):  # type: ignore
+    """One balance of a LedgerSnapshot, keyed like the ledger entries."""
+
+    id: Mapped[int] = db.mapped_column(primary_key=True)
+    snapshot_id: Mapped[int] = db.mapped_column(
+        db.ForeignKey("ledger_snapshot.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    user_id: Mapped[int] = db.mapped_column(db.ForeignKey("user.id"), nullable=False)
+    counterparty_id: Mapped[int | None] = db.mapped_column(
+        db.ForeignKey("user.id"), nullable=True
+    )
+    group_id: Mapped[int | None] = db.mapped_column(
+        db.ForeignKey("group.id"), nullable=True
+    )
+    cents: Mapped[int] = db.mapped_column(nullable=False)
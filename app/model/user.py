@@ -7,11 +7,14 @@ if TYPE_CHECKING:
     from app.model.expense import Expense
     from app.model.group_balance import GroupBalance
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
 from app.database import db
+from app.model.expense import expense_users
 
 # Association table for the friends relationship
 friends = db.Table(
@@ -27,6 +30,11 @@ class User(db.Model, UserMixin):  # type: ignore
     email: Mapped[str] = db.mapped_column(unique=True, nullable=False)
     username: Mapped[str] = db.mapped_column(nullable=False)
     password: Mapped[str] = db.mapped_column(nullable=False)
+    # Incremented by every commit that changes the user's balances, groups,
+    # friends or expenses
+    version: Mapped[int] = db.mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
     friends: Mapped[List[User]] = relationship(
         "User",
         secondary=friends,
@@ -37,11 +45,21 @@ class User(db.Model, UserMixin):  # type: ignore
     groups: Mapped[List[Group]] = relationship(
         secondary="group_members", back_populates="users"
     )
+    debts: Mapped[List[Debt]] = relationship(
+        primaryjoin="or_(User.id == foreign(Debt.low_id), User.id == foreign(Debt.high_id))",
+        viewonly=True,
+    )
     lender_debts: Mapped[List[Debt]] = relationship(
-        foreign_keys="Debt.lender_id", back_populates="lender"
+        primaryjoin="or_("
+        "and_(User.id == foreign(Debt.low_id), Debt.balance > 0), "
+        "and_(User.id == foreign(Debt.high_id), Debt.balance < 0))",
+        viewonly=True,
     )
     borrower_debts: Mapped[List[Debt]] = relationship(
-        foreign_keys="Debt.borrower_id", back_populates="borrower"
+        primaryjoin="or_("
+        "and_(User.id == foreign(Debt.high_id), Debt.balance > 0), "
+        "and_(User.id == foreign(Debt.low_id), Debt.balance < 0))",
+        viewonly=True,
     )
     expenses: Mapped[List["Expense"]] = relationship(
         secondary="expense_users", back_populates="users"
@@ -95,9 +113,18 @@ class User(db.Model, UserMixin):  # type: ignore
         db.session.commit()
 
     def add_expense(self, expense: Expense) -> None:
+        """
+        Links a flushed expense to the user. The row is inserted directly, as
+        the relationship cannot write the expense's created_at copy.
+        """
         if expense not in self.expenses:
-            self.expenses.append(expense)
-            db.session.flush()
+            db.session.execute(
+                insert(expense_users).values(
+                    user_id=self.id, expense_id=expense.id, created_at=expense.created_at
+                )
+            )
+            set_committed_value(self, "expenses", [*self.expenses, expense])
+            db.session.expire(expense, ["users"])
 
     def remove_expense(self, expense: Expense) -> None:
         if expense in self.expenses:
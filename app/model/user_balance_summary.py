@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Self
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import Mapped
+from app.database import db
+
+
+class UserBalanceSummary(db.Model):  # type: ignore
+    """
+    Materialized totals of a user's balances, kept up to date by Debt.apply_many
+    and the GroupBalance writes in the same transaction.
+    no_group_balance is the net of the user's debts outside any group.
+    group_balance is the sum of the user's balances in all their groups.
+    Positive means the user is owed money, negative that the user owes money.
+    """
+
+    user_id: Mapped[int] = db.mapped_column(
+        db.ForeignKey("user.id"), primary_key=True
+    )
+    no_group_balance: Mapped[float] = db.mapped_column(nullable=False, default=0.0)
+    group_balance: Mapped[float] = db.mapped_column(nullable=False, default=0.0)
+
+    @property
+    def overall_balance(self) -> float:
+        return (round(self.no_group_balance * 100) + round(self.group_balance * 100)) / 100
+
+    @classmethod
+    def find(cls, user_id: int) -> Self | None:
+        """Find the summary of a user with a primary-key read."""
+        return db.session.get(cls, user_id)
+
+    @classmethod
+    def apply_deltas(
+        cls,
+        no_group: dict[int, float] | None = None,
+        group: dict[int, float] | None = None,
+    ) -> None:
+        """
+        Add each user's deltas to their summary.
+        Existing summaries are loaded with a single query and updated in a
+        single flush; missing ones are created with a single bulk insert.
+        """
+        deltas: dict[int, list[int]] = {}
+        for index, user_deltas in enumerate((no_group or {}, group or {})):
+            for user_id, delta in user_deltas.items():
+                if cents := round(delta * 100):
+                    deltas.setdefault(user_id, [0, 0])[index] += cents
+        if not deltas:
+            return
+
+        existing = {
+            summary.user_id: summary
+            for summary in cls.query.filter(cls.user_id.in_(deltas))
+        }
+        new_summaries = []
+        for user_id, (no_group_cents, group_cents) in deltas.items():
+            if summary := existing.get(user_id):
+                summary.no_group_balance = (
+                    round(summary.no_group_balance * 100) + no_group_cents
+                ) / 100
+                summary.group_balance = (
+                    round(summary.group_balance * 100) + group_cents
+                ) / 100
+            else:
+                new_summaries.append(
+                    {
+                        "user_id": user_id,
+                        "no_group_balance": no_group_cents / 100,
+                        "group_balance": group_cents / 100,
+                    }
+                )
+        db.session.flush()
+        if new_summaries:
+            db.session.execute(insert(cls), new_summaries)
+
+    @classmethod
+    def compute(cls) -> dict[int, tuple[float, float]]:
+        """
+        Computes every user's (no_group_balance, group_balance) from the raw
+        Debt and GroupBalance rows. Users without any balance are left out.
+        """
+        from app.model.debt import Debt
+        from app.model.group_balance import GroupBalance
+
+        debts = union_all(
+            select(Debt.low_id.label("user_id"), Debt.balance.label("balance")),
+            select(Debt.high_id, -Debt.balance),
+        ).subquery()
+
+        cents: dict[int, list[int]] = {}
+        for index, query in enumerate(
+            (
+                select(debts.c.user_id, func.sum(debts.c.balance)).group_by(
+                    debts.c.user_id
+                ),
+                select(GroupBalance.user_id, func.sum(GroupBalance.balance)).group_by(
+                    GroupBalance.user_id
+                ),
+            )
+        ):
+            for user_id, balance in db.session.execute(query):
+                cents.setdefault(user_id, [0, 0])[index] = round(balance * 100)
+
+        return {
+            user_id: (no_group / 100, group / 100)
+            for user_id, (no_group, group) in cents.items()
+            if no_group or group
+        }
+
+    @classmethod
+    def rebuild(cls, commit: bool = True) -> int:
+        """Replaces every summary with one computed from the raw rows."""
+        summaries = [
+            {"user_id": user_id, "no_group_balance": no_group, "group_balance": group}
+            for user_id, (no_group, group) in cls.compute().items()
+        ]
+        db.session.execute(delete(cls))
+        if summaries:
+            db.session.execute(insert(cls), summaries)
+        if commit:
+            db.session.commit()
+        return len(summaries)
+
+    @classmethod
+    def verify(cls) -> dict[int, tuple[tuple[float, float], tuple[float, float]]]:
+        """
+        Compares the stored summaries to the raw rows.
+        Returns the (expected, stored) balances of every user that differs.
+        """
+        expected = cls.compute()
+        stored = {
+            summary.user_id: (summary.no_group_balance, summary.group_balance)
+            for summary in cls.query
+        }
+        mismatches = {}
+        for user_id in expected.keys() | stored.keys():
+            want = expected.get(user_id, (0.0, 0.0))
+            have = stored.get(user_id, (0.0, 0.0))
+            if [round(b * 100) for b in want] != [round(b * 100) for b in have]:
+                mismatches[user_id] = (want, have)
+        return mismatches
@@ -0,0 +1,335 @@
+import random
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import combinations
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from app.database import db
+from app.debt import simplify_debts
+from app.model.balance import Balance
+from app.model.constants import NO_GROUP
+from app.model.debt import Debt
+from app.model.expense import Expense, ExpenseCategory, expense_users
+from app.model.group import Group, group_members
+from app.model.group_balance import GroupBalance
+from app.model.ledger import LedgerEntry
+from app.model.user import User, friends
+from app.model.user_balance_summary import UserBalanceSummary
+from app.split import SplitType
+from app.split.constants import OWED, PAYED, TOTAL
+
+DEFAULT_BATCH_SIZE = 10_000
+SEED_PASSWORD = "password"
+
+
+@dataclass
+class SeedStats:
+    """Rows written so far by a BulkWriter."""
+
+    users: int = 0
+    groups: int = 0
+    expenses: int = 0
+    balances: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Written expenses per second."""
+        return self.expenses / self.elapsed if self.elapsed else 0.0
+
+
+class BulkWriter:
+    """
+    Writes generated users, groups and expenses with Core executemany inserts,
+    batch_size expenses at a time, bypassing the ORM and the per-expense debt
+    updates. Debts, group balances and balance summaries are summed in memory
+    and written once by finish().
+
+    Only valid for users created by the same writer: their debts and balances
+    are assumed to start at zero, so the aggregates are inserted, not merged.
+    Ids are assigned by the writer, after the largest ones in the database.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        progress: Callable[[SeedStats], None] | None = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = SeedStats()
+        self._next_ids = {
+            model: (db.session.scalar(select(func.max(model.id))) or 0) + 1
+            for model in (User, Group, Expense)
+        }
+        self._expenses: list[dict] = []
+        self._balances: list[dict] = []
+        self._expense_users: list[dict] = []
+        # Net cents owed to the low user by the high user, per user pair
+        self._debts: dict[tuple[int, int], int] = {}
+        self._group_balances: dict[tuple[int, int], int] = {}
+
+    def _ids(self, model, count: int) -> range:
+        start = self._next_ids[model]
+        self._next_ids[model] = start + count
+        return range(start, start + count)
+
+    def add_users(self, count: int, password: str = SEED_PASSWORD) -> list[int]:
+        """Creates users sharing one password hash, so scrypt runs once."""
+        hashed = generate_password_hash(password)
+        ids = self._ids(User, count)
+        for start in range(0, count, self.batch_size):
+            db.session.execute(
+                insert(User),
+                [
+                    {
+                        "id": id,
+                        "username": f"user{id}",
+                        "email": f"{id}@seed.example.com",
+                        "password": hashed,
+                    }
+                    for id in ids[start : start + self.batch_size]
+                ],
+            )
+        self.stats.users += count
+        return list(ids)
+
+    def add_groups(self, groups: list[tuple[str, list[int]]]) -> list[int]:
+        """Creates (name, member ids) groups. Members become friends of each other."""
+        ids = self._ids(Group, len(groups))
+        db.session.execute(
+            insert(Group), [{"id": id, "name": name} for id, (name, _) in zip(ids, groups)]
+        )
+        db.session.execute(
+            insert(group_members),
+            [
+                {"group_id": id, "user_id": user_id}
+                for id, (_, members) in zip(ids, groups)
+                for user_id in members
+            ],
+        )
+        self.add_friendships(
+            {pair for _, members in groups for pair in combinations(sorted(members), 2)}
+        )
+        self.stats.groups += len(groups)
+        return list(ids)
+
+    def add_friendships(self, pairs: Iterable[tuple[int, int]]) -> None:
+        """Makes each pair of distinct users friends, in both directions."""
+        rows = [
+            row
+            for a, b in pairs
+            for row in ({"user_id": a, "friend_id": b}, {"user_id": b, "friend_id": a})
+        ]
+        for start in range(0, len(rows), self.batch_size):
+            db.session.execute(insert(friends), rows[start : start + self.batch_size])
+
+    def add_expense(
+        self,
+        amount: float,
+        creator_id: int,
+        balances: dict[int, dict[str, float]],
+        group_id: int | None = None,
+        description: str = "Expense",
+        category: ExpenseCategory = ExpenseCategory.OTHER,
+        payers_split: SplitType = SplitType.EQUALLY,
+        owers_split: SplitType = SplitType.EQUALLY,
+        created_at: datetime | None = None,
+    ) -> int:
+        """
+        Queues an expense with balances as returned by app.split.split, and
+        adds its changes to the in-memory debts or group balances.
+        """
+        [id] = self._ids(Expense, 1)
+        created_at = created_at or datetime.now()
+        self._expenses.append(
+            {
+                "id": id,
+                "amount": amount,
+                "description": description,
+                "category": category,
+                "payers_split": payers_split,
+                "owers_split": owers_split,
+                # Same value the ORM stores for expenses without a group
+                "group_id": group_id if group_id is not None else NO_GROUP,
+                "creator_id": creator_id,
+                "created_at": created_at,
+            }
+        )
+        for user_id, balance in balances.items():
+            self._balances.append(
+                {
+                    "expense_id": id,
+                    "user_id": user_id,
+                    "payed": balance[PAYED],
+                    "owed": balance[OWED],
+                    "total": balance[TOTAL],
+                }
+            )
+        for user_id in balances.keys() | {creator_id}:
+            self._expense_users.append(
+                {"expense_id": id, "user_id": user_id, "created_at": created_at}
+            )
+
+        totals = {user_id: balance[TOTAL] for user_id, balance in balances.items()}
+        if group_id is not None:
+            for user_id, total in totals.items():
+                key, cents = (group_id, user_id), round(total * 100)
+                self._group_balances[key] = self._group_balances.get(key, 0) + cents
+        else:
+            # Same netting as Debt.apply_many
+            for borrower_id, lender_id, debt in simplify_debts(totals):
+                if lender_id < borrower_id:
+                    pair, sign = (lender_id, borrower_id), 1
+                else:
+                    pair, sign = (borrower_id, lender_id), -1
+                self._debts[pair] = self._debts.get(pair, 0) + sign * round(debt * 100)
+
+        if len(self._expenses) >= self.batch_size:
+            self.flush()
+        return id
+
+    def flush(self) -> None:
+        """Writes the queued expenses, their balances and users."""
+        if not self._expenses:
+            return
+        db.session.execute(insert(Expense), self._expenses)
+        db.session.execute(insert(Balance), self._balances)
+        db.session.execute(insert(expense_users), self._expense_users)
+        self.stats.expenses += len(self._expenses)
+        self.stats.balances += len(self._balances)
+        self._expenses, self._balances, self._expense_users = [], [], []
+        if self.progress:
+            self.progress(self.stats)
+
+    def finish(self) -> SeedStats:
+        """
+        Writes the remaining expenses, then every aggregate and its ledger
+        entry, and commits.
+        """
+        self.flush()
+
+        no_group: dict[int, int] = {}
+        debt_rows = []
+        for (low_id, high_id), cents in self._debts.items():
+            if cents:
+                debt_rows.append(
+                    {"low_id": low_id, "high_id": high_id, "balance": cents / 100}
+                )
+                no_group[low_id] = no_group.get(low_id, 0) + cents
+                no_group[high_id] = no_group.get(high_id, 0) - cents
+
+        group: dict[int, int] = {}
+        group_balance_rows = []
+        for (group_id, user_id), cents in self._group_balances.items():
+            group_balance_rows.append(
+                {"group_id": group_id, "user_id": user_id, "balance": cents / 100}
+            )
+            group[user_id] = group.get(user_id, 0) + cents
+
+        summary_rows = [
+            {
+                "user_id": user_id,
+                "no_group_balance": no_group.get(user_id, 0) / 100,
+                "group_balance": group.get(user_id, 0) / 100,
+            }
+            for user_id in no_group.keys() | group.keys()
+        ]
+
+        for model, rows in (
+            (Debt, debt_rows),
+            (GroupBalance, group_balance_rows),
+            (UserBalanceSummary, summary_rows),
+        ):
+            for start in range(0, len(rows), self.batch_size):
+                db.session.execute(insert(model), rows[start : start + self.batch_size])
+        # The ledger starts with one entry per aggregate instead of per expense
+        LedgerEntry.record(debts=self._debts, groups=self._group_balances)
+        db.session.commit()
+        return self.stats
+
+
+@dataclass
+class SeedConfig:
+    """Scale of a uniformly random dataset."""
+
+    users: int = 50
+    groups: int = 8
+    expenses: int = 120
+    # Members per group, and participants per expense including the payer
+    group_size: tuple[int, int] = (3, 12)
+    participants: tuple[int, int] = (2, 6)
+    # Share of expenses made outside groups, between members of a random group
+    no_group_share: float = 0.3
+    days: int = 365
+    seed: int | None = None
+
+
+CATEGORIES = [c for c in ExpenseCategory if c != ExpenseCategory.SETTLEMENT]
+
+
+def _equal_balances(payer_id: int, user_ids: list[int], cents: int) -> dict:
+    """One payer, everyone owes an equal share, the spare cents go to the first ones."""
+    share, spare = divmod(cents, len(user_ids))
+    balances = {}
+    for position, user_id in enumerate(user_ids):
+        owed = share + (position < spare)
+        payed = cents if user_id == payer_id else 0
+        balances[user_id] = {
+            PAYED: payed / 100,
+            OWED: owed / 100,
+            TOTAL: (payed - owed) / 100,
+        }
+    return balances
+
+
+def seed(
+    config: SeedConfig,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Callable[[SeedStats], None] | None = None,
+) -> SeedStats:
+    """
+    Creates config.users users in config.groups groups and config.expenses
+    expenses paid by one participant and split equally, with random amounts,
+    categories and dates over the last config.days days.
+    """
+    rng = random.Random(config.seed)
+    writer = BulkWriter(batch_size, progress)
+
+    user_ids = writer.add_users(config.users)
+    memberships = [
+        (
+            f"Group {number}",
+            rng.sample(user_ids, min(rng.randint(*config.group_size), len(user_ids))),
+        )
+        for number in range(1, config.groups + 1)
+    ]
+    group_ids = writer.add_groups(memberships)
+
+    now = datetime.now()
+    for number in range(1, config.expenses + 1):
+        position = rng.randrange(len(group_ids))
+        members = memberships[position][1]
+        participants = rng.sample(
+            members, min(max(2, rng.randint(*config.participants)), len(members))
+        )
+        payer_id = participants[0]
+        cents = rng.randint(100, 50_000)
+        writer.add_expense(
+            amount=cents / 100,
+            creator_id=payer_id,
+            balances=_equal_balances(payer_id, participants, cents),
+            group_id=None if rng.random() < config.no_group_share else group_ids[position],
+            description=f"Expense #{number}",
+            category=rng.choice(CATEGORIES),
+            created_at=now - timedelta(seconds=rng.randint(0, config.days * 86400)),
+        )
+    return writer.finish()
@@ -0,0 +1,299 @@
+import json
+import math
+import random
+from bisect import bisect
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import IO
+
+from app.debt import simplify_debts
+from app.expense import ExpenseData
+from app.model.expense import ExpenseCategory
+from app.seed import CATEGORIES, DEFAULT_BATCH_SIZE, BulkWriter, SeedStats
+from app.split import RemainderStrategy, SplitType, split
+from app.split.constants import TOTAL
+
+# Deterministic, so a seed always generates the same balances
+REMAINDER = RemainderStrategy.LARGEST_REMAINDER
+# Fixed, so a seed also always generates the same dates
+DEFAULT_END = datetime(2025, 1, 1)
+
+
+@dataclass
+class WorkloadConfig:
+    """Shape of a synthetic workload. Every random choice derives from seed."""
+
+    users: int = 1000
+    groups: int = 100
+    expenses: int = 100_000
+    # Group sizes follow a Zipf law of this exponent over [2, max_group_size]:
+    # most groups are couples and small circles, a few are very large
+    max_group_size: int = 50
+    group_size_exponent: float = 1.3
+    # Users' activity follows a Pareto law of this shape, lower is more skewed:
+    # a few users pay and take part in most expenses
+    activity_shape: float = 1.2
+    max_participants: int = 8
+    # Relative weights of the split types, for payers and owers alike
+    split_mix: dict[SplitType, float] = field(
+        default_factory=lambda: {
+            SplitType.EQUALLY: 0.7,
+            SplitType.AMOUNT: 0.2,
+            SplitType.PERCENTAGE: 0.1,
+        }
+    )
+    # Share of expenses between group members but outside the group
+    no_group_share: float = 0.2
+    # Share of events that settle a debt or a group balance instead
+    settlement_share: float = 0.02
+    # Expenses are spread over the days before end
+    days: int = 365
+    end: datetime = DEFAULT_END
+    seed: int = 0
+
+
+class Workload:
+    """
+    Generates the expenses of a population of users and groups, in date
+    order, keeping the resulting group balances and debts in memory so that
+    settlement events pay off real balances.
+    """
+
+    def __init__(
+        self,
+        config: WorkloadConfig,
+        user_ids: list[int],
+        groups: list[tuple[int, list[int]]],
+    ) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.groups = [(id, members) for id, members in groups if len(members) > 1]
+        self.activity = {
+            user_id: self.rng.paretovariate(config.activity_shape) for user_id in user_ids
+        }
+        # Groups are picked with a weight of their members' total activity
+        self._group_weights = list(
+            accumulate(
+                sum(self.activity[user_id] for user_id in members)
+                for _, members in self.groups
+            )
+        )
+        self._split_types = list(config.split_mix)
+        self._split_weights = list(accumulate(config.split_mix.values()))
+        self.group_balances: dict[int, dict[int, int]] = {}
+        # Net cents owed to the low user by the high user, per user pair
+        self.debts: dict[tuple[int, int], int] = {}
+        self._debt_pairs: list[tuple[int, int]] = []
+
+    def _weighted_sample(self, users: list[int], count: int) -> list[int]:
+        """Distinct users, each more likely to be picked the more active it is."""
+        keys = sorted(
+            ((self.rng.random() ** (1 / self.activity[u]), u) for u in users), reverse=True
+        )
+        return [user_id for _, user_id in keys[:count]]
+
+    def _values(self, users: list[int], cents: int) -> tuple[SplitType, dict]:
+        """A random split type and values for it that pass ExpenseForm's rules."""
+        split_type = self._split_types[
+            bisect(self._split_weights, self.rng.random() * self._split_weights[-1])
+        ]
+        match split_type:
+            case SplitType.PERCENTAGE:
+                cuts = sorted(self.rng.sample(range(1, 100), len(users) - 1))
+                parts = [b - a for a, b in zip([0, *cuts], [*cuts, 100])]
+                return split_type, dict(zip(users, map(float, parts)))
+            case SplitType.AMOUNT:
+                cuts = sorted(self.rng.sample(range(1, cents), len(users) - 1))
+                amounts = [(b - a) / 100 for a, b in zip([0, *cuts], [*cuts, cents])]
+                # The float sum must equal the total exactly, as in ExpenseForm
+                if sum(amounts) == cents / 100:
+                    return split_type, dict(zip(users, amounts))
+        return SplitType.EQUALLY, {user_id: None for user_id in users}
+
+    def _amount_cents(self) -> int:
+        """Log-normal amounts, a median of 30 with a long tail of large expenses."""
+        return min(max(100, round(self.rng.lognormvariate(math.log(3000), 1.0))), 500_000)
+
+    def _expense(self, created_at: datetime) -> ExpenseData:
+        weight = self.rng.random() * self._group_weights[-1]
+        group_id, members = self.groups[bisect(self._group_weights, weight)]
+        # Mostly 2 or 3 participants, rarely many
+        size = 2 + int(self.rng.expovariate(0.7))
+        participants = self._weighted_sample(
+            members, min(len(members), self.config.max_participants, size)
+        )
+        two_payers = len(participants) > 2 and self.rng.random() < 0.15
+        payers = participants[: 2 if two_payers else 1]
+        cents = self._amount_cents()
+        payers_split, payers_values = self._values(payers, cents)
+        owers_split, owers_values = self._values(participants, cents)
+        category = self.rng.choice(CATEGORIES)
+        return ExpenseData(
+            amount=cents / 100,
+            description=category.value,
+            category=category,
+            payers_split=payers_split,
+            owers_split=owers_split,
+            payers=payers_values,
+            owers=owers_values,
+            group_id=None if self.rng.random() < self.config.no_group_share else group_id,
+            creator_id=payers[0],
+            created_at=created_at,
+        )
+
+    def _settlement(self, created_at: datetime) -> ExpenseData | None:
+        """Pays off a random debt, or the largest debt of a random group member."""
+        if self._debt_pairs and self.rng.random() < 0.5:
+            pair = self._debt_pairs[self.rng.randrange(len(self._debt_pairs))]
+            cents = self.debts.get(pair, 0)
+            if not cents:
+                return None
+            # Positive cents are owed to the low user
+            lender, borrower = pair if cents > 0 else pair[::-1]
+            group_id, cents = None, abs(cents)
+        elif self.group_balances:
+            group_id = self.rng.choice(list(self.group_balances))
+            balances = self.group_balances[group_id]
+            borrower = min(balances, key=balances.__getitem__)
+            lender = max(balances, key=balances.__getitem__)
+            cents = min(-balances[borrower], balances[lender])
+            if cents <= 0:
+                return None
+        else:
+            return None
+        return ExpenseData(
+            amount=cents / 100,
+            description="Settlement",
+            category=ExpenseCategory.SETTLEMENT,
+            payers_split=SplitType.AMOUNT,
+            owers_split=SplitType.AMOUNT,
+            payers={borrower: cents / 100},
+            owers={lender: cents / 100},
+            group_id=group_id,
+            creator_id=borrower,
+            created_at=created_at,
+        )
+
+    def _apply(self, data: ExpenseData, balances: dict[int, dict[str, float]]) -> None:
+        totals = {user_id: balance[TOTAL] for user_id, balance in balances.items()}
+        if data.group_id is not None:
+            group = self.group_balances.setdefault(data.group_id, {})
+            for user_id, total in totals.items():
+                group[user_id] = group.get(user_id, 0) + round(total * 100)
+            return
+        for borrower_id, lender_id, amount in simplify_debts(totals):
+            if lender_id < borrower_id:
+                pair, sign = (lender_id, borrower_id), 1
+            else:
+                pair, sign = (borrower_id, lender_id), -1
+            if pair not in self.debts:
+                self._debt_pairs.append(pair)
+            self.debts[pair] = self.debts.get(pair, 0) + sign * round(amount * 100)
+
+    def __iter__(self) -> Iterator[tuple[ExpenseData, dict[int, dict[str, float]]]]:
+        """Yields config.expenses expenses with their balances, oldest first."""
+        if not self.groups:
+            return
+        start = self.config.end - timedelta(days=self.config.days)
+        step = timedelta(days=self.config.days) / max(self.config.expenses, 1)
+        for number in range(self.config.expenses):
+            created_at = start + step * number
+            data = None
+            if self.rng.random() < self.config.settlement_share:
+                data = self._settlement(created_at)
+            data = data or self._expense(created_at)
+            balances = split(
+                data.amount,
+                data.payers,
+                data.owers,
+                data.payers_split,
+                data.owers_split,
+                REMAINDER,
+            )
+            self._apply(data, balances)
+            yield data, balances
+
+
+def zipf_group_sizes(
+    rng: random.Random, count: int, max_size: int, exponent: float
+) -> list[int]:
+    """Group sizes in [2, max_size], size k drawn with a weight of 1/k^exponent."""
+    sizes = range(2, max(max_size, 2) + 1)
+    return rng.choices(sizes, weights=[1 / size**exponent for size in sizes], k=count)
+
+
+def create_population(
+    writer: BulkWriter, config: WorkloadConfig
+) -> tuple[list[int], list[tuple[int, list[int]]]]:
+    """Creates the users and the Zipf sized groups of the workload."""
+    rng = random.Random(config.seed)
+    user_ids = writer.add_users(config.users)
+    sizes = zipf_group_sizes(
+        rng,
+        config.groups,
+        min(config.max_group_size, config.users),
+        config.group_size_exponent,
+    )
+    memberships = [
+        (f"Group {number}", rng.sample(user_ids, size))
+        for number, size in enumerate(sizes, 1)
+    ]
+    group_ids = writer.add_groups(memberships)
+    return user_ids, [(id, members) for id, (_, members) in zip(group_ids, memberships)]
+
+
+def to_json(data: ExpenseData) -> dict:
+    """An expense in the format read by the bulk importer."""
+    return {
+        "amount": data.amount,
+        "description": data.description,
+        "category": data.category.value,
+        "payers_split": data.payers_split.value,
+        "owers_split": data.owers_split.value,
+        "payers": [{"user_id": u, "amount": a} for u, a in data.payers.items()],
+        "owers": [{"user_id": u, "amount": a} for u, a in data.owers.items()],
+        "group_id": data.group_id,
+        "creator_id": data.creator_id,
+        "created_at": data.created_at.isoformat() if data.created_at else None,
+    }
+
+
+def generate(
+    config: WorkloadConfig,
+    output: IO[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Callable[[SeedStats], None] | None = None,
+) -> SeedStats:
+    """
+    Creates the workload's users and groups, then writes its expenses either
+    to the database with a BulkWriter, or to output as JSON lines for
+    flask database import.
+    """
+    writer = BulkWriter(batch_size, progress)
+    user_ids, groups = create_population(writer, config)
+    workload = Workload(config, user_ids, groups)
+
+    if output is None:
+        for data, balances in workload:
+            writer.add_expense(
+                amount=data.amount,
+                creator_id=data.creator_id,
+                balances=balances,
+                group_id=data.group_id,
+                description=data.description,
+                category=data.category,
+                payers_split=data.payers_split,
+                owers_split=data.owers_split,
+                created_at=data.created_at,
+            )
+        return writer.finish()
+
+    stats = writer.finish()
+    for data, _ in workload:
+        output.write(json.dumps(to_json(data)) + "\n")
+        stats.expenses += 1
+        if progress and stats.expenses % batch_size == 0:
+            progress(stats)
+    return stats
@@ -1,5 +1,6 @@
 from app.enum import FormEnum
 from . import amount, equally, percentage
+from .remainder import RemainderStrategy
 
 
 class SplitType(FormEnum):
@@ -9,15 +10,18 @@ class SplitType(FormEnum):
 
 
 def _split_by_type(
-    total_amount: float, users: dict[int, float | None], split_type: SplitType
+    total_amount: float,
+    users: dict[int, float | None],
+    split_type: SplitType,
+    remainder: RemainderStrategy,
 ) -> dict[int, float]:
     match split_type:
         case SplitType.AMOUNT:
             return users
         case SplitType.EQUALLY:
-            return equally.split(total_amount, users)
+            return equally.split(total_amount, users, remainder)
         case SplitType.PERCENTAGE:
-            return percentage.split(total_amount, users)
+            return percentage.split(total_amount, users, remainder)
 
 
 def split(
@@ -26,7 +30,8 @@ def split(
     owers: dict[int, float | None],
     payers_split: SplitType,
     owers_split: SplitType,
+    remainder: RemainderStrategy = RemainderStrategy.LARGEST_REMAINDER,
 ) -> dict[int, dict[str, float]]:
-    payers_amount = _split_by_type(total_amount, payers, payers_split)
-    owers_amount = _split_by_type(total_amount, owers, owers_split)
+    payers_amount = _split_by_type(total_amount, payers, payers_split, remainder)
+    owers_amount = _split_by_type(total_amount, owers, owers_split, remainder)
     return amount.split(payers_amount, owers_amount)
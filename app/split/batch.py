@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from app.split import RemainderStrategy, SplitType
+from app.split.constants import OWED, PAYED, TOTAL
+
+
+@dataclass
+class SplitBatch:
+    """
+    Result of splitting many expenses at once.
+    Rows are expenses and columns are users, all amounts in integer cents.
+    """
+
+    payed: np.ndarray
+    owed: np.ndarray
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.payed - self.owed
+
+    def balances(
+        self, index: int, user_ids: Sequence[int]
+    ) -> dict[int, dict[str, float]]:
+        """Returns one expense in the format of app.split.split, for users with a share."""
+        payed, owed = self.payed[index].tolist(), self.owed[index].tolist()
+        return {
+            user_ids[col]: {
+                PAYED: payed[col] / 100,
+                OWED: owed[col] / 100,
+                TOTAL: (payed[col] - owed[col]) / 100,
+            }
+            for col in range(len(user_ids))
+            if payed[col] or owed[col]
+        }
+
+
+def _ranks(
+    mask: np.ndarray,
+    remainder: RemainderStrategy,
+    rng: np.random.Generator,
+    keys: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Order in which the participants of each row get a spare cent, non-participants
+    last. Random, or by ascending keys with ties to the lowest column.
+    """
+    if remainder == RemainderStrategy.RANDOM:
+        order = rng.random(mask.shape)
+    else:
+        order = np.zeros(mask.shape) if keys is None else keys
+    order = np.where(mask, order, np.inf)
+    return np.argsort(np.argsort(order, axis=1, kind="stable"), axis=1)
+
+
+def _split_side(
+    total_cents: np.ndarray,
+    values: np.ndarray,
+    split_types: np.ndarray,
+    remainder: RemainderStrategy,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    mask = ~np.isnan(values)
+    values = np.where(mask, values, 0.0)
+    participants = np.maximum(mask.sum(axis=1), 1)[:, None]
+    total = total_cents[:, None]
+
+    # Equally: base share plus one spare cent for `spare` participants
+    base = total // participants
+    spare = total - base * participants
+    equally = base + (_ranks(mask, remainder, rng) < spare)
+
+    # Percentage: spare cents handed out (or taken back) round-robin
+    quotas = total * values / 100
+    if remainder == RemainderStrategy.LARGEST_REMAINDER:
+        base = np.floor(quotas).astype(np.int64)
+    else:
+        base = np.rint(quotas).astype(np.int64)
+    base[~mask] = 0
+    spare = total - base.sum(axis=1, keepdims=True)
+    fractions = quotas - base
+    keys = np.where(spare > 0, -fractions, fractions)
+    rounds, extra = np.divmod(np.abs(spare), participants)
+    ranks = _ranks(mask, remainder, rng, keys)
+    percentage = base + np.sign(spare) * (rounds + (ranks < extra))
+
+    amount = np.rint(values * 100).astype(np.int64)
+
+    cents = np.select(
+        [split_types == SplitType.EQUALLY, split_types == SplitType.PERCENTAGE],
+        [equally, percentage],
+        amount,
+    )
+    return np.where(mask, cents, 0)
+
+
+def split_many(
+    amounts: Sequence[float],
+    payers_matrix: np.ndarray,
+    owers_matrix: np.ndarray,
+    split_types: Sequence[tuple[SplitType, SplitType]],
+    remainder: RemainderStrategy = RemainderStrategy.LARGEST_REMAINDER,
+    rng: np.random.Generator | None = None,
+) -> SplitBatch:
+    """
+    Splits many expenses at once, with the same semantics as app.split.split.
+
+    :param amounts: Total amount of each expense.
+    :param payers_matrix: Expenses by users array with each payer's value (ignored
+        for equally, percentage or amount otherwise) and NaN for users that are
+        not payers of the expense.
+    :param owers_matrix: Same as payers_matrix, for the owers.
+    :param split_types: (payers_split, owers_split) of each expense.
+    :param remainder: How the spare cents are handed out.
+    :param rng: Random generator used by RemainderStrategy.RANDOM.
+    :return: Payed and owed cents per expense and user.
+    """
+    rng = rng or np.random.default_rng()
+    total_cents = np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+    payers_matrix = np.asarray(payers_matrix, dtype=np.float64)
+    owers_matrix = np.asarray(owers_matrix, dtype=np.float64)
+    payers_split = np.array([payers for payers, _ in split_types], dtype=object)[:, None]
+    owers_split = np.array([owers for _, owers in split_types], dtype=object)[:, None]
+
+    return SplitBatch(
+        payed=_split_side(total_cents, payers_matrix, payers_split, remainder, rng),
+        owed=_split_side(total_cents, owers_matrix, owers_split, remainder, rng),
+    )
@@ -1,7 +1,11 @@
-import random
+from app.split.remainder import RemainderStrategy, distribute
 
 
-def split(total_amount: float, users: dict[int, float | None]) -> dict[int, float]:
+def split(
+    total_amount: float,
+    users: dict[int, float | None],
+    remainder: RemainderStrategy = RemainderStrategy.LARGEST_REMAINDER,
+) -> dict[int, float]:
     num_users = len(users)
 
     # Convert to cents for exact arithmetic
@@ -13,13 +17,7 @@ def split(total_amount: float, users: dict[int, float | None]) -> dict[int, floa
     distributed_total = base_split_cents * num_users
     spare_amount = total_amount_cents - distributed_total
 
-    # Assign the spare amount to a random user if it's non-zero
-    if spare_amount != 0:
-        spare_users = list(users.keys())
-        while spare_amount > 0:
-            random_user = random.choice(spare_users)
-            split[random_user] += 1
-            spare_users.remove(random_user)
-            spare_amount -= 1
+    # Hand out the spare cents, at most one per user
+    distribute(split, spare_amount, remainder)
 
     return {user_id: amount / 100 for user_id, amount in split.items()}
@@ -0,0 +1,55 @@
+import heapq
+import random
+
+from app.enum import FormEnum
+
+
+class RemainderStrategy(FormEnum):
+    """How the cents left over after splitting are handed out."""
+
+    # Random participants, so identical expenses may split differently
+    RANDOM = "random"
+    # Participants with the largest fractional share, ties to the lowest user id
+    LARGEST_REMAINDER = "largest_remainder"
+
+
+def distribute(
+    cents: dict[int, int],
+    spare: int,
+    strategy: RemainderStrategy,
+    fractions: dict[int, float] | None = None,
+) -> dict[int, int]:
+    """
+    Adds `spare` cents (or removes them, if negative) to the split in `cents`,
+    one per user and round-robin if there are more spare cents than users.
+    Runs in O(n log spare).
+
+    :param fractions: Fractional cent each user's share was truncated by, used
+        by LARGEST_REMAINDER. Equal for every user when not given.
+    """
+    if spare == 0 or not cents:
+        return cents
+
+    step = 1 if spare > 0 else -1
+    rounds, spare = divmod(abs(spare), len(cents))
+    if rounds:
+        for user_id in cents:
+            cents[user_id] += step * rounds
+
+    match strategy:
+        case RemainderStrategy.RANDOM:
+            chosen = random.sample(list(cents), spare)
+        case RemainderStrategy.LARGEST_REMAINDER:
+            fractions = fractions or {}
+            if step > 0:
+                chosen = heapq.nsmallest(
+                    spare, cents, key=lambda uid: (-fractions.get(uid, 0.0), uid)
+                )
+            else:
+                chosen = heapq.nsmallest(
+                    spare, cents, key=lambda uid: (fractions.get(uid, 0.0), uid)
+                )
+
+    for user_id in chosen:
+        cents[user_id] += step
+    return cents
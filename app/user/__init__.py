@@ -1,6 +1,12 @@
+from dataclasses import dataclass, fields
 from flask_login import current_user
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from app.model.debt import Debt
 from app.model.expense import Expense, ExpenseCategory
 from app.model.user import User
+from app.model.user_balance_summary import UserBalanceSummary
+from app.cache import cached_for_user, invalidate
 from app.model.constants import NO_GROUP
 from app.expense import ExpenseData
 from app.split import SplitType
@@ -20,34 +26,79 @@ def update_expenses_in_users(expenses: list[Expense]) -> None:
 
 
 def get_user_balances(user: User) -> tuple[dict[int, float], float]:
+    """
+    Returns the user's balance in each of their groups and outside any group,
+    keyed by NO_GROUP, and their overall balance. The totals are read from the
+    user's balance summary instead of being summed over all their debts.
+    Cached until the user's balances change.
+    """
+    group_balances, overall_balance = cached_for_user(
+        "user_balances", user.id, lambda: _compute_user_balances(user)
+    )
+    # Callers pop NO_GROUP, so never hand out the cached dictionary itself
+    return dict(group_balances), overall_balance
+
+
+def _compute_user_balances(user: User) -> tuple[dict[int, float], float]:
+    summary = UserBalanceSummary.find(user.id)
+
     # Initialize group balances with group IDs
     group_balances = dict.fromkeys([group.id for group in user.groups], 0.0)
-    group_balances[NO_GROUP] = 0.0
-    overall_balance = 0.0
-
-    # Add individual debts to NO_GROUP category
-    for debt in user.lender_debts:
-        group_balances[NO_GROUP] += debt.amount
-        overall_balance += debt.amount
-    for debt in user.borrower_debts:
-        group_balances[NO_GROUP] -= debt.amount
-        overall_balance -= debt.amount
+    group_balances[NO_GROUP] = summary.no_group_balance if summary else 0.0
+    overall_balance = summary.overall_balance if summary else 0.0
 
     # Add group balances from GroupBalance records
     for group_balance in user.group_balances:
         group_balances[group_balance.group_id] = group_balance.balance
-        overall_balance += group_balance.balance
 
     return group_balances, overall_balance
 
 
-def prepare_dashboard_data(user: User) -> dict:
+@dataclass
+class DashboardData:
+    """Everything the user dashboard renders, with every relationship already loaded."""
+
+    current_user: User
+    no_group_debts: list[Debt]
+    no_group_balance: float
+    groups: list
+    group_balances: dict[int, float]
+    overall_group_balance: float
+    expenses: list[Expense]
+
+    def to_dict(self) -> dict:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+def load_dashboard_user(user_id: int) -> User:
     """
-    Prepares all data needed for the user dashboard.
-    Returns a dictionary with dashboard template data.
+    Loads a user with every relationship the dashboard touches, including the
+    users of each debt and the creator of each expense. Issues a fixed number
+    of queries regardless of how many debts, groups or expenses the user has.
     """
+    return db.session.scalars(
+        select(User)
+        .where(User.id == user_id)
+        .options(
+            selectinload(User.lender_debts).options(
+                joinedload(Debt.low), joinedload(Debt.high)
+            ),
+            selectinload(User.borrower_debts).options(
+                joinedload(Debt.low), joinedload(Debt.high)
+            ),
+            selectinload(User.groups),
+            selectinload(User.group_balances),
+            selectinload(User.expenses).joinedload(Expense.creator),
+        )
+    ).one()
+
+
+def load_dashboard(user: User) -> DashboardData:
+    """Loads the user dashboard with a fixed number of queries."""
     from app.group import get_no_group_debts
 
+    user = load_dashboard_user(user.id)
+
     # 1st Column: Debts outside any group
     no_group_debts = get_no_group_debts(user)
     no_group_debts = sorted(
@@ -64,15 +115,23 @@ def prepare_dashboard_data(user: User) -> dict:
     no_group_balance = group_balances.pop(NO_GROUP)
     overall_group_balance = overall_balance - no_group_balance
 
-    return {
-        "current_user": user,
-        "no_group_debts": no_group_debts,
-        "no_group_balance": no_group_balance,
-        "groups": groups_sorted,
-        "group_balances": group_balances,
-        "overall_group_balance": overall_group_balance,
-        "expenses": user.expenses,
-    }
+    return DashboardData(
+        current_user=user,
+        no_group_debts=no_group_debts,
+        no_group_balance=no_group_balance,
+        groups=groups_sorted,
+        group_balances=group_balances,
+        overall_group_balance=overall_group_balance,
+        expenses=user.expenses,
+    )
+
+
+def prepare_dashboard_data(user: User) -> dict:
+    """
+    Prepares all data needed for the user dashboard.
+    Returns a dictionary with dashboard template data.
+    """
+    return load_dashboard(user).to_dict()
 
 
 def handle_add_friend(user: User, email: str) -> dict:
@@ -89,6 +148,7 @@ def handle_add_friend(user: User, email: str) -> dict:
                 "redirect_to": "user.add_friend_form",
             }
         else:
+            invalidate(users=[user.id, friend.id])
             user.add_friends(friend)
             return {
                 "success": True,
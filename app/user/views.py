@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, jsonify, request
 from flask_login import login_required, current_user
 from app.user import (
     prepare_dashboard_data,
@@ -13,7 +13,10 @@ from app.user import (
     process_friend_debt_settlement,
 )
 from app.user.forms import AddFriendForm
+from app.expense.export import export_response
+from app.expense.pagination import parse_page_args, paginate_expenses, user_expenses_query
 from app.debt import get_debts_total_balance
+from app.etag import not_modified, user_etag, with_etag
 
 bp = Blueprint("user", __name__)
 
@@ -21,25 +24,36 @@ bp = Blueprint("user", __name__)
 @bp.route("/user", methods=["GET"])
 @login_required
 def user_dashboard():
+    etag = user_etag(current_user)
+    if response := not_modified(etag):
+        return response
     template_data = prepare_dashboard_data(current_user)
-    return render_template("user/dashboard.html", **template_data)
+    return with_etag(render_template("user/dashboard.html", **template_data), etag)
 
 
 @bp.route("/user/debts", methods=["GET"])
 @login_required
 def debts():
+    etag = user_etag(current_user)
+    if response := not_modified(etag):
+        return response
     debts = current_user.lender_debts + current_user.borrower_debts
     balance = get_debts_total_balance(
         current_user.lender_debts, current_user.borrower_debts
     )
-    return render_template("user/debts.html", debts=debts, balance=balance)
+    return with_etag(
+        render_template("user/debts.html", debts=debts, balance=balance), etag
+    )
 
 
 @bp.route("/user/groups", methods=["GET"])
 @login_required
 def groups():
+    etag = user_etag(current_user)
+    if response := not_modified(etag):
+        return response
     template_data = prepare_groups_data(current_user)
-    return render_template("user/groups.html", **template_data)
+    return with_etag(render_template("user/groups.html", **template_data), etag)
 
 
 @bp.route("/user/friends", methods=["GET", "POST"])
@@ -66,17 +80,40 @@ def add_friend_form():
 @bp.route("/user/expenses", methods=["GET"])
 @login_required
 def expenses():
-    expenses = current_user.expenses
+    try:
+        cursor, limit = parse_page_args(request.args)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("user.expenses"))
+
+    page = paginate_expenses(user_expenses_query(current_user.id), cursor, limit)
     return render_template(
-        "user/expenses.html", current_user=current_user, expenses=expenses
+        "user/expenses.html",
+        current_user=current_user,
+        expenses=page.expenses,
+        next_cursor=page.next_cursor,
+        limit=limit,
     )
 
 
+@bp.route("/user/export.<any(csv, jsonl):format>", methods=["GET"])
+@login_required
+def export_expenses(format):
+    """
+    Streams every expense of the current user with its balances, oldest
+    first, as a CSV or JSON lines download.
+    """
+    return export_response(f"user-{current_user.id}-expenses", format, user_id=current_user.id)
+
+
 @bp.route("/user/balances", methods=["GET"])
 @login_required
 def balance():
+    etag = user_etag(current_user)
+    if response := not_modified(etag):
+        return response
     template_data = prepare_balances_data(current_user)
-    return render_template("user/balances.html", **template_data)
+    return with_etag(render_template("user/balances.html", **template_data), etag)
 
 
 @bp.route("/users/<int:user_id>", methods=["GET"])
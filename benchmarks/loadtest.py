@@ -0,0 +1,335 @@
+"""
+HTTP load test of the dashboard, group overview, expense creation and settlement.
+
+Boots create_app against a local database seeded with app.seed, a temporary
+SQLite file unless --database is given, then runs simulated user sessions
+from several threads, each session with its own test client: log in, then
+for a number of rounds open the dashboard and a group, submit an expense in
+the group and, every few rounds, settle the user's balance in it. Reports
+requests per second, percentiles and a latency histogram per route.
+
+Usage:
+    python -m benchmarks.loadtest [--threads 8] [--sessions 64] [--rounds 10]
+        [--users 500] [--groups 50] [--expenses 20000]
+        [--database postgresql://localhost/xchange_load] [--output results.json]
+"""
+
+import argparse
+import json
+import math
+import random
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import select
+
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.model.expense import ExpenseCategory
+from app.model.group import group_members
+from app.seed import CATEGORIES, SEED_PASSWORD, SeedConfig, seed
+from app.split import SplitType
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf]
+PERCENTILES = [0.5, 0.95, 0.99]
+# Seconds SQLite writers wait for the lock instead of failing under concurrency
+SQLITE_TIMEOUT = 30
+
+
+class LoadTestConfig(Config):
+    WTF_CSRF_ENABLED = False
+
+
+def config_for(database: str) -> type[LoadTestConfig]:
+    engine_options = {}
+    if database.startswith("sqlite"):
+        engine_options = {"connect_args": {"timeout": SQLITE_TIMEOUT}}
+    return type(
+        "LoadTestConfig",
+        (LoadTestConfig,),
+        {
+            "SQLALCHEMY_DATABASE_URI": database,
+            "SQLALCHEMY_ENGINE_OPTIONS": engine_options,
+        },
+    )
+
+
+def percentile(latencies: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted latencies."""
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, math.ceil(q * len(latencies)) - 1)]
+
+
+@dataclass
+class RouteStats:
+    """Latencies in seconds and error count of the requests to one route."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def histogram(self) -> list[int]:
+        counts = [0] * len(BUCKETS)
+        for latency in self.latencies:
+            counts[next(i for i, bound in enumerate(BUCKETS) if latency * 1e3 <= bound)] += 1
+        return counts
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "rps": len(latencies) / elapsed if elapsed else 0.0,
+            **{f"p{round(q * 100)}_ms": percentile(latencies, q) * 1e3 for q in PERCENTILES},
+            "max_ms": latencies[-1] * 1e3 if latencies else 0.0,
+            "histogram": dict(zip(map(str, BUCKETS), self.histogram())),
+        }
+
+
+class Recorder:
+    """Times requests of many threads, grouped by route."""
+
+    def __init__(self) -> None:
+        self.routes: dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        client: FlaskClient,
+        route: str,
+        method: str,
+        path: str,
+        expected: int | None = None,
+        **kwargs,
+    ) -> int:
+        """
+        Sends a request, records its latency under route and returns its status.
+        A status other than expected, or of 400 and above when expected is None,
+        counts as an error.
+        """
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        latency = time.perf_counter() - started
+        response.close()
+        if expected is None:
+            failed = response.status_code >= 400
+        else:
+            failed = response.status_code != expected
+        with self._lock:
+            stats = self.routes.setdefault(route, RouteStats())
+            stats.latencies.append(latency)
+            stats.errors += failed
+        return response.status_code
+
+
+@dataclass
+class LoadConfig:
+    """Concurrency and length of the simulated sessions."""
+
+    threads: int = 8
+    sessions: int = 64
+    rounds: int = 10
+    # A session settles its group balance every settle_every rounds
+    settle_every: int = 5
+    max_owers: int = 4
+    seed: int = 0
+
+
+def expense_form(
+    rng: random.Random, user_id: int, group_id: int, members: list[int], max_owers: int
+) -> dict:
+    """Form data of an expense paid by user_id, split equally with other members."""
+    others = [member for member in members if member != user_id]
+    owers = [user_id, *rng.sample(others, rng.randint(1, min(max_owers, len(others))))]
+    category: ExpenseCategory = rng.choice(CATEGORIES)
+    form = {
+        "amount": f"{rng.randint(100, 20_000) / 100:.2f}",
+        "description": category.value,
+        "category": category.value,
+        "payers_split": SplitType.EQUALLY.value,
+        "owers_split": SplitType.EQUALLY.value,
+        "payers-0-user_id": str(user_id),
+        "group_id": str(group_id),
+    }
+    for position, ower_id in enumerate(owers):
+        form[f"owers-{position}-user_id"] = str(ower_id)
+    return form
+
+
+def run_session(
+    app: Flask,
+    recorder: Recorder,
+    config: LoadConfig,
+    user_id: int,
+    group_id: int,
+    members: list[int],
+    rng: random.Random,
+) -> None:
+    client = app.test_client()
+    recorder.request(
+        client,
+        "POST /login",
+        "POST",
+        "/login",
+        data={"email": f"{user_id}@seed.example.com", "password": SEED_PASSWORD},
+    )
+    for round in range(1, config.rounds + 1):
+        recorder.request(client, "GET /user", "GET", "/user")
+        recorder.request(client, "GET /groups/<id>", "GET", f"/groups/{group_id}")
+        # A created expense renders its summary, a rejected one redirects to the form
+        recorder.request(
+            client,
+            "POST /expenses",
+            "POST",
+            "/expenses",
+            expected=200,
+            data=expense_form(rng, user_id, group_id, members, config.max_owers),
+        )
+        if round % config.settle_every == 0:
+            recorder.request(
+                client,
+                "POST /groups/<id>/settle/<user_id>",
+                "POST",
+                f"/groups/{group_id}/settle/{user_id}",
+            )
+    recorder.request(client, "GET /logout", "GET", "/logout")
+
+
+def group_memberships() -> list[tuple[int, list[int]]]:
+    """(group id, member ids) of every group with at least two members."""
+    members: dict[int, list[int]] = {}
+    for group_id, user_id in db.session.execute(
+        select(group_members.c.group_id, group_members.c.user_id)
+    ):
+        members.setdefault(group_id, []).append(user_id)
+    return [(id, users) for id, users in sorted(members.items()) if len(users) > 1]
+
+
+def run_load(app: Flask, config: LoadConfig) -> tuple[dict[str, RouteStats], float]:
+    """
+    Runs config.sessions sessions on config.threads threads, spread over the
+    groups of the database. Returns the stats per route and the elapsed time.
+    """
+    rng = random.Random(config.seed)
+    with app.app_context():
+        groups = group_memberships()
+    if not groups:
+        raise ValueError("The database has no group with two members or more.")
+
+    sessions = []
+    for number in range(config.sessions):
+        group_id, members = groups[number % len(groups)]
+        sessions.append((rng.choice(members), group_id, members, random.Random(rng.random())))
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.threads) as executor:
+        futures = [
+            executor.submit(run_session, app, recorder, config, *session)
+            for session in sessions
+        ]
+        for future in futures:
+            future.result()
+    return recorder.routes, time.perf_counter() - started
+
+
+@contextmanager
+def seeded_app(database: str | None, seed_config: SeedConfig) -> Iterator[Flask]:
+    """An app on database, or on a temporary SQLite file, after seeding it."""
+    with tempfile.TemporaryDirectory() as directory:
+        url = database or f"sqlite:///{Path(directory) / 'loadtest.db'}"
+        app = create_app(config=config_for(url))
+        with app.app_context():
+            db.create_all()
+            seed(seed_config)
+            db.session.remove()
+        try:
+            yield app
+        finally:
+            with app.app_context():
+                db.engine.dispose()
+
+
+def report(routes: dict[str, RouteStats], elapsed: float) -> dict:
+    summaries = {route: stats.summary(elapsed) for route, stats in routes.items()}
+    requests = sum(summary["requests"] for summary in summaries.values())
+    return {
+        "elapsed": elapsed,
+        "requests": requests,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "routes": summaries,
+    }
+
+
+def print_report(results: dict) -> None:
+    header = f"{'route':<36} {'requests':>8} {'errors':>6} {'req/s':>8}"
+    header += "".join(f" {f'p{round(q * 100)} ms':>8}" for q in PERCENTILES)
+    print(f"{header} {'max ms':>8}")
+    for route, summary in results["routes"].items():
+        percentiles = "".join(
+            f" {summary[f'p{round(q * 100)}_ms']:>8.1f}" for q in PERCENTILES
+        )
+        print(
+            f"{route:<36} {summary['requests']:>8} {summary['errors']:>6}"
+            f" {summary['rps']:>8.1f}{percentiles} {summary['max_ms']:>8.1f}"
+        )
+    print(
+        f"{results['requests']} requests in {results['elapsed']:.1f}s,"
+        f" {results['rps']:.1f} req/s"
+    )
+
+    for route, summary in results["routes"].items():
+        print(f"\n{route}")
+        largest = max(summary["histogram"].values()) or 1
+        for bound, count in summary["histogram"].items():
+            label = f"<= {float(bound):g} ms" if bound != "inf" else "> 5000 ms"
+            print(f"  {label:>12} {count:>7} {'#' * round(40 * count / largest)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds per session.")
+    parser.add_argument("--settle-every", type=int, default=5)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--expenses", type=int, default=20_000)
+    parser.add_argument(
+        "--database", help="SQLAlchemy URL, a temporary SQLite file by default."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Save the results as JSON.")
+    args = parser.parse_args()
+
+    seed_config = SeedConfig(
+        users=args.users, groups=args.groups, expenses=args.expenses, seed=args.seed
+    )
+    load_config = LoadConfig(
+        threads=args.threads,
+        sessions=args.sessions,
+        rounds=args.rounds,
+        settle_every=args.settle_every,
+        seed=args.seed,
+    )
+    with seeded_app(args.database, seed_config) as app:
+        routes, elapsed = run_load(app, load_config)
+
+    results = report(routes, elapsed)
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark of the debt simplification engines in app.debt.
+
+Times the linear-scan engine against the two-heap engine on random zero-sum
+group balances and reports where the heap engine starts to win. Both engines
+are checked to produce identical transactions on every input.
+
+Usage:
+    python -m benchmarks.simplify_debts [--sizes 2,4,8,...] [--repeat 5]
+"""
+
+import argparse
+import random
+import timeit
+
+from app.debt import _simplify_debts_heap, _simplify_debts_scan, _to_cents
+
+DEFAULT_SIZES = [2, 4, 8, 12, 16, 24, 32, 64, 128, 512, 1024, 4096]
+
+
+def random_balances(size: int, rng: random.Random) -> dict[int, float]:
+    """Random cent-exact balances for `size` members that sum to zero."""
+    cents = [rng.randint(-50_000, 50_000) for _ in range(size - 1)]
+    cents.append(-sum(cents))
+    return {uid: c / 100 for uid, c in enumerate(cents, start=1)}
+
+
+def time_engine(engine, cents: dict[int, int], repeat: int) -> float:
+    """Best-of-`repeat` seconds for one call (engines consume their input)."""
+    timer = timeit.Timer(lambda: engine(dict(cents)))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(sizes: list[int], repeat: int, seed: int) -> list[tuple[int, float, float]]:
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        cents = _to_cents(random_balances(size, rng))
+        assert _simplify_debts_scan(dict(cents)) == _simplify_debts_heap(dict(cents))
+        scan = time_engine(_simplify_debts_scan, cents, repeat)
+        heap = time_engine(_simplify_debts_heap, cents, repeat)
+        results.append((size, scan, heap))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Group sizes."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = run(sizes, args.repeat, args.seed)
+
+    print(f"{'members':>8} {'scan (ms)':>12} {'heap (ms)':>12} {'speedup':>8}")
+    crossover = None
+    for size, scan, heap in results:
+        if crossover is None and heap < scan:
+            crossover = size
+        print(f"{size:>8} {scan * 1e3:>12.4f} {heap * 1e3:>12.4f} {scan / heap:>7.2f}x")
+    print(f"heap engine faster from {crossover} members" if crossover else "no crossover")
+
+
+if __name__ == "__main__":
+    main()
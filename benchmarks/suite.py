@@ -0,0 +1,295 @@
+"""
+Micro-benchmark suite of the expense hot paths.
+
+Times app.split.split for every payers/owers SplitType combination,
+simplify_debts, Debt.update, GroupBalance.update_balance and submit_expense
+with 2 to 10,000 participants, the database ones against an in-memory SQLite
+database. Results are saved as JSON, and compare checks them against the
+baseline kept in benchmarks/baseline.json, exiting with 1 when a case got
+slower by more than the threshold and by more than min-delta microseconds, so
+that noise on the fastest cases is not reported.
+
+Usage:
+    python -m benchmarks.suite run [--sizes 2,10,...] [--filter split/] [--output results.json]
+    python -m benchmarks.suite run --output benchmarks/baseline.json   # New baseline
+    python -m benchmarks.suite compare [results.json] [--threshold 0.25] [--min-delta 5]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+from collections.abc import Callable
+from itertools import product
+from pathlib import Path
+
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.debt import simplify_debts
+from app.expense import ExpenseData
+from app.expense.submit import submit_expense
+from app.model.debt import Debt
+from app.model.expense import ExpenseCategory
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.seed import BulkWriter
+from app.split import RemainderStrategy, SplitType, split
+from benchmarks.simplify_debts import random_balances
+
+DEFAULT_SIZES = [2, 10, 100, 1000, 10_000]
+DEFAULT_THRESHOLD = 0.25
+# Microseconds a case may get slower by before it is flagged, whatever the ratio
+DEFAULT_MIN_DELTA = 5.0
+DEFAULT_REPEAT = 5
+BASELINE = Path(__file__).with_name("baseline.json")
+REMAINDER = RemainderStrategy.LARGEST_REMAINDER
+# Cents per participant, so that no share rounds down to nothing
+CENTS_PER_USER = 1000
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    BALANCE_CACHE_SIZE = 0
+
+
+def split_values(split_type: SplitType, users: list[int], cents: int) -> dict:
+    """Values of users for split_type, as ExpenseForm would accept them."""
+    match split_type:
+        case SplitType.AMOUNT:
+            share, spare = divmod(cents, len(users))
+            return {u: (share + (i < spare)) / 100 for i, u in enumerate(users)}
+        case SplitType.PERCENTAGE:
+            return {u: 100 / len(users) for u in users}
+    return {u: None for u in users}
+
+
+def expense_data(size: int, group_id: int | None = None) -> ExpenseData:
+    """User 1 pays for an expense split equally between users 1 to size."""
+    users = list(range(1, size + 1))
+    cents = CENTS_PER_USER * size
+    return ExpenseData(
+        amount=cents / 100,
+        description="Benchmark",
+        category=ExpenseCategory.OTHER,
+        payers_split=SplitType.EQUALLY,
+        owers_split=SplitType.EQUALLY,
+        payers={1: None},
+        owers=split_values(SplitType.EQUALLY, users, cents),
+        group_id=group_id,
+        creator_id=1,
+    )
+
+
+def populate(size: int) -> int:
+    """
+    Creates users 1 to size and a group, then an expense paid by user 1 in
+    and outside of the group, so that user 1 has size - 1 debts and the group
+    size balances. Returns the group id.
+    """
+    db.drop_all()
+    db.create_all()
+    group = Group(name="Benchmark")
+    db.session.add(group)
+    db.session.flush()
+
+    writer = BulkWriter()
+    writer.add_users(size)
+    data = expense_data(size)
+    balances = split(
+        data.amount, data.payers, data.owers, data.payers_split, data.owers_split, REMAINDER
+    )
+    writer.add_expense(data.amount, 1, balances)
+    writer.add_expense(data.amount, 1, balances, group.id)
+    writer.finish()
+    return group.id
+
+
+def split_case(payers_split: SplitType, owers_split: SplitType) -> Callable:
+    def setup(size: int, rng: random.Random, group_id: int) -> Callable[[], object]:
+        users = list(range(1, size + 1))
+        cents = CENTS_PER_USER * size
+        payers = split_values(payers_split, users[: max(1, size // 2)], cents)
+        owers = split_values(owers_split, users, cents)
+        return lambda: split(cents / 100, payers, owers, payers_split, owers_split, REMAINDER)
+
+    return setup
+
+
+def simplify_debts_case(size: int, rng: random.Random, group_id: int) -> Callable:
+    balances = random_balances(size, rng)
+    return lambda: simplify_debts(balances)
+
+
+def debt_update_case(size: int, rng: random.Random, group_id: int) -> Callable:
+    """User 1 lends one more cent to its last borrower, among size - 1."""
+    return lambda: Debt.update(size, 1, 0.01)
+
+
+def group_balance_case(size: int, rng: random.Random, group_id: int) -> Callable:
+    """One member's balance changes, in a group of size balances."""
+    return lambda: GroupBalance.update_balance(1, group_id, 0.01)
+
+
+def submit_expense_case(in_group: bool) -> Callable:
+    def setup(size: int, rng: random.Random, group_id: int) -> Callable[[], object]:
+        data = expense_data(size, group_id if in_group else None)
+        return lambda: submit_expense(data)
+
+    return setup
+
+
+CASES: dict[str, Callable[[int, random.Random, int], Callable[[], object]]] = {
+    **{
+        f"split/{payers.name.lower()}-{owers.name.lower()}": split_case(payers, owers)
+        for payers, owers in product(SplitType, SplitType)
+    },
+    "simplify_debts": simplify_debts_case,
+    "debt_update": debt_update_case,
+    "group_balance_update": group_balance_case,
+    "submit_expense/no_group": submit_expense_case(False),
+    "submit_expense/group": submit_expense_case(True),
+}
+# Each call adds an expense to every participant's expenses, which are loaded
+# by the next call, so these are timed once per repeat instead of autoranged
+SINGLE_CALL = {"submit_expense/no_group", "submit_expense/group"}
+
+
+def time_call(call: Callable[[], object], repeat: int, single: bool = False) -> float:
+    """Median of `repeat` timings, in seconds for one call."""
+    timer = timeit.Timer(call)
+    number = 1 if single else timer.autorange()[0]
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(
+    sizes: list[int],
+    repeat: int,
+    seed: int,
+    filter: str = "",
+    progress: Callable[[str, float], None] | None = None,
+) -> dict[str, float]:
+    """Seconds per call of each case whose name contains filter, keyed "case[size]"."""
+    rng = random.Random(seed)
+    app = create_app(config=BenchmarkConfig)
+    results = {}
+    with app.app_context():
+        for size in sizes:
+            group_id = populate(size)
+            for name, setup in CASES.items():
+                if filter not in name:
+                    continue
+                key = f"{name}[{size}]"
+                results[key] = time_call(
+                    setup(size, rng, group_id), repeat, name in SINGLE_CALL
+                )
+                if progress:
+                    progress(key, results[key])
+            db.session.remove()
+    return results
+
+
+def compare(
+    baseline: dict[str, float],
+    results: dict[str, float],
+    threshold: float,
+    min_delta: float = 0.0,
+) -> list[tuple[str, float, float, bool]]:
+    """
+    (case, baseline, current, regressed) for every case timed in both, where
+    regressed means slower than the baseline by more than threshold and by
+    more than min_delta seconds.
+    """
+    return [
+        (
+            key,
+            baseline[key],
+            current,
+            current > baseline[key] * (1 + threshold)
+            and current - baseline[key] > min_delta,
+        )
+        for key, current in results.items()
+        if key in baseline
+    ]
+
+
+def load(path: Path) -> dict[str, float]:
+    return json.loads(path.read_text())["results"]
+
+
+def save(path: Path, results: dict[str, float]) -> None:
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+
+
+def print_result(key: str, seconds: float) -> None:
+    print(f"{key:<40} {seconds * 1e6:>14.2f} us", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Time the cases.")
+    compare_parser = commands.add_parser("compare", help="Compare with the baseline.")
+    compare_parser.add_argument(
+        "results", nargs="?", type=Path, help="Saved results, timed now if missing."
+    )
+    compare_parser.add_argument("--baseline", type=Path, default=BASELINE)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown, 0.25 is 25%% slower.",
+    )
+    compare_parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=DEFAULT_MIN_DELTA,
+        help="Allowed slowdown in microseconds, whatever the threshold.",
+    )
+    for command in (run_parser, compare_parser):
+        command.add_argument(
+            "--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Participants."
+        )
+        command.add_argument("--filter", default="", help="Only cases containing this.")
+        command.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+        command.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", type=Path, help="Save the results as JSON.")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if args.command == "run":
+        results = run(sizes, args.repeat, args.seed, args.filter, print_result)
+        if args.output:
+            save(args.output, results)
+        return
+
+    if args.results:
+        results = load(args.results)
+    else:
+        results = run(sizes, args.repeat, args.seed, args.filter, print_result)
+    rows = compare(load(args.baseline), results, args.threshold, args.min_delta / 1e6)
+
+    print(f"{'case':<40} {'baseline (us)':>14} {'current (us)':>14} {'change':>8}")
+    for key, before, after, regressed in rows:
+        change = f"{(after / before - 1) * 100:+.1f}%"
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<40} {before * 1e6:>14.2f} {after * 1e6:>14.2f} {change:>8}{flag}")
+    regressions = sum(regressed for *_, regressed in rows)
+    print(
+        f"{regressions} of {len(rows)} cases slower than {args.threshold:.0%} "
+        f"and {args.min_delta:g} us over baseline"
+    )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Add expense keyset pagination indexes
+
+Revision ID: 5e81b0c4d2a7
+Revises: c3d9a1f27b54
+Create Date: 2026-10-18 14:03:52.318940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e81b0c4d2a7'
+down_revision = 'c3d9a1f27b54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('expense', schema=None) as batch_op:
+        batch_op.create_index('ix_expense_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_expense_group_id_created_at_id', ['group_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('expense', schema=None) as batch_op:
+        batch_op.drop_index('ix_expense_group_id_created_at_id')
+        batch_op.drop_index('ix_expense_created_at_id')
@@ -0,0 +1,44 @@
+"""Add user balance summary
+
+Revision ID: 9b2f6d14e8c3
+Revises: 5e81b0c4d2a7
+Create Date: 2026-10-18 15:21:07.684213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2f6d14e8c3'
+down_revision = '5e81b0c4d2a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_balance_summary',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('no_group_balance', sa.Float(), nullable=False),
+    sa.Column('group_balance', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name=op.f('fk_user_balance_summary_user_id_user')),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_user_balance_summary'))
+    )
+
+    # Data migration: sum each user's debts and group balances
+    op.execute("""
+        INSERT INTO user_balance_summary (user_id, no_group_balance, group_balance)
+        SELECT user_id, ROUND(SUM(no_group_balance), 2), ROUND(SUM(group_balance), 2)
+        FROM (
+            SELECT low_id AS user_id, balance AS no_group_balance, 0.0 AS group_balance FROM debt
+            UNION ALL
+            SELECT high_id, -balance, 0.0 FROM debt
+            UNION ALL
+            SELECT user_id, 0.0, balance FROM group_balance
+        ) AS balances
+        GROUP BY user_id
+    """)
+
+
+def downgrade():
+    op.drop_table('user_balance_summary')
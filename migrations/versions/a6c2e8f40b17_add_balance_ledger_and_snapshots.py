@@ -0,0 +1,76 @@
+"""Add balance ledger and snapshots
+
+Revision ID: a6c2e8f40b17
+Revises: e47a3c9d1f60
+Create Date: 2026-10-18 18:12:31.508342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2e8f40b17'
+down_revision = 'e47a3c9d1f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('counterparty_id', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('cents', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('(counterparty_id IS NULL) <> (group_id IS NULL)', name='ck_ledger_entry_single_target'),
+    sa.ForeignKeyConstraint(['counterparty_id'], ['user.id'], name=op.f('fk_ledger_entry_counterparty_id_user')),
+    sa.ForeignKeyConstraint(['group_id'], ['group.id'], name=op.f('fk_ledger_entry_group_id_group')),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name=op.f('fk_ledger_entry_user_id_user')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_ledger_entry'))
+    )
+    op.create_table('ledger_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ledger_offset', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_ledger_snapshot'))
+    )
+    op.create_table('ledger_snapshot_balance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('snapshot_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('counterparty_id', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('cents', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['counterparty_id'], ['user.id'], name=op.f('fk_ledger_snapshot_balance_counterparty_id_user')),
+    sa.ForeignKeyConstraint(['group_id'], ['group.id'], name=op.f('fk_ledger_snapshot_balance_group_id_group')),
+    sa.ForeignKeyConstraint(['snapshot_id'], ['ledger_snapshot.id'], name=op.f('fk_ledger_snapshot_balance_snapshot_id_ledger_snapshot'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name=op.f('fk_ledger_snapshot_balance_user_id_user')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_ledger_snapshot_balance'))
+    )
+    with op.batch_alter_table('ledger_snapshot_balance', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ledger_snapshot_balance_snapshot_id'), ['snapshot_id'], unique=False)
+
+    # Data migration: open the ledger with the current debts and group balances
+    op.execute("""
+        INSERT INTO ledger_entry (user_id, counterparty_id, group_id, cents, created_at)
+        SELECT low_id, high_id, NULL, CAST(ROUND(balance * 100) AS INTEGER), CURRENT_TIMESTAMP
+        FROM debt
+        WHERE ROUND(balance * 100) <> 0
+    """)
+    op.execute("""
+        INSERT INTO ledger_entry (user_id, counterparty_id, group_id, cents, created_at)
+        SELECT user_id, NULL, group_id, CAST(ROUND(balance * 100) AS INTEGER), CURRENT_TIMESTAMP
+        FROM group_balance
+        WHERE ROUND(balance * 100) <> 0
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('ledger_snapshot_balance', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ledger_snapshot_balance_snapshot_id'))
+
+    op.drop_table('ledger_snapshot_balance')
+    op.drop_table('ledger_snapshot')
+    op.drop_table('ledger_entry')
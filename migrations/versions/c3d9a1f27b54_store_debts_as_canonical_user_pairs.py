@@ -0,0 +1,94 @@
+"""Store debts as canonical user pairs with a signed balance
+
+Revision ID: c3d9a1f27b54
+Revises: 46af0d863f9f
+Create Date: 2026-10-18 10:12:31.502117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d9a1f27b54'
+down_revision = '46af0d863f9f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    # Data migration: merge lender/borrower rows into one signed balance per
+    # user pair, positive when the higher user id owes the lower one
+    debts = connection.execute(
+        sa.text("SELECT lender_id, borrower_id, amount FROM debt")
+    ).fetchall()
+
+    balances = {}
+    for debt in debts:
+        if debt.lender_id < debt.borrower_id:
+            pair, cents = (debt.lender_id, debt.borrower_id), round(debt.amount * 100)
+        else:
+            pair, cents = (debt.borrower_id, debt.lender_id), -round(debt.amount * 100)
+        balances[pair] = balances.get(pair, 0) + cents
+
+    connection.execute(sa.text("DELETE FROM debt"))
+
+    with op.batch_alter_table('debt', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_debt_lender_id', type_='unique')
+        batch_op.drop_constraint('fk_debt_lender_id_user', type_='foreignkey')
+        batch_op.drop_constraint('fk_debt_borrower_id_user', type_='foreignkey')
+        batch_op.drop_column('lender_id')
+        batch_op.drop_column('borrower_id')
+        batch_op.drop_column('amount')
+        batch_op.add_column(sa.Column('low_id', sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column('high_id', sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column('balance', sa.Float(), nullable=False))
+        batch_op.create_foreign_key(batch_op.f('fk_debt_low_id_user'), 'user', ['low_id'], ['id'])
+        batch_op.create_foreign_key(batch_op.f('fk_debt_high_id_user'), 'user', ['high_id'], ['id'])
+        batch_op.create_unique_constraint(batch_op.f('uq_debt_low_id'), ['low_id', 'high_id'])
+        batch_op.create_check_constraint('ck_debt_canonical_pair', 'low_id < high_id')
+        batch_op.create_index(batch_op.f('ix_debt_high_id'), ['high_id'], unique=False)
+
+    for (low_id, high_id), cents in balances.items():
+        if cents != 0:  # Only insert unsettled pairs
+            connection.execute(sa.text("""
+                INSERT INTO debt (low_id, high_id, balance)
+                VALUES (:low_id, :high_id, :balance)
+            """), {"low_id": low_id, "high_id": high_id, "balance": cents / 100})
+
+
+def downgrade():
+    connection = op.get_bind()
+
+    debts = connection.execute(
+        sa.text("SELECT low_id, high_id, balance FROM debt")
+    ).fetchall()
+
+    connection.execute(sa.text("DELETE FROM debt"))
+
+    with op.batch_alter_table('debt', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_debt_high_id'))
+        batch_op.drop_constraint('ck_debt_canonical_pair', type_='check')
+        batch_op.drop_constraint(batch_op.f('uq_debt_low_id'), type_='unique')
+        batch_op.drop_constraint(batch_op.f('fk_debt_low_id_user'), type_='foreignkey')
+        batch_op.drop_constraint(batch_op.f('fk_debt_high_id_user'), type_='foreignkey')
+        batch_op.drop_column('low_id')
+        batch_op.drop_column('high_id')
+        batch_op.drop_column('balance')
+        batch_op.add_column(sa.Column('lender_id', sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column('borrower_id', sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column('amount', sa.Float(), nullable=False))
+        batch_op.create_foreign_key('fk_debt_lender_id_user', 'user', ['lender_id'], ['id'])
+        batch_op.create_foreign_key('fk_debt_borrower_id_user', 'user', ['borrower_id'], ['id'])
+        batch_op.create_unique_constraint('uq_debt_lender_id', ['lender_id', 'borrower_id'])
+
+    for debt in debts:
+        lender_id, borrower_id = (
+            (debt.low_id, debt.high_id) if debt.balance > 0 else (debt.high_id, debt.low_id)
+        )
+        connection.execute(sa.text("""
+            INSERT INTO debt (lender_id, borrower_id, amount)
+            VALUES (:lender_id, :borrower_id, :amount)
+        """), {"lender_id": lender_id, "borrower_id": borrower_id, "amount": abs(debt.balance)})
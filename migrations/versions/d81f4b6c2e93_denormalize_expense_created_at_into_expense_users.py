@@ -0,0 +1,36 @@
+"""Denormalize expense created_at into expense_users
+
+Revision ID: d81f4b6c2e93
+Revises: a6c2e8f40b17
+Create Date: 2026-10-18 20:41:09.276514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f4b6c2e93'
+down_revision = 'a6c2e8f40b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('expense_users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    op.execute(
+        'UPDATE expense_users SET created_at = '
+        '(SELECT expense.created_at FROM expense WHERE expense.id = expense_users.expense_id)'
+    )
+
+    with op.batch_alter_table('expense_users', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_expense_users_user_id_created_at_expense_id', ['user_id', 'created_at', 'expense_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('expense_users', schema=None) as batch_op:
+        batch_op.drop_index('ix_expense_users_user_id_created_at_expense_id')
+        batch_op.drop_column('created_at')
@@ -0,0 +1,32 @@
+"""Add user and group versions
+
+Revision ID: e47a3c9d1f60
+Revises: 9b2f6d14e8c3
+Create Date: 2026-10-18 16:02:44.105873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e47a3c9d1f60'
+down_revision = '9b2f6d14e8c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('group', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('group', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,201 @@
+import pytest
+from flask import g
+
+from app.expense import ExpenseData
+from app.expense.submit import submit_expense
+from app.model.expense import ExpenseCategory
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.split import SplitType
+
+
+@pytest.fixture
+def users(db_session):
+    return [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+
+
+@pytest.fixture
+def group(users):
+    return Group.create("group", users[:2], "Trip")
+
+
+@pytest.fixture
+def client(app, users):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(users[0].id)
+        session["_fresh"] = True
+    yield client
+    g.pop("_login_user", None)
+
+
+def call(client, method, url, **kwargs):
+    # The app context is shared by the whole session, drop the user cached in g
+    g.pop("_login_user", None)
+    return client.open(url, method=method, **kwargs)
+
+
+def expense(payer: User, ower: User, group: Group | None = None) -> ExpenseData:
+    return ExpenseData(
+        amount=10.0,
+        description="Lunch",
+        category=ExpenseCategory.FOOD,
+        payers_split=SplitType.EQUALLY,
+        owers_split=SplitType.EQUALLY,
+        payers={payer.id: None},
+        owers={ower.id: None},
+        group_id=group.id if group else None,
+        creator_id=payer.id,
+    )
+
+
+def test_requires_login(app, db_session):
+    g.pop("_login_user", None)
+    response = app.test_client().get("/api/v1/groups")
+
+    assert response.status_code == 401
+    assert response.json == {"error": "Authentication required."}
+
+
+def test_groups(client, users, group):
+    submit_expense(expense(users[1], users[0], group))
+
+    response = call(client, "GET", "/api/v1/groups")
+
+    assert response.status_code == 200
+    assert response.json == {
+        "items": [
+            {
+                "id": group.id,
+                "name": "group",
+                "description": "Trip",
+                "balance": -10.0,
+                "members": None,
+            }
+        ],
+        "overall_balance": -10.0,
+    }
+
+
+def test_group_with_members(client, users, group):
+    response = call(client, "GET", f"/api/v1/groups/{group.id}?fields=name,members")
+
+    assert response.json == {
+        "name": "group",
+        "members": [
+            {"id": users[0].id, "username": "user0"},
+            {"id": users[1].id, "username": "user1"},
+        ],
+    }
+
+
+def test_group_of_other_users_is_not_found(client, users):
+    other = Group.create("other", users[1:])
+
+    response = call(client, "GET", f"/api/v1/groups/{other.id}")
+
+    assert response.status_code == 404
+    assert response.json == {"error": "Group not found or access denied."}
+
+
+def test_unknown_field_is_rejected(client, group):
+    response = call(client, "GET", f"/api/v1/groups/{group.id}?fields=name,secret")
+
+    assert response.status_code == 400
+    assert response.json["error"].startswith("Unknown fields: secret.")
+
+
+def test_group_balances(client, users, group):
+    submit_expense(expense(users[1], users[0], group))
+
+    response = call(client, "GET", f"/api/v1/groups/{group.id}/balances")
+
+    assert response.json["items"] == [
+        {"user_id": users[0].id, "username": "user0", "balance": -10.0},
+        {"user_id": users[1].id, "username": "user1", "balance": 10.0},
+    ]
+
+
+def test_group_expenses_are_paginated(client, users, group):
+    ids = [submit_expense(expense(users[1], users[0], group)).id for _ in range(3)]
+    url = f"/api/v1/groups/{group.id}/expenses?limit=2&fields=id,amount"
+
+    first = call(client, "GET", url).json
+    second = call(client, "GET", f"{url}&cursor={first['next_cursor']}").json
+
+    assert first["items"] == [{"id": ids[2], "amount": 10.0}, {"id": ids[1], "amount": 10.0}]
+    assert second == {"items": [{"id": ids[0], "amount": 10.0}], "next_cursor": None}
+
+
+def test_invalid_cursor_is_rejected(client, group):
+    response = call(client, "GET", f"/api/v1/groups/{group.id}/expenses?cursor=bad")
+
+    assert response.status_code == 400
+    assert response.json == {"error": "Invalid cursor: bad"}
+
+
+def test_expense(client, users):
+    summary = submit_expense(expense(users[0], users[1]))
+
+    response = call(client, "GET", f"/api/v1/expenses/{summary.id}")
+
+    assert response.json["category"] == "Food"
+    assert response.json["payers_split"] == "Equally"
+    assert sorted(response.json["balances"], key=lambda b: b["total"]) == [
+        {"user_id": users[1].id, "payed": 0.0, "owed": 10.0, "total": -10.0},
+        {"user_id": users[0].id, "payed": 10.0, "owed": 0.0, "total": 10.0},
+    ]
+
+
+def test_user_balances_and_debts(client, users, group):
+    submit_expense(expense(users[1], users[0], group))
+    submit_expense(expense(users[0], users[2]))
+
+    balances = call(client, "GET", "/api/v1/user/balances").json
+    debts = call(client, "GET", "/api/v1/user/debts?fields=lender_id,borrower_id,amount").json
+
+    assert balances["overall_balance"] == 0.0
+    assert {b["group_id"]: b["balance"] for b in balances["items"]} == {
+        group.id: -10.0,
+        None: 10.0,
+    }
+    assert debts["items"] == [
+        {"lender_id": users[0].id, "borrower_id": users[2].id, "amount": 10.0}
+    ]
+
+
+def test_get_is_conditional(client, users, group):
+    url = f"/api/v1/groups/{group.id}/balances"
+    etag = call(client, "GET", url).headers["ETag"]
+
+    assert call(client, "GET", url, headers={"If-None-Match": etag}).status_code == 304
+    other_fields = call(client, "GET", f"{url}?fields=balance", headers={"If-None-Match": etag})
+    assert other_fields.status_code == 200
+
+
+def test_settle_group(client, users, group):
+    submit_expense(expense(users[1], users[0], group))
+
+    preview = call(client, "GET", f"/api/v1/groups/{group.id}/settlement").json
+    response = call(client, "POST", f"/api/v1/groups/{group.id}/settlement")
+
+    assert preview["items"][0]["debtor_id"] == users[0].id
+    assert preview["items"][0]["amount"] == 10.0
+    assert response.status_code == 201
+    assert len(response.json["expenses"]) == 1
+    assert GroupBalance.get_group_balances(group.id) == {}
+
+    response = call(client, "POST", f"/api/v1/groups/{group.id}/settlement")
+    assert response.status_code == 400
+    assert response.json == {"error": "No Active Debts to Settle"}
+
+
+def test_settle_friend_without_debt(client, db_session, users):
+    users[0].add_friends(users[1])
+    db_session.commit()
+
+    response = call(client, "POST", f"/api/v1/friends/{users[1].id}/settlement")
+
+    assert response.status_code == 400
+    assert response.json == {"error": "No debt found between you and this friend"}
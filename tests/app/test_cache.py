@@ -0,0 +1,268 @@
+import pytest
+from flask import g
+from sqlalchemy import event
+
+from app.cache import (
+    EXTENSION,
+    GROUP,
+    USER,
+    BalanceCache,
+    get_cache,
+    init_app,
+    invalidate,
+)
+from app.cache.backends import MISSING, LRUCache, MemoryBackend, SQLiteBackend
+from app.database import db
+from app.expense import ExpenseData
+from app.expense.submit import submit_expense
+from app.group import (
+    get_group_user_balances,
+    prepare_group_balances_data,
+    create_group_settlement_expenses,
+    handle_add_users_to_group,
+)
+from app.model.expense import ExpenseCategory
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.model.constants import NO_GROUP
+from app.split import SplitType
+from app.user import get_user_balances
+
+
+@pytest.fixture
+def cache(app, db_session):
+    """Enables the balance cache, which the test config turns off."""
+    disabled = app.extensions[EXTENSION]
+    app.extensions[EXTENSION] = BalanceCache(MemoryBackend(32))
+    yield get_cache()
+    app.extensions[EXTENSION] = disabled
+
+
+@pytest.fixture
+def group(db_session):
+    users = [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+    return Group.create("group", users)
+
+
+def group_expense(group: Group, payer: User, amount: float) -> ExpenseData:
+    return ExpenseData(
+        amount=amount,
+        description="Group expense",
+        category=ExpenseCategory.FOOD,
+        payers_split=SplitType.EQUALLY,
+        owers_split=SplitType.EQUALLY,
+        payers={payer.id: None},
+        owers={user.id: None for user in group.users},
+        group_id=group.id,
+        creator_id=payer.id,
+    )
+
+
+def count_queries(func, *args):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = func(*args)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert len(lru) == 2
+
+
+def test_disabled_cache_always_computes(app):
+    cache = BalanceCache(MemoryBackend(0))
+    calls = []
+
+    with app.test_request_context():
+        for _ in range(2):
+            cache.get_or_compute("name", "user", 1, lambda: calls.append(1))
+
+    assert len(calls) == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_group_balances_are_cached_between_writes(cache, group):
+    submit_expense(group_expense(group, group.users[0], 30.0))
+
+    first = get_group_user_balances(group)
+    db.session.expire(group, ["group_balances"])
+    second, queries = count_queries(get_group_user_balances, group)
+
+    assert second == first
+    assert queries == 0
+    assert cache.stats()["hits"] == 1
+
+
+def test_reads_after_submit_are_fresh(cache, group):
+    payer = group.users[0]
+    submit_expense(group_expense(group, payer, 30.0))
+    assert get_group_user_balances(group)[payer] == 20.0
+    assert get_user_balances(payer)[0][group.id] == 20.0
+
+    submit_expense(group_expense(group, payer, 60.0))
+
+    assert get_group_user_balances(group)[payer] == 60.0
+    assert get_user_balances(payer)[0][group.id] == 60.0
+    assert get_user_balances(payer)[1] == 60.0
+
+
+def test_reads_after_settlement_are_fresh(cache, group, request_context):
+    submit_expense(group_expense(group, group.users[0], 30.0))
+    assert prepare_group_balances_data(group)["balances"][group.users[0]] == 20.0
+
+    create_group_settlement_expenses(group)
+
+    assert set(get_group_user_balances(group).values()) == {0.0}
+    assert set(prepare_group_balances_data(group)["balances"].values()) == {0.0}
+    assert get_user_balances(group.users[0])[1] == 0.0
+
+
+def test_uncommitted_writes_bypass_the_cache(cache, group):
+    user = group.users[0]
+    assert get_group_user_balances(group)[user] == 0.0
+
+    GroupBalance.update_balance(user.id, group.id, 5.0)
+    invalidate(groups=[group.id])
+    db.session.expire(group, ["group_balances"])
+
+    assert get_group_user_balances(group)[user] == 5.0
+    db.session.rollback()
+
+
+def test_membership_changes_invalidate(cache, group):
+    user = User.create("newcomer", "new@email.com", "password")
+    assert group.id not in get_user_balances(user)[0]
+    assert user not in get_group_user_balances(group)
+
+    handle_add_users_to_group(group, {"friend_ids": str(user.id)})
+
+    assert get_user_balances(user)[0] == {group.id: 0.0, NO_GROUP: 0.0}
+    assert get_group_user_balances(group)[user] == 0.0
+
+
+def test_cached_user_balances_are_copies(cache, group):
+    user = group.users[0]
+    get_user_balances(user)[0].pop(NO_GROUP)
+
+    assert NO_GROUP in get_user_balances(user)[0]
+
+
+def test_cache_stats_endpoint(app, cache, group):
+    # The app context is shared by the whole session, drop the user cached in g
+    g.pop("_login_user", None)
+    client = app.test_client()
+
+    assert client.get("/debug/cache").status_code == 302
+    g.pop("_login_user", None)
+
+    with client.session_transaction() as session:
+        session["_user_id"] = str(group.users[0].id)
+        session["_fresh"] = True
+    response = client.get("/debug/cache")
+    g.pop("_login_user", None)
+
+    assert response.get_json() == {
+        "backend": "MemoryBackend",
+        "hits": 0,
+        "misses": 0,
+        "size": 0,
+        "maxsize": 32,
+    }
+
+
+def test_sqlite_backend_evicts_least_recently_used(tmp_path):
+    backend = SQLiteBackend(maxsize=2, path=str(tmp_path / "cache.db"))
+    backend.set(("a", 1), {1: 1.0})
+    backend.set(("b", 2), [(2, 2.0)])
+    backend.get(("a", 1))
+    backend.set(("c", 3), 3.0)
+
+    assert backend.get(("b", 2)) is MISSING
+    assert backend.get(("a", 1)) == {1: 1.0}
+    assert backend.get(("c", 3)) == 3.0
+    assert len(backend) == 2
+
+
+def test_sqlite_backend_shares_entries_and_invalidations(app, tmp_path):
+    """Two workers sharing the cache file: one's commit invalidates the other's entries."""
+    path = str(tmp_path / "cache.db")
+    worker1 = BalanceCache(SQLiteBackend(maxsize=8, path=path))
+    worker2 = BalanceCache(SQLiteBackend(maxsize=8, path=path))
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    with app.test_request_context():
+        assert worker1.get_or_compute("balances", GROUP, 1, lambda: compute("old")) == "old"
+        assert worker2.get_or_compute("balances", GROUP, 1, lambda: compute("new")) == "old"
+
+        worker1.bump(GROUP, [1])
+
+        assert worker2.get_or_compute("balances", GROUP, 1, lambda: compute("new")) == "new"
+        assert worker1.get_or_compute("balances", GROUP, 1, lambda: compute("newer")) == "new"
+        assert worker1.get_or_compute("balances", USER, 1, lambda: compute("user")) == "user"
+
+    assert calls == ["old", "new", "user"]
+    assert (worker1.hits, worker1.misses) == (1, 2)
+    assert (worker2.hits, worker2.misses) == (1, 1)
+
+
+def test_init_app_backends(app, tmp_path):
+    config = app.config
+    keys = ("BALANCE_CACHE_BACKEND", "BALANCE_CACHE_SIZE", "BALANCE_CACHE_PATH")
+    original = {key: config[key] for key in keys}
+    extension = app.extensions[EXTENSION]
+    try:
+        config.update(
+            BALANCE_CACHE_BACKEND="sqlite",
+            BALANCE_CACHE_SIZE=16,
+            BALANCE_CACHE_PATH=str(tmp_path / "cache.db"),
+        )
+        init_app(app)
+        assert isinstance(get_cache().backend, SQLiteBackend)
+        assert get_cache().enabled
+
+        config.update(BALANCE_CACHE_SIZE=0)
+        init_app(app)
+        assert not get_cache().enabled
+
+        config.update(BALANCE_CACHE_BACKEND="unknown")
+        with pytest.raises(ValueError):
+            init_app(app)
+    finally:
+        config.update(original)
+        app.extensions[EXTENSION] = extension
+
+
+def test_commit_bumps_shared_versions(app, tmp_path, group):
+    app.extensions[EXTENSION], disabled = (
+        BalanceCache(SQLiteBackend(maxsize=8, path=str(tmp_path / "cache.db"))),
+        app.extensions[EXTENSION],
+    )
+    other_worker = SQLiteBackend(maxsize=8, path=str(tmp_path / "cache.db"))
+    try:
+        submit_expense(group_expense(group, group.users[0], 30.0))
+    finally:
+        app.extensions[EXTENSION] = disabled
+
+    assert other_worker.version(GROUP, group.id) == 1
+    assert all(other_worker.version(USER, user.id) == 1 for user in group.users)
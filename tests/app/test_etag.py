@@ -0,0 +1,148 @@
+from unittest.mock import patch
+
+import pytest
+from flask import g
+
+from app.expense import ExpenseData
+from app.expense.submit import submit_expense
+from app.group import handle_add_users_to_group
+from app.model.expense import ExpenseCategory
+from app.model.group import Group
+from app.model.user import User
+from app.split import SplitType
+
+
+@pytest.fixture
+def users(db_session):
+    return [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+
+
+@pytest.fixture
+def group(users):
+    return Group.create("group", users[:2])
+
+
+@pytest.fixture
+def client(app, users):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(users[0].id)
+        session["_fresh"] = True
+    yield client
+    g.pop("_login_user", None)
+
+
+def get(client, url, etag=None):
+    # The app context is shared by the whole session, drop the user cached in g
+    g.pop("_login_user", None)
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(url, headers=headers)
+
+
+def expense(payer: User, ower: User, group: Group | None = None) -> ExpenseData:
+    return ExpenseData(
+        amount=10.0,
+        description="Lunch",
+        category=ExpenseCategory.FOOD,
+        payers_split=SplitType.EQUALLY,
+        owers_split=SplitType.EQUALLY,
+        payers={payer.id: None},
+        owers={ower.id: None},
+        group_id=group.id if group else None,
+        creator_id=payer.id,
+    )
+
+
+@pytest.mark.parametrize("page", ["", "/balances", "/debts"])
+def test_group_pages_return_304_without_preparing_data(client, group, page):
+    url = f"/groups/{group.id}{page}"
+    response = get(client, url)
+    etag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    with patch("app.group.views.prepare_group_overview_data") as overview, patch(
+        "app.group.views.prepare_group_balances_data"
+    ) as balances, patch("app.group.views.get_group_user_debts") as debts:
+        response = get(client, url, etag)
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert not overview.called and not balances.called and not debts.called
+
+
+def test_group_etag_changes_after_group_expense(client, users, group):
+    url = f"/groups/{group.id}/balances"
+    etag = get(client, url).headers["ETag"]
+
+    submit_expense(expense(users[1], users[0], group))
+
+    response = get(client, url, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_group_etag_changes_after_new_member(client, users, group):
+    url = f"/groups/{group.id}"
+    etag = get(client, url).headers["ETag"]
+
+    handle_add_users_to_group(group, {"friend_ids": str(users[2].id)})
+
+    assert get(client, url, etag).status_code == 200
+
+
+def test_group_etag_is_kept_by_other_groups_expenses(client, users, group):
+    other = Group.create("other", users[1:])
+    url = f"/groups/{group.id}"
+    etag = get(client, url).headers["ETag"]
+
+    submit_expense(expense(users[1], users[2], other))
+
+    assert get(client, url, etag).status_code == 304
+
+
+@pytest.mark.parametrize("url", ["/user", "/user/balances", "/user/debts", "/user/groups"])
+def test_user_pages(client, users, url):
+    etag = get(client, url).headers["ETag"]
+    with patch("app.user.views.prepare_dashboard_data") as dashboard, patch(
+        "app.user.views.prepare_balances_data"
+    ) as balances, patch("app.user.views.prepare_groups_data") as groups:
+        assert get(client, url, etag).status_code == 304
+    assert not dashboard.called and not balances.called and not groups.called
+
+    submit_expense(expense(users[1], users[0]))
+
+    assert get(client, url, etag).status_code == 200
+
+
+def test_user_etag_changes_when_creating_expense_for_others(client, users):
+    etag = get(client, "/user").headers["ETag"]
+
+    expense_data = expense(users[1], users[2])
+    expense_data.creator_id = users[0].id
+    submit_expense(expense_data)
+
+    assert get(client, "/user", etag).status_code == 200
+
+
+def test_expense_summary(client, users):
+    summary = submit_expense(expense(users[0], users[1]))
+    url = f"/expenses/{summary.id}"
+
+    etag = get(client, url).headers["ETag"]
+
+    assert get(client, url, etag).status_code == 304
+
+
+def test_flashed_messages_are_never_304(client, group):
+    url = f"/groups/{group.id}"
+    etag = get(client, url).headers["ETag"]
+    with client.session_transaction() as session:
+        session["_flashes"] = [("success", "Done")]
+
+    response = get(client, url, etag)
+
+    assert response.status_code == 200
+    assert b"Done" in response.data
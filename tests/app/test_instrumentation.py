@@ -0,0 +1,112 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.config import TestConfig
+from app.database import db
+from app.model.user import User
+
+
+class InstrumentedConfig(TestConfig):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQL_INSTRUMENTATION = True
+    SQL_INSTRUMENTATION_SLOWEST = 2
+
+
+@pytest.fixture
+def instrumented_app():
+    app = create_app(InstrumentedConfig)
+
+    @app.route("/_two_queries")
+    def two_queries():
+        User.query.count()
+        User.query.filter_by(username="nobody").first()
+        return "ok"
+
+    @app.route("/_failed_query")
+    def failed_query():
+        try:
+            db.session.execute(text("SELECT * FROM missing_table"))
+        except OperationalError:
+            db.session.rollback()
+        return "failed"
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def admin_client(instrumented_app):
+    user = User.create("admin", "admin@email.com", "password")
+    g.pop("_login_user", None)
+    client = instrumented_app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.id)
+        session["_fresh"] = True
+    yield client
+    g.pop("_login_user", None)
+
+
+def test_instrumentation_disabled_by_default(app, client):
+    response = client.get("/signin")
+
+    assert "X-Query-Count" not in response.headers
+    assert "instrumentation" not in app.blueprints
+
+
+def test_query_count_and_server_timing_headers(instrumented_app):
+    response = instrumented_app.test_client().get("/_two_queries")
+
+    assert response.headers["X-Query-Count"] == "2"
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("db;dur=")
+    assert 'desc="2 queries"' in server_timing
+    assert "app;dur=" in server_timing
+
+
+def test_debug_endpoint_lists_recent_requests(admin_client):
+    client = admin_client
+    client.get("/_two_queries")
+    client.get("/signin")
+
+    data = client.get("/debug/queries").json
+
+    assert data["slowest_per_request"] == 2
+    signin, two_queries = data["requests"][:2]
+    assert signin["path"].startswith("/signin")
+    assert signin["query_count"] == 0
+    assert two_queries["query_count"] == 2
+    assert len(two_queries["slowest"]) == 2
+    assert all("SELECT" in s["statement"] for s in two_queries["slowest"])
+    assert two_queries["db_time_ms"] <= two_queries["total_time_ms"]
+
+
+def test_queries_outside_requests_are_not_recorded(admin_client):
+    User.query.count()
+
+    data = admin_client.get("/debug/queries").json
+
+    assert data["requests"] == []
+
+
+def test_debug_endpoint_requires_login(instrumented_app):
+    g.pop("_login_user", None)
+
+    response = instrumented_app.test_client().get("/debug/queries")
+
+    assert response.status_code == 302
+    assert "/login" in response.headers["Location"]
+
+
+def test_failed_statements_are_counted(instrumented_app, admin_client):
+    response = admin_client.get("/_failed_query")
+
+    assert response.headers["X-Query-Count"] == "1"
+    assert not db.session.connection().info.get("_sql_started")
+    failed = admin_client.get("/debug/queries").json["requests"][0]
+    assert failed["failed_count"] == 1
+    assert "missing_table" in failed["slowest"][0]["statement"]
@@ -0,0 +1,55 @@
+from app.database import db
+from app.model.expense import Expense
+from app.seed import SEED_PASSWORD, SeedConfig
+from benchmarks.loadtest import LoadConfig, Recorder, report, run_load, seeded_app
+
+
+def test_sessions_submit_expenses_and_report_every_route(tmp_path):
+    database = f"sqlite:///{tmp_path / 'load.db'}"
+    config = LoadConfig(threads=2, sessions=4, rounds=2, settle_every=2)
+
+    with seeded_app(database, SeedConfig(users=8, groups=2, expenses=20, seed=1)) as app:
+        routes, elapsed = run_load(app, config)
+        with app.app_context():
+            expenses = db.session.scalar(
+                db.select(db.func.count(Expense.id)).where(
+                    Expense.description.not_like("Settlement%")
+                )
+            )
+
+    results = report(routes, elapsed)
+    assert set(results["routes"]) == {
+        "POST /login",
+        "GET /user",
+        "GET /groups/<id>",
+        "POST /expenses",
+        "POST /groups/<id>/settle/<user_id>",
+        "GET /logout",
+    }
+    assert results["routes"]["POST /expenses"]["requests"] == 8
+    assert all(route["errors"] == 0 for route in results["routes"].values())
+    assert sum(results["routes"]["GET /user"]["histogram"].values()) == 8
+    # The seeded expenses and every submitted one, settlements aside
+    assert expenses == 20 + 8
+
+
+def test_rejected_expenses_count_as_errors(tmp_path):
+    database = f"sqlite:///{tmp_path / 'load.db'}"
+    recorder = Recorder()
+
+    with seeded_app(database, SeedConfig(users=4, groups=1, expenses=0, seed=1)) as app:
+        client = app.test_client()
+        recorder.request(
+            client,
+            "POST /login",
+            "POST",
+            "/login",
+            data={"email": "1@seed.example.com", "password": SEED_PASSWORD},
+        )
+        status = recorder.request(
+            client, "POST /expenses", "POST", "/expenses", expected=200, data={}
+        )
+
+    assert status == 302
+    assert recorder.routes["POST /login"].errors == 0
+    assert recorder.routes["POST /expenses"].errors == 1
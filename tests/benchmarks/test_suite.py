@@ -0,0 +1,33 @@
+from benchmarks.suite import CASES, compare, run
+
+
+def test_run_times_every_case():
+    results = run([3], repeat=1, seed=0)
+
+    assert set(results) == {f"{name}[3]" for name in CASES}
+    assert len([name for name in CASES if name.startswith("split/")]) == 9
+    assert all(seconds > 0 for seconds in results.values())
+
+
+def test_compare_flags_regressions_above_the_threshold():
+    baseline = {"split/equally-equally[2]": 1.0, "debt_update[2]": 1.0}
+    results = {
+        "split/equally-equally[2]": 1.2,
+        "debt_update[2]": 1.3,
+        "simplify_debts[2]": 5.0,
+    }
+
+    assert compare(baseline, results, threshold=0.25) == [
+        ("split/equally-equally[2]", 1.0, 1.2, False),
+        ("debt_update[2]", 1.0, 1.3, True),
+    ]
+
+
+def test_compare_ignores_regressions_below_the_min_delta():
+    baseline = {"split/equally-equally[2]": 2e-6, "debt_update[2]": 1e-4}
+    results = {"split/equally-equally[2]": 4e-6, "debt_update[2]": 2e-4}
+
+    assert compare(baseline, results, threshold=0.25, min_delta=5e-6) == [
+        ("split/equally-equally[2]", 2e-6, 4e-6, False),
+        ("debt_update[2]", 1e-4, 2e-4, True),
+    ]
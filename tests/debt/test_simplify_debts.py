@@ -1,4 +1,13 @@
-from app.debt import simplify_debts
+import random
+
+import pytest
+
+from app.debt import (
+    _simplify_debts_heap,
+    _simplify_debts_scan,
+    _to_cents,
+    simplify_debts,
+)
 
 
 def test_simplify_debts():
@@ -18,3 +27,44 @@ def test_simplify_debts():
 
     transactions = simplify_debts(balances)
     assert transactions == expected_transactions
+
+
+def test_simplify_debts_settles_every_balance():
+    balances = {1: -10.01, 2: 3.34, 3: 3.33, 4: 3.34}
+
+    transactions = simplify_debts(balances)
+
+    settled = dict(balances)
+    for debtor, creditor, amount in transactions:
+        settled[debtor] += amount
+        settled[creditor] -= amount
+    assert all(round(bal, 2) == 0 for bal in settled.values())
+
+
+def test_simplify_debts_ignores_zero_balances():
+    assert simplify_debts({1: 0, 2: -5, 3: 5, 4: 0.0}) == [(2, 3, 5)]
+
+
+def test_simplify_debts_empty():
+    assert simplify_debts({}) == []
+
+
+@pytest.mark.parametrize("size", [2, 3, 5, 17, 100, 1000])
+def test_heap_engine_matches_scan_engine(size):
+    rng = random.Random(size)
+    cents = [rng.randint(-10_000, 10_000) for _ in range(size - 1)]
+    cents.append(-sum(cents))
+    balances = {uid: c / 100 for uid, c in enumerate(cents)}
+
+    expected = _simplify_debts_scan(_to_cents(balances))
+
+    assert _simplify_debts_heap(_to_cents(balances)) == expected
+    assert simplify_debts(balances) == expected
+
+
+def test_heap_engine_matches_scan_engine_on_ties():
+    balances = {1: -10, 2: -10, 3: 5, 4: 5, 5: 5, 6: 5}
+
+    assert _simplify_debts_heap(_to_cents(balances)) == _simplify_debts_scan(
+        _to_cents(balances)
+    )
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from app.debt import simplify_debts, simplify_debts_optimal
+
+
+def settle(balances, transactions):
+    settled = dict(balances)
+    for debtor, creditor, amount in transactions:
+        settled[debtor] += amount
+        settled[creditor] -= amount
+    return settled
+
+
+def test_simplify_debts_optimal_beats_greedy():
+    balances = {1: -8, 2: 6, 3: -2, 4: 3, 5: 4, 6: -3}
+
+    transactions = simplify_debts_optimal(balances)
+
+    assert len(transactions) == 4
+    assert len(simplify_debts(balances)) == 5
+    assert all(bal == 0 for bal in settle(balances, transactions).values())
+
+
+def test_simplify_debts_optimal_zero_sum_subgroups():
+    # {1, 2, 3} and {4, 5, 6} settle independently with 2 transactions each
+    balances = {1: -5, 4: -7, 2: 2, 5: 4, 3: 3, 6: 3}
+
+    transactions = simplify_debts_optimal(balances)
+
+    assert len(transactions) == 4
+    assert all(bal == 0 for bal in settle(balances, transactions).values())
+
+
+def test_simplify_debts_optimal_pairs_opposite_balances():
+    balances = {1: -10.5, 2: 4, 3: 10.5, 4: -4}
+
+    transactions = simplify_debts_optimal(balances)
+
+    assert sorted(transactions) == [(1, 3, 10.5), (4, 2, 4)]
+
+
+def test_simplify_debts_optimal_empty():
+    assert simplify_debts_optimal({}) == []
+    assert simplify_debts_optimal({1: 0, 2: 0.0}) == []
+
+
+def test_simplify_debts_optimal_falls_back_to_greedy_above_max_size():
+    balances = {1: -8, 2: 6, 3: -2, 4: 3, 5: 4, 6: -3.5, 7: 0.5}
+
+    transactions = simplify_debts_optimal(balances, max_size=3)
+
+    assert transactions == simplify_debts(balances)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_simplify_debts_optimal_never_worse_than_greedy(seed):
+    rng = random.Random(seed)
+    cents = [rng.randint(-2_000, 2_000) for _ in range(rng.randint(2, 10))]
+    cents.append(-sum(cents))
+    balances = {uid: c / 100 for uid, c in enumerate(cents)}
+
+    transactions = simplify_debts_optimal(balances)
+
+    assert len(transactions) <= len(simplify_debts(balances))
+    assert all(round(bal, 2) == 0 for bal in settle(balances, transactions).values())
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event
+
+from app.database import db
+from app.expense import prepare_all_debts_data
+from app.model.debt import Debt
+from app.model.user import User
+
+
+@pytest.fixture
+def debts(db_session):
+    users = [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(6)]
+    Debt.apply_many(
+        [
+            (users[i].id, users[j].id, float(i + j))
+            for i in range(len(users))
+            for j in range(i + 1, len(users))
+        ]
+    )
+    db_session.commit()
+    return Debt.query.order_by(Debt.id).all()
+
+
+def test_totals_are_aggregated_over_all_debts(debts):
+    data = prepare_all_debts_data(limit=4)
+
+    assert data["success"] is True
+    assert data["total_debts"] == 15
+    assert data["active_count"] == 15
+    assert data["total_amount"] == round(sum(d.amount for d in debts), 2)
+
+
+def test_debts_are_listed_one_page_at_a_time(debts):
+    first = prepare_all_debts_data(limit=4)
+    second = prepare_all_debts_data(first["next_cursor"], limit=4)
+    last = prepare_all_debts_data(debts[-3].id, limit=4)
+
+    assert first["debts"] == debts[:4]
+    assert first["next_cursor"] == debts[3].id
+    assert second["debts"] == debts[4:8]
+    assert last["debts"] == debts[-2:]
+    assert last["next_cursor"] is None
+
+
+def test_page_cost_does_not_depend_on_table_size(debts):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        data = prepare_all_debts_data(limit=3)
+        [(debt.lender.username, debt.borrower.username) for debt in data["debts"]]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert len(statements) == 2
+    assert "LIMIT" in statements[1]
+
+
+def test_no_debts(db_session):
+    data = prepare_all_debts_data()
+
+    assert data["debts"] == []
+    assert data["total_debts"] == 0
+    assert data["total_amount"] == 0
+    assert data["next_cursor"] is None
@@ -102,7 +102,7 @@ class TestValidateExpenseAccess:
             group_id=None,
             balances=[]
         )
-        expense.users.append(participant)
+        participant.add_expense(expense)
         db_session.commit()
         
         result = validate_expense_access(expense.id, participant)
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from flask import g
+
+from app.cli.database import export
+from app.database import db
+from app.expense import ExpenseData
+from app.expense.export import FIELDS, export_expenses, export_query, iter_rows
+from app.expense.submit import submit_expense
+from app.model.constants import NO_GROUP
+from app.model.expense import ExpenseCategory
+from app.model.group import Group
+from app.model.user import User
+from app.split import SplitType
+
+
+@pytest.fixture
+def users(db_session):
+    return [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+
+
+@pytest.fixture
+def group(users):
+    return Group.create("group", users[:2])
+
+
+def expense(payer: User, ower: User, group: Group | None = None, amount=10.0):
+    return submit_expense(
+        ExpenseData(
+            amount=amount,
+            description="Lunch, with \"friends\"",
+            category=ExpenseCategory.FOOD,
+            payers_split=SplitType.EQUALLY,
+            owers_split=SplitType.EQUALLY,
+            payers={payer.id: None},
+            owers={ower.id: None},
+            group_id=group.id if group else None,
+            creator_id=payer.id,
+        )
+    )
+
+
+def read_csv(chunks) -> list[dict]:
+    return list(csv.DictReader(io.StringIO("".join(chunks))))
+
+
+def test_csv_has_one_row_per_balance(users, group):
+    first = expense(users[0], users[1], group)
+    expense(users[1], users[2])
+
+    rows = read_csv(export_expenses("csv", group_id=group.id))
+
+    assert [(row["expense_id"], row["username"], row["total"]) for row in rows] == [
+        (str(first.id), "user0", "10.0"),
+        (str(first.id), "user1", "-10.0"),
+    ]
+    assert rows[0]["description"] == 'Lunch, with "friends"'
+    assert rows[0]["category"] == "Food"
+    assert rows[0]["payers_split"] == "Equally"
+
+
+def test_user_export_includes_every_balance_of_their_expenses(users, group):
+    expense(users[0], users[1], group)
+    expense(users[1], users[2])
+
+    lines = "".join(export_expenses("jsonl", user_id=users[2].id)).splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert list(rows[0]) == list(FIELDS)
+    assert [(row["user_id"], row["payed"], row["owed"]) for row in rows] == [
+        (users[1].id, 10.0, 0.0),
+        (users[2].id, 0.0, 10.0),
+    ]
+    assert rows[0]["group_id"] == NO_GROUP
+
+
+def test_empty_csv_has_header(db_session):
+    assert "".join(export_expenses("csv")) == ",".join(FIELDS) + "\n"
+
+
+def test_unknown_format_is_rejected(db_session):
+    with pytest.raises(ValueError, match="Unknown export format: xml"):
+        export_expenses("xml")
+
+
+def test_rows_are_fetched_in_batches(users):
+    for amount in range(1, 6):
+        expense(users[0], users[1], amount=amount)
+
+    with patch.object(db.session, "execute", wraps=db.session.execute) as execute:
+        rows = list(iter_rows(export_query(), batch_size=2))
+
+    assert execute.call_args.args[0].get_execution_options()["yield_per"] == 2
+    assert len(rows) == 10
+
+
+def test_group_export_view(app, users, group):
+    expense(users[0], users[1], group)
+    other = Group.create("other", users[1:])
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(users[0].id)
+        session["_fresh"] = True
+
+    g.pop("_login_user", None)
+    response = client.get(f"/groups/{group.id}/export.csv")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"] == (
+        f'attachment; filename="group-{group.id}-expenses.csv"'
+    )
+    assert len(read_csv([response.get_data(as_text=True)])) == 2
+
+    g.pop("_login_user", None)
+    assert client.get(f"/groups/{other.id}/export.csv").status_code == 404
+
+    g.pop("_login_user", None)
+    response = client.get("/user/export.jsonl")
+    assert response.mimetype == "application/x-ndjson"
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+    g.pop("_login_user", None)
+
+
+def test_cli_export(app, users, group):
+    expense(users[0], users[1], group)
+    expense(users[1], users[2])
+
+    result = app.test_cli_runner().invoke(export, ["--user", str(users[2].id)])
+
+    assert result.exit_code == 0
+    assert [row["username"] for row in read_csv([result.output])] == ["user1", "user2"]
@@ -0,0 +1,151 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.cli.database import import_
+from app.database import db
+from app.expense.importer import import_expenses
+from app.model.balance import Balance
+from app.model.debt import Debt
+from app.model.expense import Expense, ExpenseCategory
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.model.user_balance_summary import UserBalanceSummary
+
+
+@pytest.fixture
+def users(db_session):
+    return [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+
+
+@pytest.fixture
+def group(users):
+    return Group.create("group", users[:2])
+
+
+def jsonl(*rows: dict) -> io.StringIO:
+    return io.StringIO("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def row(payer: User, ower: User, group: Group | None = None, **fields) -> dict:
+    return {
+        "amount": 30.0,
+        "description": "Dinner",
+        "category": "Food",
+        "payers": [{"user_id": payer.id}],
+        "owers": [{"user_id": ower.id}],
+        "group_id": group.id if group else None,
+        "creator_id": payer.id,
+        **fields,
+    }
+
+
+def test_jsonl_import_updates_debts_and_group_balances(users, group):
+    stats = import_expenses(
+        jsonl(
+            row(users[0], users[1], group, created_at="2020-01-02T03:04:05"),
+            row(users[2], users[0]),
+        ),
+        "jsonl",
+    )
+
+    assert (stats.read, stats.imported, stats.errors) == (2, 2, [])
+    expenses = db.session.scalars(db.select(Expense).order_by(Expense.id)).all()
+    assert expenses[0].created_at == datetime(2020, 1, 2, 3, 4, 5)
+    assert expenses[0].category == ExpenseCategory.FOOD
+    assert [u.id for u in expenses[1].users] == [users[0].id, users[2].id]
+    assert GroupBalance.get_group_balances(group.id) == {
+        users[0].id: 30.0,
+        users[1].id: -30.0,
+    }
+    assert Debt.find_pair(users[0].id, users[2].id).lender_id == users[2].id
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_csv_import(users, group):
+    a, b, c = (user.id for user in users)
+    file = io.StringIO(
+        "amount,description,category,payers_split,owers_split,payers,owers,group_id,creator_id\n"
+        f"90,Hotel,Accommodation,Equally,Amount,{a},{a}:60;{b}:30,{group.id},{a}\n"
+        f"10,Taxi,,Equally,Equally,{b},{c},,{b}\n"
+    )
+
+    stats = import_expenses(file, "csv")
+
+    assert (stats.imported, stats.errors) == (2, [])
+    assert GroupBalance.get_group_balances(group.id) == {
+        users[0].id: 30.0,
+        users[1].id: -30.0,
+    }
+    assert Balance.query.count() == 4
+
+
+def test_invalid_rows_are_skipped(users, group):
+    rows = [
+        row(users[0], users[1], group),
+        row(users[0], users[1], amount=-5),
+        row(users[0], users[2], group),
+        row(users[0], users[1], group_id=999),
+        row(users[0], users[1], creator_id=999),
+    ]
+    file = io.StringIO("".join(json.dumps(r) + "\n" for r in rows) + "{not json\n")
+
+    stats = import_expenses(file, "jsonl", chunk_size=2)
+
+    assert (stats.read, stats.imported) == (6, 1)
+    assert stats.errors[:4] == [
+        "Row 2: Amount: Number must be at least 0.",
+        f"Row 3: Users {users[2].id} are not in group {group.id}.",
+        "Row 4: Unknown group 999.",
+        "Row 5: Unknown user 999.",
+    ]
+    assert stats.errors[4].startswith("Row 6: Malformed expense: JSONDecodeError")
+    assert Expense.query.count() == 1
+
+
+def test_progress_is_reported_per_chunk(users):
+    reports = []
+    import_expenses(
+        jsonl(*[row(users[0], users[1]) for _ in range(5)]),
+        "jsonl",
+        chunk_size=2,
+        progress=lambda stats: reports.append((stats.read, stats.imported)),
+    )
+
+    assert reports == [(2, 2), (4, 4), (5, 5)]
+    assert Debt.find_pair(users[0].id, users[1].id).amount == 150.0
+
+
+def test_cli_import(app, tmp_path, users):
+    path = tmp_path / "expenses.jsonl"
+    path.write_text(f"{json.dumps(row(users[0], users[1]))}\n{json.dumps({'amount': 1})}\n")
+
+    result = app.test_cli_runner().invoke(import_, [str(path)])
+
+    assert result.exit_code == 1
+    assert "Imported 1 of 2 expenses" in result.output
+    assert "Row 2: Malformed expense: KeyError('creator_id')" in result.output
+
+
+def test_non_finite_amounts_are_reported_by_row(users):
+    a, b, _ = (user.id for user in users)
+    csv_file = io.StringIO(
+        "amount,description,payers_split,owers_split,payers,owers,creator_id\n"
+        f"10,Taxi,Equally,Amount,{a},{b}:nan,{a}\n"
+        f"10,Taxi,Equally,Equally,{a},{b},{a}\n"
+    )
+    jsonl_file = io.StringIO(
+        json.dumps(row(users[0], users[1])).replace("30.0", "NaN") + "\n[1, 2]\n"
+    )
+
+    csv_stats = import_expenses(csv_file, "csv")
+    jsonl_stats = import_expenses(jsonl_file, "jsonl")
+
+    assert (csv_stats.imported, csv_stats.errors) == (1, ["Row 1: Owers: Number must be finite."])
+    assert jsonl_stats.errors == [
+        "Row 1: Amount: Number must be finite.",
+        "Row 2: Malformed expense: TypeError('Expected an object, got list')",
+    ]
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+from werkzeug.datastructures import MultiDict
+
+from app.expense.pagination import (
+    MAX_PAGE_SIZE,
+    PAGINATION_KEY,
+    decode_cursor,
+    encode_cursor,
+    group_expenses_query,
+    paginate_expenses,
+    parse_page_args,
+    user_expenses_query,
+)
+from app.model.expense import Expense, expense_users
+from app.model.group import Group
+from app.model.user import User
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def expenses(db_session):
+    """Ten expenses of user1, every two sharing a created_at, the odd ones in a group."""
+    user1 = User.create("user1", "1@email.com", "password")
+    user2 = User.create("user2", "2@email.com", "password")
+    group = Group.create("group", [user1, user2])
+    expenses = []
+    for i in range(10):
+        expense = Expense(
+            amount=i + 1,
+            description=f"expense {i}",
+            creator_id=user1.id,
+            group_id=group.id if i % 2 else None,
+            created_at=START + timedelta(minutes=i // 2),
+        )
+        db_session.add(expense)
+        db_session.flush()
+        user1.add_expense(expense)
+        expenses.append(expense)
+    other = Expense(amount=1, description="other", creator_id=user2.id, created_at=START)
+    db_session.add(other)
+    db_session.flush()
+    user2.add_expense(other)
+    db_session.commit()
+    return user1, group, expenses
+
+
+def newest_first(expenses):
+    return sorted(expenses, key=lambda e: (e.created_at, e.id), reverse=True)
+
+
+def walk(query, limit):
+    pages, cursor = [], None
+    while True:
+        page = paginate_expenses(query, cursor, limit)
+        pages.append(page.expenses)
+        if not page.next_cursor:
+            return pages
+        cursor = decode_cursor(page.next_cursor)
+
+
+def test_pages_cover_user_expenses_in_order(expenses):
+    user1, _, all_expenses = expenses
+
+    pages = walk(user_expenses_query(user1.id), limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert [e for page in pages for e in page] == newest_first(all_expenses)
+
+
+def test_group_pages_only_contain_group_expenses(expenses):
+    _, group, all_expenses = expenses
+
+    pages = walk(group_expenses_query(group.id), limit=2)
+
+    assert [e for page in pages for e in page] == newest_first(all_expenses[1::2])
+
+
+def test_user_group_expenses(expenses):
+    user1, group, all_expenses = expenses
+
+    page = paginate_expenses(user_expenses_query(user1.id, group.id), limit=None)
+
+    assert page.expenses == newest_first(all_expenses[1::2])
+    assert page.next_cursor is None
+
+
+def test_exact_last_page_has_no_next_cursor(expenses):
+    user1, _, _ = expenses
+
+    page = paginate_expenses(user_expenses_query(user1.id), limit=10)
+
+    assert len(page.expenses) == 10
+    assert page.next_cursor is None
+
+
+def test_expense_users_copy_expense_created_at(expenses, db_session):
+    rows = db_session.execute(
+        select(expense_users.c.created_at, Expense.created_at).join(
+            Expense, Expense.id == expense_users.c.expense_id
+        )
+    ).all()
+
+    assert len(rows) == 11
+    assert all(copied == created_at for copied, created_at in rows)
+
+
+def test_user_pages_scan_the_user_index(expenses, db_session):
+    user1, _, _ = expenses
+    query = user_expenses_query(user1.id)
+    created_at, expense_id = query.get_execution_options()[PAGINATION_KEY]
+    query = query.order_by(created_at.desc(), expense_id.desc()).limit(3)
+    sql = query.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+
+    plan = " ".join(
+        row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    )
+
+    assert "ix_expense_users_user_id_created_at_expense_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_cursor_round_trip(expenses):
+    _, _, all_expenses = expenses
+    expense = all_expenses[3]
+
+    assert decode_cursor(encode_cursor(expense)) == (expense.created_at, expense.id)
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [({}, (None, 50)), ({"limit": "5"}, (None, 5)), ({"limit": "100000"}, (None, MAX_PAGE_SIZE))],
+)
+def test_parse_page_args(args, expected):
+    assert parse_page_args(MultiDict(args)) == expected
+
+
+@pytest.mark.parametrize("args", [{"limit": "0"}, {"limit": "abc"}, {"cursor": "abc"}])
+def test_parse_page_args_invalid(args):
+    with pytest.raises(ValueError):
+        parse_page_args(MultiDict(args))
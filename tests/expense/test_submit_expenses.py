@@ -0,0 +1,314 @@
+import pytest
+from flask import g
+from sqlalchemy import event
+
+from app.database import db
+from app.expense import ExpenseData
+from app.expense.submit import submit_expense, submit_expenses
+from app.expense.validation import validate_expense_data
+from app.model.balance import Balance
+from app.model.debt import Debt
+from app.model.expense import Expense, ExpenseCategory
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.split import SplitType
+
+
+@pytest.fixture
+def users(db_session):
+    return [
+        User.create(username=f"user{i}", email=f"{i}@email.com", password="password")
+        for i in range(1, 5)
+    ]
+
+
+def make_expense(payers, owers, creator_id, group_id=None, amount=90.0, **kwargs):
+    return ExpenseData(
+        amount=amount,
+        description=kwargs.get("description", "Batch expense"),
+        category=ExpenseCategory.FOOD,
+        payers_split=kwargs.get("payers_split", SplitType.EQUALLY),
+        owers_split=kwargs.get("owers_split", SplitType.EQUALLY),
+        payers=payers,
+        owers=owers,
+        group_id=group_id,
+        creator_id=creator_id,
+    )
+
+
+def debts_snapshot():
+    return sorted((d.borrower_id, d.lender_id, d.amount) for d in Debt.query.all())
+
+
+def test_submit_expenses_matches_one_by_one_submission(db_session, users):
+    u1, u2, u3, u4 = users
+    batch = [
+        make_expense({u1.id: None}, {u2.id: None, u3.id: None}, u1.id, amount=30.0),
+        make_expense({u2.id: None}, {u1.id: None, u4.id: None}, u2.id, amount=10.0),
+        make_expense({u3.id: None}, {u1.id: None}, u3.id, amount=15.0),
+    ]
+
+    for data in batch:
+        submit_expense(data)
+    sequential = debts_snapshot()
+    Debt.query.delete()
+
+    submit_expenses(batch)
+
+    assert debts_snapshot() == sequential
+
+
+def test_submit_expenses_aggregates_group_balances(db_session, users):
+    u1, u2, u3, _ = users
+    group = Group.create("group", [u1, u2, u3])
+    batch = [
+        make_expense({u1.id: None}, {u1.id: None, u2.id: None, u3.id: None}, u1.id, group.id),
+        make_expense({u2.id: None}, {u3.id: None}, u2.id, group.id, amount=20.0),
+    ]
+
+    submit_expenses(batch)
+
+    assert GroupBalance.find(u1.id, group.id).balance == 60.0
+    assert GroupBalance.find(u2.id, group.id).balance == -10.0
+    assert GroupBalance.find(u3.id, group.id).balance == -50.0
+    assert Debt.query.count() == 0
+
+
+def test_submit_expenses_creates_expenses_balances_and_users(db_session, users):
+    u1, u2, u3, u4 = users
+    batch = [
+        make_expense({u1.id: None}, {u2.id: None}, u4.id, description="first"),
+        make_expense({u2.id: None}, {u3.id: None}, u2.id, description="second"),
+    ]
+
+    first, second = submit_expenses(batch)
+
+    assert [e.description for e in Expense.query.order_by(Expense.id)] == [
+        "first",
+        "second",
+    ]
+    assert Balance.query.count() == 4
+    assert {(b.user_id, b.total) for b in first.balances} == {(u1.id, 90.0), (u2.id, -90.0)}
+    assert {u.id for u in first.users} == {u1.id, u2.id, u4.id}
+    assert {u.id for u in second.users} == {u2.id, u3.id}
+    assert first in u4.expenses
+    assert second.group_id == "no-group"
+
+
+def test_submit_expenses_commits_once(db_session, users):
+    u1, u2, u3, _ = users
+    batch = [
+        make_expense({u1.id: None}, {u2.id: None}, u1.id),
+        make_expense({u2.id: None}, {u3.id: None}, u2.id),
+        make_expense({u3.id: None}, {u1.id: None, u2.id: None}, u3.id),
+    ]
+    commits = []
+
+    def count_commit(session):
+        commits.append(session)
+
+    event.listen(db.session, "after_commit", count_commit)
+    try:
+        submit_expenses(batch)
+    finally:
+        event.remove(db.session, "after_commit", count_commit)
+
+    assert len(commits) == 1
+    assert Expense.query.count() == 3
+
+
+def test_submit_expenses_without_commit_leaves_transaction_open(db_session, users):
+    u1, u2, _, _ = users
+
+    submit_expenses([make_expense({u1.id: None}, {u2.id: None}, u1.id)], commit=False)
+    db_session.rollback()
+
+    assert Expense.query.count() == 0
+    assert Debt.query.count() == 0
+
+
+def test_submit_expenses_empty_batch(db_session):
+    assert submit_expenses([]) == []
+
+
+def test_validate_expense_data_valid(db_session, users):
+    u1, u2, _, _ = users
+    data = make_expense(
+        {u1.id: 60.0, u2.id: 30.0},
+        {u1.id: 50.0, u2.id: 50.0},
+        u1.id,
+        payers_split=SplitType.AMOUNT,
+        owers_split=SplitType.PERCENTAGE,
+    )
+
+    assert validate_expense_data(data) == []
+
+
+def test_validate_expense_data_errors():
+    data = make_expense(
+        {1: 20.0},
+        {1: 40.0},
+        1,
+        amount=10.123,
+        description="",
+        payers_split=SplitType.AMOUNT,
+        owers_split=SplitType.PERCENTAGE,
+    )
+
+    assert validate_expense_data(data) == [
+        "Amount: Amount must have at most 2 decimal places.",
+        "Description: This field is required.",
+        "Payers total must equal to the expense total.",
+        "Owers percentages must sum to 100.",
+        "Single user cannot be both a payer and an ower.",
+    ]
+
+
+@pytest.fixture
+def logged_in_client(app, users):
+    # The app context is shared by the whole session, drop the user cached in g
+    g.pop("_login_user", None)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(users[0].id)
+        session["_fresh"] = True
+    yield client
+    g.pop("_login_user", None)
+
+
+def test_batch_endpoint_creates_expenses(db_session, users, logged_in_client):
+    u1, u2, u3, _ = users
+    response = logged_in_client.post(
+        "/expenses/batch",
+        json={
+            "expenses": [
+                {
+                    "amount": 30,
+                    "description": "Dinner",
+                    "category": "Food",
+                    "payers": [{"user_id": u1.id}],
+                    "owers": [{"user_id": u2.id}, {"user_id": u3.id}],
+                },
+                {
+                    "amount": 10,
+                    "description": "Taxi",
+                    "owers_split": "Amount",
+                    "payers": [{"user_id": u2.id}],
+                    "owers": [{"user_id": u1.id, "amount": 10}],
+                },
+            ]
+        },
+    )
+
+    assert response.status_code == 201
+    assert len(response.json["expenses"]) == 2
+    assert Expense.query.count() == 2
+    assert all(e.creator_id == u1.id for e in Expense.query.all())
+    assert Debt.find(u3.id, u1.id).amount == 15.0
+    assert Debt.find(u2.id, u1.id).amount == 5.0
+
+
+def test_batch_endpoint_rejects_whole_batch_on_errors(db_session, users, logged_in_client):
+    u1, u2, _, _ = users
+    other = User.create(username="other", email="other@email.com", password="password")
+    group = Group.create("not mine", [other])
+    response = logged_in_client.post(
+        "/expenses/batch",
+        json={
+            "expenses": [
+                {"amount": 10, "description": "Ok", "payers": [{"user_id": u1.id}], "owers": [{"user_id": u2.id}]},
+                {"amount": 10, "description": "No owers", "payers": [{"user_id": u1.id}]},
+                {"amount": 10, "description": "Group", "group_id": group.id, "payers": [{"user_id": u1.id}], "owers": [{"user_id": u2.id}]},
+            ]
+        },
+    )
+
+    assert response.status_code == 400
+    assert set(response.json["errors"]) == {"1", "2"}
+    assert response.json["errors"]["1"] == ["Malformed expense: missing owers."]
+    assert "You don't have access to this group." in response.json["errors"]["2"]
+    assert Expense.query.count() == 0
+
+
+def test_batch_endpoint_requires_expenses_list(db_session, logged_in_client):
+    response = logged_in_client.post("/expenses/batch", json={})
+
+    assert response.status_code == 400
+
+
+def test_validate_expense_data_rejects_non_finite_amounts():
+    data = make_expense(
+        {1: float("inf")},
+        {2: float("nan")},
+        1,
+        amount=float("nan"),
+        payers_split=SplitType.AMOUNT,
+        owers_split=SplitType.AMOUNT,
+    )
+
+    errors = validate_expense_data(data)
+
+    assert errors[:3] == [
+        "Amount: Number must be finite.",
+        "Payers: Number must be finite.",
+        "Owers: Number must be finite.",
+    ]
+
+
+def test_batch_endpoint_rejects_non_finite_amounts(db_session, users, logged_in_client):
+    u1, u2, _, _ = users
+    response = logged_in_client.post(
+        "/expenses/batch",
+        data='{"expenses": [{"amount": NaN, "description": "NaN",'
+        f' "payers": [{{"user_id": {u1.id}}}], "owers": [{{"user_id": {u2.id}}}]}}]}}',
+        content_type="application/json",
+    )
+
+    assert response.status_code == 400
+    assert response.json["errors"]["0"] == ["Amount: Number must be finite."]
+
+
+def test_batch_endpoint_reports_malformed_values(db_session, users, logged_in_client):
+    u1, u2, _, _ = users
+    response = logged_in_client.post(
+        "/expenses/batch",
+        json={
+            "expenses": [
+                {"amount": "ten", "payers": [{"user_id": u1.id}], "owers": [{"user_id": u2.id}]}
+            ]
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json["errors"]["0"] == [
+        "Malformed expense: could not convert string to float: 'ten'"
+    ]
+
+
+def test_batch_endpoint_requires_an_object(db_session, logged_in_client):
+    response = logged_in_client.post("/expenses/batch", json=[{"amount": 10}])
+
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_checks_users_and_group_members(db_session, users, logged_in_client):
+    u1, u2, u3, _ = users
+    group = Group.create("mine", [u1, u2])
+    response = logged_in_client.post(
+        "/expenses/batch",
+        json={
+            "expenses": [
+                {"amount": 10, "description": "Ghost", "payers": [{"user_id": u1.id}], "owers": [{"user_id": 999}]},
+                {"amount": 10, "description": "Outsider", "group_id": group.id, "payers": [{"user_id": u1.id}], "owers": [{"user_id": u3.id}]},
+            ]
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json["errors"] == {
+        "0": ["Unknown user 999."],
+        "1": [f"Users {u3.id} are not in group {group.id}."],
+    }
+    assert Expense.query.count() == 0
+    assert Debt.query.count() == 0
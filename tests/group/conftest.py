@@ -59,7 +59,7 @@ def debts_and_expenses(users_and_group, db_session):
         description="Group expense 1",
         group_id=group.id,
     )
-    expense1.users.append(user1)
+    user1.add_expense(expense1)
     
     expense2 = Expense.create(
         amount=float(Decimal("75.00")),
@@ -68,7 +68,7 @@ def debts_and_expenses(users_and_group, db_session):
         description="Group expense 2",
         group_id=group.id,
     )
-    expense2.users.append(user2)
+    user2.add_expense(expense2)
     
     expense3 = Expense.create(
         amount=float(Decimal("25.00")),
@@ -77,7 +77,7 @@ def debts_and_expenses(users_and_group, db_session):
         description="No group expense",
         group_id=NO_GROUP,
     )
-    expense3.users.append(user1)
+    user1.add_expense(expense3)
     
     db_session.commit()
     
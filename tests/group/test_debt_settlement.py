@@ -9,7 +9,10 @@ from app.model.debt import Debt
 from app.model.group_balance import GroupBalance
 from app.model.expense import Expense, ExpenseCategory
 from app.model.constants import NO_GROUP
-from app.group import get_group_user_balances
+from app.group import (
+    calculate_group_settlement_transactions,
+    get_group_user_balances,
+)
 from app.debt import simplify_debts
 from decimal import Decimal
 
@@ -207,3 +210,43 @@ class TestDebtSettlementEdgeCases:
 
         for user_id, original_balance in balance_dict.items():
             assert abs(net_changes[user_id] + original_balance) < 0.01
+
+
+class TestOptimalSettlement:
+    """Test the optimal settlement mode of calculate_group_settlement_transactions"""
+
+    @pytest.fixture
+    def splittable_group(self, db_session):
+        users = [
+            User.create(f"optimal{i}", f"optimal{i}@test.com", "password")
+            for i in range(6)
+        ]
+        group = Group.create("Optimal Settlement Group", users)
+        for user, balance in zip(users, [-8.0, 6.0, -2.0, 3.0, 4.0, -3.0]):
+            GroupBalance.update_balance(user.id, group.id, balance)
+        db_session.commit()
+        return group
+
+    def test_optimal_uses_fewer_transactions(self, splittable_group, app):
+        greedy = calculate_group_settlement_transactions(splittable_group, optimal=False)
+        optimal = calculate_group_settlement_transactions(splittable_group, optimal=True)
+
+        assert len(greedy) == 5
+        assert len(optimal) == 4
+        paid = {user.id: 0.0 for user in splittable_group.users}
+        for transaction in optimal:
+            paid[transaction["debtor"].id] += transaction["amount"]
+            paid[transaction["creditor"].id] -= transaction["amount"]
+        assert paid == {
+            user.id: -balance
+            for user, balance in get_group_user_balances(splittable_group).items()
+        }
+
+    def test_optimal_defaults_to_config(self, splittable_group, app):
+        app.config["OPTIMAL_SETTLEMENT"] = True
+        try:
+            transactions = calculate_group_settlement_transactions(splittable_group)
+        finally:
+            app.config["OPTIMAL_SETTLEMENT"] = False
+
+        assert len(transactions) == 4
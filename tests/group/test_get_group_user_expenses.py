@@ -36,7 +36,7 @@ class TestGetGroupUserExpenses:
             description="Another group expense",
             group_id=group.id,
         )
-        expense4.users.append(user1)
+        user1.add_expense(expense4)
         
         result = get_group_user_expenses(user1, group.id)
         
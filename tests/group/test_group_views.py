@@ -314,9 +314,11 @@ class TestGetGroupBalancesView:
 class TestGroupExpensesView:
     """Test the group_expenses view endpoint"""
 
+    @patch('app.group.views.group_expenses_query')
+    @patch('app.group.views.paginate_expenses')
     @patch('app.group.views.get_authorized_group')
     @patch('app.group.views.render_template')
-    def test_group_expenses_success(self, mock_render, mock_get_group, client, app, db_session):
+    def test_group_expenses_success(self, mock_render, mock_get_group, mock_paginate, mock_query, client, app, db_session):
         """Test successful group expenses retrieval"""
         with app.test_request_context():
             # Create and login user
@@ -330,11 +332,18 @@ class TestGroupExpensesView:
             mock_get_group.return_value = mock_group
             mock_render.return_value = "mocked template"
             
+            mock_paginate.return_value.expenses = []
+            mock_paginate.return_value.next_cursor = None
+            
             response = client.get('/groups/123/expenses')
             
             assert response.status_code == 200
             mock_get_group.assert_called_once_with(123)
-            mock_render.assert_called_once_with("group/expenses.html", group=mock_group)
+            mock_query.assert_called_once_with(mock_group.id)
+            mock_paginate.assert_called_once_with(mock_query.return_value, None, 50)
+            mock_render.assert_called_once_with(
+                "group/expenses.html", group=mock_group, expenses=[], next_cursor=None, limit=50
+            )
             
             logout_user()
 
@@ -198,4 +198,73 @@ class TestHandleIndividualBalanceProcess:
         # Check that settlement expenses have correct category
         settlement_expenses = result['settlement_expenses']
         for expense in settlement_expenses:
-            assert expense.category.name == 'SETTLEMENT'
\ No newline at end of file
+            assert expense.category.name == 'SETTLEMENT'
+
+class TestSettlementUnitOfWork:
+    """Test that settlements are written in a single transaction"""
+
+    @pytest.fixture
+    def large_group(self, db_session):
+        from app.model.group import Group
+        users = [User.create(f"member{i}", f"member{i}@example.com", "password") for i in range(40)]
+        group = Group.create("Large Group", users)
+        GroupBalance.apply_deltas(
+            group.id, {user.id: (i - 19.5) * 2 for i, user in enumerate(users)}
+        )
+        db_session.commit()
+        return users, group
+
+    @staticmethod
+    def count_commits(func, *args):
+        from sqlalchemy import event
+        from app.database import db
+
+        commits = []
+
+        def count_commit(session):
+            commits.append(session)
+
+        event.listen(db.session, "after_commit", count_commit)
+        try:
+            result = func(*args)
+        finally:
+            event.remove(db.session, "after_commit", count_commit)
+        return result, len(commits)
+
+    def test_group_settlement_commits_once(self, large_group, db_session):
+        """Test that all settlement expenses and the cleared balances share one commit"""
+        from app.model.expense import Expense
+        users, group = large_group
+
+        result, commits = self.count_commits(handle_settle_debts_process, group)
+
+        assert result['success'] is True
+        assert commits == 1
+        assert Expense.query.count() == len(result['settlement_expenses']) >= 20
+        assert GroupBalance.query.filter_by(group_id=group.id).count() == 0
+
+    def test_individual_settlement_commits_once(self, large_group, db_session):
+        """Test that individual settlement expenses and the zeroed balance share one commit"""
+        users, group = large_group
+
+        result, commits = self.count_commits(
+            handle_individual_balance_process, group, users[0].id
+        )
+
+        assert result['success'] is True
+        assert commits == 1
+        assert GroupBalance.find(users[0].id, group.id).balance == 0.0
+
+    def test_group_settlement_is_atomic(self, large_group, db_session):
+        """Test that a failure while clearing balances leaves nothing behind"""
+        from unittest.mock import patch
+        from app.model.expense import Expense
+        users, group = large_group
+
+        with patch.object(GroupBalance, "clear_group_balances", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                handle_settle_debts_process(group)
+        db_session.rollback()
+
+        assert Expense.query.count() == 0
+        assert GroupBalance.find(users[0].id, group.id).balance == -39.0
@@ -180,7 +180,7 @@ class TestPrepareGroupBalancesData:
     @patch('app.group.get_group_user_balances')
     def test_balances_data_preparation(self, mock_balances, group_with_users):
         """Test successful balances data preparation"""
-        mock_balances.return_value = {1: 100.0, 2: -50.0, 3: 25.0}
+        mock_balances.return_value = dict(zip(group_with_users.users, [100.0, -50.0, 25.0]))
         
         result = prepare_group_balances_data(group_with_users)
         
@@ -192,7 +192,7 @@ class TestPrepareGroupBalancesData:
     @patch('app.group.get_group_user_balances')
     def test_zero_balances_included(self, mock_balances, group_with_users):
         """Test that zero balances are properly handled"""
-        mock_balances.return_value = {1: 0.0, 2: 50.0, 3: -25.0}
+        mock_balances.return_value = dict(zip(group_with_users.users, [0.0, 50.0, -25.0]))
         
         result = prepare_group_balances_data(group_with_users)
         
@@ -0,0 +1,107 @@
+import pytest
+
+from app.cli.database import ledger_snapshot, rebuild_balances_command, verify_ledger
+from app.database import db
+from app.ledger import compute_balances, rebuild_balances, take_snapshot, verify_balances
+from app.model.debt import Debt
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.ledger import LedgerEntry
+from app.model.user import User
+from app.model.user_balance_summary import UserBalanceSummary
+from app.seed import SeedConfig, seed
+
+
+@pytest.fixture
+def users(db_session):
+    return [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+
+
+@pytest.fixture
+def group(users):
+    return Group.create("group", users)
+
+
+def balances() -> tuple[dict, dict]:
+    debts = {(d.low_id, d.high_id): d.balance for d in Debt.query}
+    group_balances = {(b.group_id, b.user_id): b.balance for b in GroupBalance.query}
+    return debts, group_balances
+
+
+def test_balance_writes_append_signed_cents(users, group):
+    a, b, c = (user.id for user in users)
+    Debt.apply_many([(b, a, 10.0), (a, c, 2.5)])
+    Debt.update(a, b, 10.0)
+    GroupBalance.apply_deltas(group.id, {a: 3.0, b: -3.0})
+
+    entries = [
+        (e.user_id, e.counterparty_id, e.group_id, e.cents)
+        for e in LedgerEntry.query.order_by(LedgerEntry.id)
+    ]
+    assert entries == [
+        (a, b, None, 1000),
+        (a, c, None, -250),
+        (a, b, None, -1000),
+        (a, None, group.id, 300),
+        (b, None, group.id, -300),
+    ]
+    assert verify_balances() == {}
+
+
+def test_settlements_are_recorded(users, group):
+    a, b, c = (user.id for user in users)
+    GroupBalance.apply_deltas(group.id, {a: 6.0, b: -4.0, c: -2.0})
+    GroupBalance.set_balance(b, group.id, 0.0)
+    assert verify_balances() == {}
+
+    GroupBalance.clear_group_balances(group.id)
+
+    assert compute_balances().balances == {}
+    assert verify_balances() == {}
+
+
+def test_rebuild_reads_the_snapshot_and_its_tail(db_session, users, group):
+    a, b, c = (user.id for user in users)
+    Debt.update(b, a, 10.0)
+    GroupBalance.apply_deltas(group.id, {a: 6.0, b: -6.0})
+    snapshot = take_snapshot()
+    Debt.update(c, a, 1.5)
+    GroupBalance.apply_deltas(group.id, {b: 2.0, c: -2.0})
+    db_session.commit()
+    expected = balances()
+
+    # Entries up to the snapshot are not needed anymore
+    db_session.execute(db.delete(LedgerEntry).where(LedgerEntry.id <= snapshot.ledger_offset))
+    db_session.execute(db.delete(Debt))
+    db_session.execute(db.update(GroupBalance).values(balance=0.0))
+
+    computed = rebuild_balances()
+
+    assert computed.snapshot_offset == snapshot.ledger_offset
+    assert computed.tail == 3
+    assert balances() == expected
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_seeded_balances_match_the_ledger(db_session):
+    seed(SeedConfig(users=10, groups=2, expenses=100, seed=3))
+
+    assert verify_balances() == {}
+
+
+def test_cli_ledger_commands(app, users):
+    a, b, _ = (user.id for user in users)
+    Debt.update(b, a, 10.0)
+    runner = app.test_cli_runner()
+
+    assert "taken at ledger offset 1" in runner.invoke(ledger_snapshot).output
+    Debt.query.delete()
+    db.session.commit()
+
+    result = runner.invoke(verify_ledger)
+    assert result.exit_code == 1
+    assert f"User {a} with user {b}: expected 1000 cents, stored 0" in result.output
+
+    result = runner.invoke(rebuild_balances_command)
+    assert "Rebuilt 1 balances from the snapshot at ledger offset 1" in result.output
+    assert runner.invoke(verify_ledger).exit_code == 0
@@ -1,4 +1,5 @@
 import pytest
+import sqlalchemy
 from sqlalchemy.exc import IntegrityError
 from app.model.user import User
 from app.model.group import Group
@@ -128,3 +129,131 @@ def test_update_unique_constraint_on_lender_borrower_only(db_session):
     with pytest.raises(IntegrityError):
         db_session.add(Debt(borrower=user1, lender=user2, amount=100))
         db_session.commit()
+
+
+def test_apply_many_nets_transactions_per_pair(db_session):
+    """Nets transactions in both directions into a single debt per pair."""
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+    user3 = User.create("user3", "email3", "password")
+
+    Debt.apply_many(
+        [
+            (user1.id, user2.id, 100),
+            (user2.id, user1.id, 30.5),
+            (user3.id, user1.id, 20),
+            (user1.id, user3.id, 20),
+        ]
+    )
+
+    assert Debt.query.count() == 1
+    assert Debt.find(user1.id, user2.id).amount == 69.5
+
+
+def test_apply_many_merges_with_existing_debts(db_session):
+    """Settles, reduces, reverses and extends existing debts in one call."""
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+    user3 = User.create("user3", "email3", "password")
+    user4 = User.create("user4", "email4", "password")
+    Debt.update(user1.id, user2.id, 100)
+    Debt.update(user1.id, user3.id, 100)
+    Debt.update(user1.id, user4.id, 100)
+
+    Debt.apply_many(
+        [
+            (user2.id, user1.id, 100),
+            (user3.id, user1.id, 150),
+            (user1.id, user4.id, 0.01),
+        ]
+    )
+
+    assert Debt.query.count() == 2
+    assert Debt.find(user1.id, user2.id) is None
+    assert Debt.find(user1.id, user3.id) is None
+    assert Debt.find(user3.id, user1.id).amount == 50
+    assert Debt.find(user1.id, user4.id).amount == 100.01
+
+
+def test_apply_many_uses_a_single_select(db_session):
+    """Loads all affected pairs, then their users' summaries, with one query each."""
+    ids = [User.create(f"user{i}", f"email{i}", "password").id for i in range(6)]
+    Debt.update(ids[0], ids[1], 10)
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+    try:
+        Debt.apply_many(
+            [(ids[0], user_id, 5) for user_id in ids[1:]]
+            + [(user_id, ids[-1], 5) for user_id in ids[1:-1]]
+        )
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 2
+    assert Debt.query.count() == 9
+
+
+def test_apply_many_empty(db_session):
+    Debt.apply_many([])
+
+    assert Debt.query.count() == 0
+
+
+def test_debt_is_stored_once_per_canonical_pair(db_session):
+    """Stores the pair with the lower user id first and a signed balance."""
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+
+    Debt.update(user1.id, user2.id, 100)
+    debt = Debt.find_pair(user2.id, user1.id)
+
+    assert (debt.low_id, debt.high_id, debt.balance) == (user1.id, user2.id, -100)
+    assert debt.lender is user2
+    assert debt.borrower is user1
+
+    Debt.update(user2.id, user1.id, 150)
+
+    assert Debt.find_pair(user1.id, user2.id) is debt
+    assert debt.balance == 50
+    assert (debt.lender_id, debt.borrower_id, debt.amount) == (user1.id, user2.id, 50)
+
+
+def test_debt_constructor_accepts_lender_and_borrower(db_session):
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+
+    debt = Debt(lender_id=user2.id, borrower_id=user1.id, amount=25.0)
+
+    assert (debt.low_id, debt.high_id, debt.balance) == (user1.id, user2.id, -25.0)
+
+
+def test_debt_filter_by_lender_and_borrower(db_session):
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+    user3 = User.create("user3", "email3", "password")
+    Debt.update(user1.id, user2.id, 10)
+    Debt.update(user3.id, user2.id, 20)
+
+    assert Debt.query.filter_by(lender_id=user2.id).count() == 2
+    assert Debt.query.filter_by(borrower_id=user3.id).one().amount == 20
+    assert Debt.query.filter(Debt.amount > 15).one().borrower_id == user3.id
+
+
+def test_user_debt_relationships(db_session):
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+    user3 = User.create("user3", "email3", "password")
+    Debt.update(user1.id, user2.id, 10)
+    Debt.update(user2.id, user3.id, 20)
+    db_session.commit()
+
+    assert [d.borrower_id for d in user2.lender_debts] == [user1.id]
+    assert [d.lender_id for d in user2.borrower_debts] == [user3.id]
+    assert len(user2.debts) == 2
+    assert user1.lender_debts == [] and user3.borrower_debts == []
@@ -194,4 +194,58 @@ def test_unique_constraint(db_session):
         # Try to manually create a duplicate record
         duplicate = GroupBalance(user_id=user.id, group_id=group.id, balance=50.0)
         db_session.add(duplicate)
-        db_session.commit()
\ No newline at end of file
+        db_session.commit()
+
+def test_apply_deltas(db_session):
+    """Test updating existing and new balances in a group at once."""
+    user1 = User.create("user1", "email1", "password")
+    user2 = User.create("user2", "email2", "password")
+    user3 = User.create("user3", "email3", "password")
+    group = Group.create("group1", [user1, user2, user3])
+    GroupBalance.update_balance(user1.id, group.id, 0.1)
+
+    GroupBalance.apply_deltas(group.id, {user1.id: 0.2, user2.id: -0.3, user3.id: 0})
+
+    assert GroupBalance.get_group_balances(group.id) == {user1.id: 0.3, user2.id: -0.3}
+
+
+def test_apply_deltas_only_touches_the_given_group(db_session):
+    """Test that balances of the same users in other groups are left alone."""
+    user = User.create("user1", "email1", "password")
+    group1 = Group.create("group1", [user])
+    group2 = Group.create("group2", [user])
+    GroupBalance.update_balance(user.id, group2.id, 10.0)
+
+    GroupBalance.apply_deltas(group1.id, {user.id: 5.0})
+
+    assert GroupBalance.find(user.id, group1.id).balance == 5.0
+    assert GroupBalance.find(user.id, group2.id).balance == 10.0
+
+
+def test_apply_deltas_uses_a_single_select(db_session):
+    """Test that the number of queries does not grow with the participants."""
+    import sqlalchemy
+
+    users = [User.create(f"user{i}", f"email{i}", "password") for i in range(50)]
+    group = Group.create("group1", users)
+    ids = [user.id for user in users]
+    group_id = group.id
+    GroupBalance.apply_deltas(group_id, {uid: 1.0 for uid in ids[:25]})
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    engine = db_session.get_bind()
+    sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+    try:
+        GroupBalance.apply_deltas(group_id, {uid: -2.0 for uid in ids})
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+
+    # One of each for the group balances and for the users' balance summaries,
+    # plus one insert of the ledger entries
+    assert statements.count("SELECT") == 2
+    assert statements.count("UPDATE") <= 2
+    assert statements.count("INSERT") <= 3
+    assert sorted(set(GroupBalance.get_group_balances(group_id).values())) == [-2.0, -1.0]
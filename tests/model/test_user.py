@@ -1,9 +1,11 @@
 import pytest
 from werkzeug.security import check_password_hash
+from sqlalchemy import event, select
 from sqlalchemy.exc import IntegrityError
+from app.database import db
 from app.model.user import User
 from app.model.group import Group
-from app.model.expense import Expense
+from app.model.expense import Expense, expense_users
 
 
 def test_create_new_user(db_session):
@@ -268,6 +270,25 @@ def test_add_expense(db_session):
     assert user.expenses == [expense]
 
 
+def test_add_expense_copies_created_at_without_querying_it(db_session):
+    user = User.create("username", "email", "password")
+    expense = Expense.create(10, [], user.id)
+    user.expenses  # Loaded beforehand, as update_expense_in_users does
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        user.add_expense(expense)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert [s.split()[0] for s in statements] == ["INSERT"]
+    assert db_session.scalar(select(expense_users.c.created_at)) == expense.created_at
+
+
 def test_add_same_expense_idempotent(db_session):
     """Adding an expense is idempotent."""
     user = User.create("username", "email", "password")
@@ -0,0 +1,109 @@
+import pytest
+from app.cli.database import rebuild_balance_summary, verify_balance_summary
+from app.model.debt import Debt
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.model.user_balance_summary import UserBalanceSummary
+
+
+@pytest.fixture
+def users(db_session):
+    return [User.create(f"user{i}", f"{i}@email.com", "password") for i in range(3)]
+
+
+@pytest.fixture
+def group(users):
+    return Group.create("group", users)
+
+
+def summary(user):
+    found = UserBalanceSummary.find(user.id)
+    return (found.no_group_balance, found.group_balance) if found else (0.0, 0.0)
+
+
+def test_debts_update_summaries(db_session, users):
+    Debt.apply_many(
+        [(users[1].id, users[0].id, 10.0), (users[2].id, users[0].id, 2.5)]
+    )
+    Debt.update(users[0].id, users[1].id, 4.0)
+
+    assert summary(users[0]) == (8.5, 0.0)
+    assert summary(users[1]) == (-6.0, 0.0)
+    assert summary(users[2]) == (-2.5, 0.0)
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_settled_debt_zeroes_summaries(db_session, users):
+    Debt.update(users[1].id, users[0].id, 10.0)
+    Debt.update(users[0].id, users[1].id, 10.0)
+
+    assert Debt.query.count() == 0
+    assert summary(users[0]) == (0.0, 0.0)
+    assert summary(users[1]) == (0.0, 0.0)
+
+
+def test_group_balances_update_summaries(db_session, users, group):
+    other = Group.create("other", users[:2])
+    GroupBalance.apply_deltas(group.id, {users[0].id: 30.0, users[1].id: -30.0})
+    GroupBalance.update_balance(users[0].id, other.id, 5.0)
+    GroupBalance.set_balance(users[1].id, other.id, -5.0, commit=False)
+
+    assert summary(users[0]) == (0.0, 35.0)
+    assert summary(users[1]) == (0.0, -35.0)
+    assert UserBalanceSummary.verify() == {}
+
+    GroupBalance.clear_group_balances(group.id, commit=False)
+
+    assert summary(users[0]) == (0.0, 5.0)
+    assert summary(users[1]) == (0.0, -5.0)
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_overall_balance(db_session, users, group):
+    Debt.update(users[1].id, users[0].id, 0.1)
+    GroupBalance.update_balance(users[0].id, group.id, 0.2)
+
+    assert UserBalanceSummary.find(users[0].id).overall_balance == 0.3
+
+
+def test_verify_reports_out_of_date_summaries(db_session, users):
+    Debt.update(users[1].id, users[0].id, 10.0)
+    db_session.add(Debt(borrower=users[2], lender=users[0], amount=5.0))
+    db_session.flush()
+
+    assert UserBalanceSummary.verify() == {
+        users[0].id: ((15.0, 0.0), (10.0, 0.0)),
+        users[2].id: ((-5.0, 0.0), (0.0, 0.0)),
+    }
+
+
+def test_rebuild(db_session, users, group):
+    db_session.add(Debt(borrower=users[1], lender=users[0], amount=10.0))
+    db_session.add(GroupBalance(user_id=users[2].id, group_id=group.id, balance=-3.0))
+    db_session.add(UserBalanceSummary(user_id=users[1].id, no_group_balance=99.0, group_balance=0.0))
+    db_session.commit()
+
+    assert UserBalanceSummary.rebuild() == 3
+
+    assert summary(users[0]) == (10.0, 0.0)
+    assert summary(users[1]) == (-10.0, 0.0)
+    assert summary(users[2]) == (0.0, -3.0)
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_cli_commands(app, db_session, users):
+    db_session.add(Debt(borrower=users[1], lender=users[0], amount=10.0))
+    db_session.commit()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(verify_balance_summary)
+    assert result.exit_code == 1
+    assert "2 balance summaries are out of date." in result.output
+
+    result = runner.invoke(rebuild_balance_summary)
+    assert "Rebuilt balance summaries of 2 users." in result.output
+
+    result = runner.invoke(verify_balance_summary)
+    assert result.exit_code == 0
+    assert "All balance summaries are up to date." in result.output
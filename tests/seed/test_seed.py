@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.cli.database import seed_data
+from app.database import db
+from app.debt import update_debts
+from app.group import get_group_user_balances
+from app.model.balance import Balance
+from app.model.debt import Debt
+from app.model.expense import Expense
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.model.user_balance_summary import UserBalanceSummary
+from app.seed import BulkWriter, SeedConfig, _equal_balances, seed
+from app.split.constants import TOTAL
+
+
+def count(model) -> int:
+    return db.session.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_seed_creates_consistent_data(db_session):
+    stats = seed(SeedConfig(users=20, groups=4, expenses=300, seed=1), batch_size=64)
+
+    assert (stats.users, stats.groups, stats.expenses) == (20, 4, 300)
+    assert count(User) == 20 and count(Group) == 4 and count(Expense) == 300
+    assert count(Balance) == stats.balances
+    assert UserBalanceSummary.verify() == {}
+    for group in Group.query:
+        assert sum(get_group_user_balances(group).values()) == pytest.approx(0)
+        assert all(u in group.users for u in get_group_user_balances(group))
+
+
+def test_seed_is_reproducible(db_session):
+    seed(SeedConfig(users=10, groups=2, expenses=50, seed=7))
+    first = [(e.amount, e.created_at.date()) for e in Expense.query.order_by(Expense.id)]
+    db_session.execute(db.delete(Expense))
+
+    seed(SeedConfig(users=10, groups=2, expenses=50, seed=7))
+    second = [(e.amount, e.created_at.date()) for e in Expense.query.order_by(Expense.id)]
+
+    assert first == second
+
+
+def test_users_share_one_password_hash(db_session):
+    BulkWriter().add_users(3)
+
+    users = User.query.all()
+    assert len({user.password for user in users}) == 1
+    assert User.authenticate(users[0].email, "password") == users[0]
+
+
+def test_aggregates_match_the_regular_debt_updates(db_session):
+    writer = BulkWriter(batch_size=2)
+    a, b, c = writer.add_users(3)
+    [group_id] = writer.add_groups([("Trip", [a, b, c])])
+    expenses = [
+        (_equal_balances(a, [a, b, c], 1000), None),
+        (_equal_balances(b, [a, b], 501), None),
+        (_equal_balances(c, [a, b, c], 900), group_id),
+    ]
+    for balances, expense_group in expenses:
+        writer.add_expense(10.0, a, balances, expense_group)
+    writer.finish()
+    seeded_debts = {(d.low_id, d.high_id): d.balance for d in Debt.query}
+    seeded_group = GroupBalance.get_group_balances(group_id)
+
+    db_session.execute(db.delete(Debt))
+    db_session.execute(db.delete(GroupBalance))
+    for balances, expense_group in expenses:
+        update_debts(balances, expense_group)
+
+    assert seeded_debts == {(d.low_id, d.high_id): d.balance for d in Debt.query}
+    assert seeded_group == GroupBalance.get_group_balances(group_id)
+    assert sum(b[TOTAL] for b in expenses[0][0].values()) == 0
+
+
+def test_cli_seed(app, db_session):
+    result = app.test_cli_runner().invoke(
+        seed_data, ["--users", "5", "--groups", "1", "--expenses", "10", "--seed", "1"]
+    )
+
+    assert result.exit_code == 0
+    assert "Seeded 5 users, 1 groups, 10 expenses" in result.output
@@ -0,0 +1,107 @@
+import io
+import json
+import random
+from collections import Counter
+
+from app.cli.database import workload
+from app.expense.importer import import_expenses
+from app.expense.validation import validate_expense_data
+from app.model.expense import Expense, ExpenseCategory
+from app.model.user_balance_summary import UserBalanceSummary
+from app.seed.workload import Workload, WorkloadConfig, generate, zipf_group_sizes
+from app.split import SplitType
+
+
+def events(config: WorkloadConfig) -> list:
+    rng = random.Random(config.seed)
+    user_ids = list(range(1, config.users + 1))
+    sizes = zipf_group_sizes(rng, config.groups, config.max_group_size, 1.3)
+    groups = [(n, rng.sample(user_ids, size)) for n, size in enumerate(sizes, 1)]
+    return list(Workload(config, user_ids, groups))
+
+
+def test_zipf_group_sizes_are_skewed():
+    sizes = Counter(zipf_group_sizes(random.Random(0), 10_000, 50, 1.3))
+
+    assert min(sizes) >= 2 and max(sizes) <= 50
+    assert sizes[2] > sizes[3] > sizes[5] > sizes[20]
+
+
+def test_workload_is_reproducible_and_valid():
+    config = WorkloadConfig(users=50, groups=10, expenses=2000, seed=4)
+
+    first = events(config)
+    second = events(WorkloadConfig(users=50, groups=10, expenses=2000, seed=4))
+
+    assert [data for data, _ in first] == [data for data, _ in second]
+    assert all(not validate_expense_data(data) for data, _ in first)
+    assert [data.created_at for data, _ in first] == sorted(d.created_at for d, _ in first)
+    assert events(WorkloadConfig(users=50, groups=10, expenses=2000, seed=5)) != first
+
+
+def test_workload_shape():
+    config = WorkloadConfig(
+        users=200,
+        groups=20,
+        expenses=5000,
+        split_mix={SplitType.EQUALLY: 1, SplitType.PERCENTAGE: 1},
+        settlement_share=0.05,
+    )
+
+    expenses = [data for data, _ in events(config)]
+    payers = Counter(data.creator_id for data in expenses)
+    splits = Counter(data.owers_split for data in expenses)
+    settlements = [e for e in expenses if e.category == ExpenseCategory.SETTLEMENT]
+
+    # Heavy tail: the busiest tenth of the users pays for most expenses
+    busiest = sum(count for _, count in payers.most_common(20))
+    assert busiest > len(expenses) / 2
+    assert splits[SplitType.AMOUNT] == len(settlements)
+    assert 0.4 < splits[SplitType.EQUALLY] / splits[SplitType.PERCENTAGE] < 2.5
+    assert len(settlements) > 100
+
+
+def test_generate_to_database(db_session):
+    stats = generate(WorkloadConfig(users=30, groups=5, expenses=500, seed=1))
+
+    assert (stats.users, stats.groups, stats.expenses) == (30, 5, 500)
+    assert Expense.query.count() == 500
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_generate_jsonl_loads_with_the_importer(db_session):
+    output = io.StringIO()
+    generate(WorkloadConfig(users=30, groups=5, expenses=300, seed=1), output)
+
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(rows) == 300 and Expense.query.count() == 0
+
+    stats = import_expenses(io.StringIO(output.getvalue()), "jsonl")
+    assert (stats.imported, stats.errors) == (300, [])
+    assert UserBalanceSummary.verify() == {}
+
+
+def test_cli_workload(app, db_session, tmp_path):
+    path = tmp_path / "workload.jsonl"
+
+    result = app.test_cli_runner().invoke(
+        workload,
+        [
+            *("--users", "10", "--groups", "2", "--expenses", "20"),
+            *("--split-mix", "equally=1,amount=1", "--output", str(path)),
+            *("--days", "10", "--end", "2024-03-01"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(rows) == 20
+    assert all("2024-02-20" <= row["created_at"] < "2024-03-01" for row in rows)
+    assert "Generated 10 users, 2 groups and 20 expenses" in result.output
+
+
+def test_cli_workload_rejects_unknown_split_type(app, db_session):
+    result = app.test_cli_runner().invoke(workload, ["--split-mix", "evenly=1"])
+
+    assert result.exit_code == 2
+    assert "Malformed split mix" in result.output
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from app.split import RemainderStrategy, SplitType, equally, percentage, split
+from app.split.batch import split_many
+from app.split.remainder import distribute
+
+LARGEST_REMAINDER = RemainderStrategy.LARGEST_REMAINDER
+
+
+def test_equally_largest_remainder_favours_lowest_user_ids():
+    users = {5: None, 3: None, 9: None}
+
+    assert equally.split(100.0, users, LARGEST_REMAINDER) == {5: 33.33, 3: 33.34, 9: 33.33}
+
+
+def test_percentage_largest_remainder_favours_largest_fractions():
+    users = {1: 33.3, 2: 33.3, 3: 33.4}
+
+    # Quotas are 33.3, 33.3 and 33.4 cents, so the spare cent goes to user 3
+    assert percentage.split(1.0, users, LARGEST_REMAINDER) == {1: 0.33, 2: 0.33, 3: 0.34}
+
+
+def test_percentage_largest_remainder_ties_to_lowest_user_id():
+    users = {2: 50, 1: 50}
+
+    assert percentage.split(0.01, users, LARGEST_REMAINDER) == {2: 0.0, 1: 0.01}
+
+
+@pytest.mark.parametrize("strategy", list(RemainderStrategy))
+def test_splits_always_add_up(strategy):
+    users = {uid: None for uid in range(1, 8)}
+    percentages = {1: 12.5, 2: 12.5, 3: 25, 4: 16.67, 5: 16.67, 6: 16.66}
+
+    for cents in range(1, 500):
+        assert sum(round(v * 100) for v in equally.split(cents / 100, users, strategy).values()) == cents
+        assert sum(round(v * 100) for v in percentage.split(cents / 100, percentages, strategy).values()) == cents
+
+
+def test_largest_remainder_is_deterministic():
+    users = {uid: None for uid in range(1000)}
+
+    first = equally.split(123.45, users, LARGEST_REMAINDER)
+
+    assert all(equally.split(123.45, dict(users), LARGEST_REMAINDER) == first for _ in range(5))
+
+
+def test_splits_default_to_largest_remainder():
+    payers = {1: None}
+    owers = {5: None, 3: None, 9: None}
+
+    balances = split(100.0, payers, owers, SplitType.EQUALLY, SplitType.EQUALLY)
+
+    assert {uid: b["owed"] for uid, b in balances.items()} == {1: 0, 5: 33.33, 3: 33.34, 9: 33.33}
+
+
+def test_distribute_negative_spare_round_robin():
+    cents = {1: 10, 2: 10, 3: 10}
+
+    distribute(cents, -4, LARGEST_REMAINDER, {1: 0.5, 2: 0.1, 3: 0.9})
+
+    assert cents == {1: 9, 2: 8, 3: 9}
+
+
+def test_distribute_random_hands_out_at_most_one_cent_per_round():
+    cents = {uid: 0 for uid in range(10)}
+
+    distribute(cents, 13, RemainderStrategy.RANDOM)
+
+    assert sorted(cents.values()) == [1] * 7 + [2] * 3
+
+
+def test_split_many_largest_remainder_matches_scalar_splits():
+    user_ids = [1, 2, 3, 4]
+    rng = np.random.default_rng(0)
+    amounts = rng.integers(1, 10_000, 100) / 100
+    payers = np.array([[0, np.nan, np.nan, np.nan]] * 100)
+    owers = np.where(rng.random((100, 4)) < 0.8, rng.integers(1, 40, (100, 4)), np.nan)
+    owers[:, 0] = np.nan
+    owers[:, 3] = 100 - np.nansum(owers[:, :3], axis=1)
+    types = [
+        (SplitType.EQUALLY, SplitType.PERCENTAGE if i % 2 else SplitType.EQUALLY)
+        for i in range(100)
+    ]
+
+    batch = split_many(amounts, payers, owers, types, LARGEST_REMAINDER)
+
+    for i, (_, owers_split) in enumerate(types):
+        users = {uid: v for uid, v in zip(user_ids, owers[i]) if not np.isnan(v)}
+        module = percentage if owers_split == SplitType.PERCENTAGE else equally
+        expected = module.split(amounts[i], users, LARGEST_REMAINDER)
+        assert {uid: batch.owed[i, col] / 100 for col, uid in enumerate(user_ids) if uid in users} == expected
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from app.split import RemainderStrategy, SplitType, split
+from app.split.batch import split_many
+from tests.splits import TOTAL_AMOUNT, id1, id2, id3, id4, id5
+
+NAN = np.nan
+USER_IDS = [id1, id2, id3, id4, id5]
+
+
+def to_dict(row) -> dict[int, float]:
+    return {uid: value for uid, value in zip(USER_IDS, row) if not np.isnan(value)}
+
+
+def test_split_many_matches_split_without_spare_cents():
+    amounts = [TOTAL_AMOUNT, TOTAL_AMOUNT, 90.0]
+    payers = np.array(
+        [
+            [500, 500, NAN, NAN, NAN],
+            [0, 0, NAN, NAN, NAN],
+            [15, 20, 30, 15, 20],
+        ]
+    )
+    owers = np.array(
+        [
+            [NAN, 200, 300, 250, 250],
+            [NAN, 10, 20, 30, 40],
+            [NAN, 0, 0, 0, NAN],
+        ]
+    )
+    split_types = [
+        (SplitType.AMOUNT, SplitType.AMOUNT),
+        (SplitType.EQUALLY, SplitType.PERCENTAGE),
+        (SplitType.PERCENTAGE, SplitType.EQUALLY),
+    ]
+
+    batch = split_many(amounts, payers, owers, split_types)
+
+    for i, (payers_split, owers_split) in enumerate(split_types):
+        expected = split(
+            amounts[i], to_dict(payers[i]), to_dict(owers[i]), payers_split, owers_split
+        )
+        assert batch.balances(i, USER_IDS) == expected
+
+
+def test_split_many_equally_hands_out_spare_cents():
+    payers = np.array([[0, NAN, NAN, NAN, NAN]] * 2)
+    owers = np.array([[0, 0, 0, NAN, NAN], [0, 0, 0, 0, 0]])
+    types = [(SplitType.EQUALLY, SplitType.EQUALLY)] * 2
+
+    batch = split_many([100.0, 0.03], payers, owers, types)
+
+    assert batch.owed.sum(axis=1).tolist() == [10000, 3]
+    assert sorted(batch.owed[0, :3].tolist()) == [3333, 3333, 3334]
+    assert batch.owed[0, 3:].tolist() == [0, 0]
+    assert sorted(batch.owed[1].tolist()) == [0, 0, 1, 1, 1]
+    assert batch.total.sum(axis=1).tolist() == [0, 0]
+
+
+def test_split_many_percentage_hands_out_spare_cents():
+    payers = np.array([[0, NAN, NAN, NAN, NAN]])
+    owers = np.array([[33.33, 33.33, 33.34, NAN, NAN]])
+    types = [(SplitType.EQUALLY, SplitType.PERCENTAGE)]
+
+    batch = split_many([0.1], payers, owers, types)
+
+    assert batch.owed.sum() == 10
+    assert sorted(batch.owed[0, :3].tolist()) == [3, 3, 4]
+
+
+def test_split_many_is_reproducible_with_a_seeded_generator():
+    payers = np.array([[0, NAN, NAN, NAN, NAN]] * 50)
+    owers = np.zeros((50, 5))
+    types = [(SplitType.EQUALLY, SplitType.EQUALLY)] * 50
+    amounts = np.linspace(1, 100, 50).round(2)
+
+    random = RemainderStrategy.RANDOM
+    first = split_many(amounts, payers, owers, types, random, np.random.default_rng(7))
+    second = split_many(amounts, payers, owers, types, random, np.random.default_rng(7))
+
+    assert np.array_equal(first.owed, second.owed)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_split_many_totals_balance(seed):
+    rng = np.random.default_rng(seed)
+    size = 200
+    amounts = rng.integers(1, 100_000, size) / 100
+    payers = np.where(rng.random((size, 5)) < 0.4, 0.0, NAN)
+    payers[:, 0] = 0.0
+    owers = np.where(rng.random((size, 5)) < 0.7, 0.0, NAN)
+    owers[:, 1] = 0.0
+    types = [(SplitType.EQUALLY, SplitType.EQUALLY)] * size
+
+    batch = split_many(amounts, payers, owers, types, rng=rng)
+
+    assert (batch.payed.sum(axis=1) == np.rint(amounts * 100)).all()
+    assert (batch.total.sum(axis=1) == 0).all()
+    for owed, row in zip(batch.owed, owers):
+        shares = owed[~np.isnan(row)]
+        assert shares.max() - shares.min() <= 1
@@ -0,0 +1,100 @@
+"""Tests for the eager-loading dashboard loader"""
+
+import pytest
+from flask import render_template
+from sqlalchemy import event
+
+from app.database import db
+from app.model.debt import Debt
+from app.model.group import Group
+from app.model.group_balance import GroupBalance
+from app.model.user import User
+from app.user import DashboardData, load_dashboard, prepare_dashboard_data
+from app.expense import ExpenseData
+from app.expense.submit import submit_expenses
+from app.model.expense import ExpenseCategory
+from app.split import SplitType
+
+
+def make_expense(payer_id: int, ower_id: int, amount: float) -> ExpenseData:
+    return ExpenseData(
+        amount=amount,
+        description="Dashboard expense",
+        category=ExpenseCategory.FOOD,
+        payers_split=SplitType.EQUALLY,
+        owers_split=SplitType.EQUALLY,
+        payers={payer_id: None},
+        owers={ower_id: None},
+        group_id=None,
+        creator_id=payer_id,
+    )
+
+
+def build_dashboard_user(size: int) -> User:
+    user = User.create("owner", "owner@test.com", "password")
+    others = [User.create(f"friend{i}", f"friend{i}@test.com", "password") for i in range(size)]
+    for i, other in enumerate(others):
+        group = Group.create(f"Group {i}", [user, other])
+        GroupBalance.update_balance(user.id, group.id, 10.0 * (i - size / 2))
+    submit_expenses(
+        [make_expense(user.id, other.id, 5.0 + i) for i, other in enumerate(others)]
+        + [make_expense(other.id, user.id, 1.0) for other in others[::2]]
+    )
+    return user
+
+
+def count_queries(func, *args) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        func(*args)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def render_dashboard(user_id: int) -> str:
+    # Start from an empty identity map and load the user, as a new request would
+    db.session.expunge_all()
+    user = db.session.get_one(User, user_id)
+    return render_template("user/dashboard.html", **prepare_dashboard_data(user))
+
+
+@pytest.mark.parametrize("size", [2, 12])
+def test_dashboard_render_uses_fixed_number_of_queries(db_session, request_context, size):
+    user_id = build_dashboard_user(size).id
+
+    # The request's user, the dashboard user with its five relationships,
+    # then the user's balance summary
+    assert count_queries(render_dashboard, user_id) == 8
+
+
+def test_load_dashboard_returns_dashboard_data(db_session):
+    user = build_dashboard_user(4)
+
+    dashboard = load_dashboard(user)
+
+    assert isinstance(dashboard, DashboardData)
+    assert dashboard.current_user == user
+    assert len(dashboard.no_group_debts) == 4
+    assert {debt.amount for debt in dashboard.no_group_debts} == {4.0, 6.0, 8.0}
+    assert dashboard.no_group_balance == sum(
+        debt.amount if debt.lender_id == user.id else -debt.amount
+        for debt in Debt.query.all()
+    )
+    assert [dashboard.group_balances[g.id] for g in dashboard.groups] == [10.0, 0.0, -10.0, -20.0]
+    assert dashboard.overall_group_balance == -20.0
+    assert len(dashboard.expenses) == 6
+    assert set(dashboard.to_dict()) == {
+        "current_user",
+        "no_group_debts",
+        "no_group_balance",
+        "groups",
+        "group_balances",
+        "overall_group_balance",
+        "expenses",
+    }